@@ -1,11 +1,12 @@
 # h3c_doc_checker/batch_processor.py
 import json
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from concurrent.futures import ThreadPoolExecutor
 from .config import Config
 from .checkers import TitleChecker, TableChecker, ContentChecker, FontChecker
 from .utils import CheckResult, load_document
+from .results_db import ResultsDatabase
 
 class BatchProcessor:
     def __init__(self, config_path: str):
@@ -53,21 +54,42 @@ class BatchProcessor:
                 "passed": False
             }
     
-    def process_batch(self, doc_paths: List[str], max_workers: int = 4) -> Dict[str, Any]:
-        """批量处理多个文档"""
+    def process_batch(self, doc_paths: List[str], max_workers: int = 4,
+                      db_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        批量处理多个文档
+
+        Args:
+            doc_paths: 文档路径列表
+            max_workers: 并发线程数
+            db_path: 结果数据库路径（可选），指定时将本次运行的结果写入 SQLite
+        """
         results = {
             "total": len(doc_paths),
             "passed": 0,
             "failed": 0,
             "documents": []
         }
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            for result in executor.map(self.process_document, doc_paths):
-                if result.get("passed", False):
-                    results["passed"] += 1
-                else:
-                    results["failed"] += 1
-                results["documents"].append(result)
-                
+
+        db = ResultsDatabase(db_path) if db_path else None
+        try:
+            if db:
+                db.start_run(self.config.config_path.resolve())
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for result in executor.map(self.process_document, doc_paths):
+                    if result.get("passed", False):
+                        results["passed"] += 1
+                    else:
+                        results["failed"] += 1
+                    results["documents"].append(result)
+                    if db:
+                        db.add_document_result(result)
+
+            if db:
+                db.finish_run(results["total"], results["passed"], results["failed"])
+        finally:
+            if db:
+                db.close()
+
         return results
\ No newline at end of file
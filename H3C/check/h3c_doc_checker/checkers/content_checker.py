@@ -3,6 +3,7 @@ from typing import Dict, List, Optional, Tuple, Any
 from docx.document import Document
 from docx.text.paragraph import Paragraph
 from h3c_doc_checker.utils import CheckResult, get_paragraph_style_name
+from h3c_doc_checker.heading_matcher import HeadingMatcher, rule_match_mode
 
 class ContentChecker:
     """内容检查器类"""
@@ -20,20 +21,52 @@ class ContentChecker:
         
     def get_paragraphs_after_heading(self, heading_text: str, exact_match: bool = True, count: int = 1) -> List[Paragraph]:
         """获取标题后的指定数量段落"""
-        paragraphs = []
-        heading_found = False
-        collected = 0
+        matcher = HeadingMatcher()
+        matcher.add(0, heading_text, "exact" if exact_match else "contains")
+        paragraphs = self.doc.paragraphs
         
-        for para in self.doc.paragraphs:
+        for idx, para in enumerate(paragraphs):
+            if matcher.match(para.text.strip()):
+                return self._collect_paragraphs(paragraphs, idx + 1, count)
+        return []
+    
+    def _locate_headings(self, paragraphs: List[Paragraph]) -> Dict[int, int]:
+        """
+        一次遍历定位所有规则对应的标题
+        
+        Returns:
+            规则下标 -> 标题段落下标（取第一次出现的位置）
+        """
+        matcher = HeadingMatcher()
+        for i, rule in enumerate(self.rules):
+            heading_text, mode = self._rule_heading(rule)
+            matcher.add(i, heading_text, mode)
+        
+        positions: Dict[int, int] = {}
+        for idx, para in enumerate(paragraphs):
             text = para.text.strip()
-            
-            if not heading_found:
-                # 查找标题
-                if (exact_match and text == heading_text) or (not exact_match and heading_text in text):
-                    heading_found = True
-                    # 找到标题后立即检查下一段落
-                    continue
+            if not text:
                 continue
+            for i in matcher.match(text):
+                positions.setdefault(i, idx)
+            if len(positions) == len(self.rules):
+                break
+        return positions
+    
+    @staticmethod
+    def _rule_heading(rule: Dict[str, Any]) -> Tuple[str, str]:
+        """返回规则的标题文本和匹配方式"""
+        if rule.get("heading_text_exact"):
+            return rule["heading_text_exact"].strip(), rule_match_mode(rule, "exact")
+        return rule.get("heading_text_contains", "").strip(), rule_match_mode(rule, "contains")
+    
+    @staticmethod
+    def _collect_paragraphs(paragraphs: List[Paragraph], start: int, count: int) -> List[Paragraph]:
+        """从 start 开始收集标题后的指定数量段落"""
+        collected = []
+        
+        for para in paragraphs[start:]:
+            text = para.text.strip()
             
             # 跳过空行
             if not text and not para.runs:
@@ -54,13 +87,12 @@ class ContentChecker:
                     break
             
             # 收集段落
-            if collected < count:
-                paragraphs.append(para)
-                collected += 1
+            if len(collected) < count:
+                collected.append(para)
             else:
                 break
                 
-        return paragraphs
+        return collected
         
     def check_contents(self) -> List[CheckResult]:
         """检查文档内容"""
@@ -73,12 +105,16 @@ class ContentChecker:
             )]
             
         results = []
-        for rule in self.rules:
-            heading_text = rule.get("heading_text_exact", "").strip()
+        all_paragraphs = self.doc.paragraphs
+        heading_positions = self._locate_headings(all_paragraphs)
+        for i, rule in enumerate(self.rules):
+            heading_text, _ = self._rule_heading(rule)
             check_count = rule.get("check_next_paragraphs", 1)
             
             # 获取并检查段落
-            paragraphs = self.get_paragraphs_after_heading(heading_text, True, check_count)
+            paragraphs = []
+            if i in heading_positions:
+                paragraphs = self._collect_paragraphs(all_paragraphs, heading_positions[i] + 1, check_count)
             
             if not paragraphs:
                 results.append(CheckResult(
@@ -6,6 +6,12 @@ from docx.text.paragraph import Paragraph
 from docx.text.run import Run
 from docx.shared import Pt
 from h3c_doc_checker.utils import CheckResult, get_paragraph_style_name
+from h3c_doc_checker.heading_matcher import HeadingMatcher, rule_match_mode
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_EAST_ASIA = W_NS + 'eastAsia'
+W_ASCII = W_NS + 'ascii'
+W_VAL = W_NS + 'val'
 
 class FontChecker:
     """字体格式检查器类"""
@@ -63,6 +69,17 @@ class FontChecker:
         if "english_font" in content_rules and "english_fonts" not in content_rules:
             content_rules["english_fonts"] = [content_rules["english_font"]]
             
+        # run属性指纹及按指纹解析的字体、字号缓存（每个文档一份）
+        self._interned: Dict[Tuple, Tuple] = {}
+        self._run_fingerprints: Dict[Any, Tuple] = {}
+        self._paragraph_fingerprints: Dict[Any, Tuple] = {}
+        self._font_cache: Dict[Tuple, Optional[str]] = {}
+        self._size_cache: Dict[Tuple, Optional[float]] = {}
+        
+        # 段落所属标题及标题匹配结果的缓存
+        self._parent_titles: Optional[List[Optional[str]]] = None
+        self._title_match_cache: Dict[str, bool] = {}
+            
         # 获取混合字体模式列表
         self.mixed_font_patterns = self.rules.get("mixed_font_patterns", [])
         
@@ -122,9 +139,85 @@ class FontChecker:
             return style_rules.get("english_font")
         return None
         
+    def _paragraph_fingerprint(self, para: Paragraph) -> Tuple:
+        """
+        提取影响字体解析的段落属性：样式ID、段落rPr中的eastAsia字体和字号
+        """
+        element = para._element
+        fingerprint = self._paragraph_fingerprints.get(element)
+        if fingerprint is not None:
+            return fingerprint
+        
+        style_id = None
+        east_asia = None
+        sz_val = None
+        ppr = element.pPr
+        if ppr is not None:
+            if ppr.pStyle is not None:
+                style_id = ppr.pStyle.val
+            for ppr_child in ppr:
+                if ppr_child.tag.endswith('rPr'):
+                    for rpr_child in ppr_child:
+                        if east_asia is None and rpr_child.tag.endswith('rFonts'):
+                            east_asia = rpr_child.get(W_EAST_ASIA)
+                        if sz_val is None and rpr_child.tag.endswith('sz'):
+                            sz_val = rpr_child.get(W_VAL)
+        
+        fingerprint = self._intern((style_id, east_asia, sz_val))
+        self._paragraph_fingerprints[element] = fingerprint
+        return fingerprint
+        
+    def _run_fingerprint(self, run: Run) -> Tuple:
+        """
+        将run属性规范化为驻留的指纹：(eastAsia字体, ascii字体, 字号, 段落指纹)
+        
+        同一文档中大量run的属性完全相同，指纹相同的run只需解析一次字体和字号。
+        """
+        element = run._element
+        fingerprint = self._run_fingerprints.get(element)
+        if fingerprint is not None:
+            return fingerprint
+        
+        east_asia = None
+        ascii_font = None
+        sz_val = None
+        run_props = element.rPr
+        if run_props is not None:
+            for child in run_props:
+                tag = child.tag.split('}')[-1]
+                if tag == 'rFonts':
+                    east_asia = east_asia or child.get(W_EAST_ASIA)
+                    ascii_font = ascii_font or child.get(W_ASCII)
+                elif tag == 'sz' and sz_val is None:
+                    sz_val = child.get(W_VAL)
+        
+        fingerprint = self._intern((east_asia, ascii_font, sz_val, self._paragraph_fingerprint(run._parent)))
+        self._run_fingerprints[element] = fingerprint
+        return fingerprint
+        
+    def _intern(self, fingerprint: Tuple) -> Tuple:
+        """驻留指纹，使相同属性集合共享同一个对象"""
+        return self._interned.setdefault(fingerprint, fingerprint)
+        
     def _get_font_from_run(self, run: Run, is_chinese: bool = False) -> Optional[str]:
         """
-        从run中获取字体名称
+        从run中获取字体名称（按run属性指纹缓存）
+        
+        Args:
+            run: Run对象
+            is_chinese: 是否为中文字符
+            
+        Returns:
+            字体名称
+        """
+        key = (self._run_fingerprint(run), is_chinese)
+        if key not in self._font_cache:
+            self._font_cache[key] = self._resolve_font_from_run(run, is_chinese)
+        return self._font_cache[key]
+        
+    def _resolve_font_from_run(self, run: Run, is_chinese: bool = False) -> Optional[str]:
+        """
+        解析run的字体名称
         
         Args:
             run: Run对象
@@ -180,7 +273,19 @@ class FontChecker:
         
     def _get_effective_font_size(self, para: Paragraph, run: Optional[Run] = None) -> Optional[float]:
         """
-        获取有效的字体大小，考虑继承关系
+        获取有效的字体大小（按run/段落属性指纹缓存）
+        """
+        if run is not None:
+            key = (self._run_fingerprint(run)[2], self._paragraph_fingerprint(para))
+        else:
+            key = (None, self._paragraph_fingerprint(para))
+        if key not in self._size_cache:
+            self._size_cache[key] = self._resolve_effective_font_size(para, run)
+        return self._size_cache[key]
+        
+    def _resolve_effective_font_size(self, para: Paragraph, run: Optional[Run] = None) -> Optional[float]:
+        """
+        解析有效的字体大小，考虑继承关系
         优先级：Run直接设置 > 段落样式 > 继承样式
         """
         font_size = None
@@ -391,8 +496,11 @@ class FontChecker:
         english_errors = []
         size_errors = []
         
-        # 获取所有expected_titles的文本
-        expected_title_texts = [title.get("text", "").strip() for title in expected_titles]
+        # 将expected_titles索引到匹配器中（默认模糊匹配，允许标题中包含编号等额外字符）
+        title_matcher = HeadingMatcher()
+        for i, title in enumerate(expected_titles):
+            title_matcher.add(i, title.get("text", ""), rule_match_mode(title, "fuzzy"))
+        self._title_match_cache = {}
         
         # 将混合字体模式关键词转换为小写，用于不区分大小写的匹配
         mixed_font_patterns_lower = [pattern.lower() for pattern in self.mixed_font_patterns]
@@ -411,7 +519,7 @@ class FontChecker:
                 
             # 检查当前段落是否在某个expected_title下面
             is_under_expected_title = self._is_paragraph_under_expected_title(
-                para_idx, expected_title_texts
+                para_idx, title_matcher
             )
             
             if not is_under_expected_title:
@@ -620,40 +728,27 @@ class FontChecker:
             
         return results
         
-    def _is_paragraph_under_expected_title(self, para_idx: int, expected_titles: List[str]) -> bool:
+    def _is_paragraph_under_expected_title(self, para_idx: int, title_matcher: HeadingMatcher) -> bool:
         """
         检查段落是否在expected_titles下面
         
         Args:
             para_idx: 段落索引（从1开始）
-            expected_titles: 期望的标题文本列表
+            title_matcher: 由expected_titles构建的标题匹配器
         
         Returns:
             bool: 是否在expected_titles下面
         """
-        # 查找当前段落之前的最近标题
-        current_title_text = None
-        for i in range(para_idx - 1, 0, -1):
-            para = self.doc.paragraphs[i - 1]  # 索引从0开始，但para_idx从1开始
-            style_name = get_paragraph_style_name(para)
-            
-            # 如果是标题段落
-            if style_name and style_name.startswith(("Heading", "标题")):
-                current_title_text = para.text.strip()
-                break
+        current_title_text = self._find_parent_title(para_idx)
         
         # 如果找不到标题，则不在expected_titles下面
         if not current_title_text:
             return False
-            
-        # 检查标题是否在expected_titles中
-        # 使用模糊匹配，允许标题中包含额外的字符（如编号）
-        for expected_title in expected_titles:
-            # 如果期望的标题是当前标题的一部分，或者当前标题是期望标题的一部分
-            if expected_title in current_title_text or current_title_text in expected_title:
-                return True
-                
-        return False
+        
+        # 同一标题下的段落共享匹配结果
+        if current_title_text not in self._title_match_cache:
+            self._title_match_cache[current_title_text] = bool(title_matcher.match(current_title_text))
+        return self._title_match_cache[current_title_text]
         
     def _find_parent_title(self, para_idx: int) -> Optional[str]:
         """
@@ -665,15 +760,18 @@ class FontChecker:
         Returns:
             str: 标题文本，如果找不到则返回None
         """
-        # 查找当前段落之前的最近标题
-        for i in range(para_idx - 1, 0, -1):
-            para = self.doc.paragraphs[i - 1]  # 索引从0开始，但para_idx从1开始
-            style_name = get_paragraph_style_name(para)
-            
-            # 如果是标题段落
-            if style_name and style_name.startswith(("Heading", "标题")):
-                return para.text.strip()
-                
+        if self._parent_titles is None:
+            # 一次遍历记录每个段落之前最近的标题
+            self._parent_titles = []
+            current_title = None
+            for para in self.doc.paragraphs:
+                self._parent_titles.append(current_title)
+                style_name = get_paragraph_style_name(para)
+                if style_name and style_name.startswith(("Heading", "标题")):
+                    current_title = para.text.strip()
+        
+        if 1 <= para_idx <= len(self._parent_titles):
+            return self._parent_titles[para_idx - 1]
         return None
         
     def check_fonts(self) -> List[CheckResult]:
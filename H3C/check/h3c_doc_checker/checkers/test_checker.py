@@ -4,46 +4,15 @@ from docx import Document
 from docx.text.paragraph import Paragraph
 from docx.table import Table
 import logging
+from h3c_doc_checker.checkers.table_checker import iter_block_items
+from h3c_doc_checker.outline import extract_outline, format_outline
 
 def debug_print_document(doc_path: str) -> None:
-    """调试打印文档的所有内容，包括标题、段落和表格"""
+    """调试打印文档结构，包括标题层级、段落数、表格和字体"""
     doc = Document(doc_path)
     
     print("\n=== 文档结构分析 ===\n")
-    
-    print("【1. 所有段落及其样式】")
-    print("-" * 50)
-    for i, para in enumerate(doc.paragraphs, 1):
-        text = para.text.strip()
-        if text:  # 只打印非空段落
-            style = para.style.name if para.style else "无样式"
-            print(f"段落 {i}:")
-            print(f"  样式: {style}")
-            print(f"  内容: {text}")
-            print(f"  长度: {len(text)} 字符")
-            print("-" * 30)
-    
-    print("\n【2. 所有标题】")
-    print("-" * 50)
-    for i, para in enumerate(doc.paragraphs, 1):
-        style = para.style.name if para.style else "无样式"
-        if style and style.startswith(("Heading", "标题")):
-            print(f"标题 {i}:")
-            print(f"  级别: {style}")
-            print(f"  内容: {para.text.strip()}")
-            print("-" * 30)
-    
-    print("\n【3. 所有表格】")
-    print("-" * 50)
-    for i, table in enumerate(doc.tables, 1):
-        print(f"表格 {i}:")
-        print(f"  行数: {len(table.rows)}")
-        print(f"  列数: {len(table.columns)}")
-        print("  内容:")
-        for row_idx, row in enumerate(table.rows, 1):
-            row_content = " | ".join(cell.text.strip() for cell in row.cells)
-            print(f"    行{row_idx}: {row_content}")
-        print("-" * 30)
+    print(format_outline(extract_outline(doc)))
 
 def find_paragraphs_after_heading(doc: Document, heading_text: str) -> List[Paragraph]:
     """调试用：查找指定标题后的段落"""
@@ -76,37 +45,29 @@ def find_tables_under_heading(doc: Document, heading_text: str) -> List[Table]:
     """调试用：查找指定标题下的表格"""
     tables = []
     heading_found = False
-    next_heading_found = False
     
-    for i, para in enumerate(doc.paragraphs):
-        # 查找标题
-        if not heading_found:
-            if para.text.strip() == heading_text:
-                heading_found = True
-                print(f"\n找到标题: '{heading_text}'")
-            continue
-        
-        # 检查是否到达下一个标题
-        if heading_found and not next_heading_found:
-            if para.style.name and para.style.name.startswith(("Heading", "标题")):
-                next_heading_found = True
+    # 按文档顺序一次遍历段落和表格
+    for block in iter_block_items(doc):
+        if isinstance(block, Paragraph):
+            # 查找标题
+            if not heading_found:
+                if block.text.strip() == heading_text:
+                    heading_found = True
+                    print(f"\n找到标题: '{heading_text}'")
                 continue
-        
-        # 在两个标题之间查找表格
-        try:
-            element = doc._element.body.getchildren()[i]
-            if element.tag.endswith('tbl'):
-                table = Table(element, doc)
-                tables.append(table)
-                print(f"  找到表格: {len(table.rows)}行 x {len(table.columns)}列")
-                # 打印表格内容预览
-                for row_idx, row in enumerate(table.rows[:3], 1):  # 只显示前3行
-                    row_content = " | ".join(cell.text.strip() for cell in row.cells)
-                    print(f"    行{row_idx}: {row_content}")
-                if len(table.rows) > 3:
-                    print("    ...")
-        except Exception as e:
-            continue
+            
+            # 到达下一个标题时停止
+            if block.style and block.style.name.startswith(("Heading", "标题")):
+                break
+        elif heading_found:
+            tables.append(block)
+            print(f"  找到表格: {len(block.rows)}行 x {len(block.columns)}列")
+            # 打印表格内容预览
+            for row_idx, row in enumerate(block.rows[:3], 1):  # 只显示前3行
+                row_content = " | ".join(cell.text.strip() for cell in row.cells)
+                print(f"    行{row_idx}: {row_content}")
+            if len(block.rows) > 3:
+                print("    ...")
     
     if not heading_found:
         print(f"\n未找到标题: '{heading_text}'")
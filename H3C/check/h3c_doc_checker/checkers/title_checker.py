@@ -3,6 +3,7 @@ from typing import Dict, Any, List, Optional
 from docx.document import Document
 from docx.text.paragraph import Paragraph
 from h3c_doc_checker.utils import CheckResult, get_paragraph_style_name, count_chinese_chars
+from h3c_doc_checker.heading_matcher import HeadingMatcher, rule_match_mode
 
 class TitleChecker:
     """标题检查器类"""
@@ -19,7 +20,8 @@ class TitleChecker:
                           {
                               "text": "标题文本",
                               "style_name": "标题样式",
-                              "required": true/false
+                              "required": true/false,
+                              "match": "exact/contains/fuzzy"  # 可选，默认exact
                           },
                           ...
                       ]
@@ -54,19 +56,26 @@ class TitleChecker:
                 details={"location": "配置文件"}
             )
             
+        # 将期望标题索引到匹配器中，每个段落只需一次查找
+        matcher = HeadingMatcher()
+        for i, title_rule in enumerate(expected_titles):
+            matcher.add(i, title_rule.get("text", ""), rule_match_mode(title_rule, "exact"))
+        
         # 遍历所有段落查找标题
         found_titles = {}  # 记录找到的标题
         for para in self.doc.paragraphs:
             text = para.text.strip()
-            style = get_paragraph_style_name(para)
+            if not text:
+                continue
             
             # 检查这个段落是否匹配任何期望的标题
-            for title_rule in expected_titles:
+            for i in matcher.match(text):
+                title_rule = expected_titles[i]
                 expected_text = title_rule.get("text", "").strip()
                 expected_style = title_rule.get("style_name")
                 
                 # 如果文本和样式都匹配，记录这个标题已找到
-                if text == expected_text and (not expected_style or style == expected_style):
+                if not expected_style or get_paragraph_style_name(para) == expected_style:
                     found_titles[expected_text] = True
                     break
         
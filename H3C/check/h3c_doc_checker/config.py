@@ -4,6 +4,7 @@
 import json
 from pathlib import Path
 from typing import Dict, Any, Optional, List
+from .heading_matcher import MATCH_MODES
 
 class Config:
     """文档检查配置类"""
@@ -72,6 +73,7 @@ class Config:
                 raise ValueError(f"标题规则 #{i+1} 必须是一个对象")
             if "text" not in title_rule:
                 raise ValueError(f"标题规则 #{i+1} 必须包含 text 字段")
+            self._validate_match_mode(title_rule, f"标题规则 #{i+1}")
             # style_name 和 required 是可选的
     def _validate_table_rules(self, rules: List[Dict[str, Any]]) -> None:
         """校验表格规则配置"""
@@ -115,6 +117,12 @@ class Config:
             # 检查标题定位方式
             if not any(key in rule for key in ["heading_text_contains", "heading_text_exact"]):
                 raise ValueError("正文规则必须指定 heading_text_contains 或 heading_text_exact")
+            self._validate_match_mode(rule, "正文规则")
+
+    def _validate_match_mode(self, rule: Dict[str, Any], name: str) -> None:
+        """校验规则中可选的标题匹配方式"""
+        if "match" in rule and rule["match"] not in MATCH_MODES:
+            raise ValueError(f"{name} 的 match 必须是以下值之一: {', '.join(MATCH_MODES)}")
 
     def _validate_font_rules(self, rules: Dict[str, Any]) -> None:
         """校验字体规则配置"""
@@ -0,0 +1,172 @@
+"""
+标题匹配模块
+
+统一各检查器的标题匹配逻辑：先对标题做规范化（去除自动编号、全角/半角统一、去除空白），
+再将期望标题索引到哈希表和 Aho-Corasick 字典树中，使每个段落的匹配耗时只与段落长度相关，
+与配置中期望标题的数量无关。
+
+支持的匹配方式（规则中的 match 字段）：
+    exact    规范化后完全相等
+    contains 段落标题包含期望标题
+    fuzzy    段落标题包含期望标题，或期望标题包含段落标题
+"""
+import re
+import unicodedata
+from collections import deque
+from typing import Dict, List, Any, Hashable, Optional, Set
+
+MATCH_MODES = ("exact", "contains", "fuzzy")
+
+# 标题开头的自动编号，如 "4.1.2"、"4.1.2."、"1、"、"(一)"、"第三章"
+_NUMBERING_PATTERN = re.compile(
+    r"^(?:"
+    r"\d+(?:\.\d+)+\.?\s*"
+    r"|\d+[.、)]\s*"
+    r"|\d+\s+"
+    r"|\(?[一二三四五六七八九十百]+[)、.]\s*"
+    r"|\(\d+\)\s*"
+    r"|第[0-9一二三四五六七八九十百]+[章节条部分]+\s*"
+    r")"
+)
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+def normalize_heading(text: str) -> str:
+    """
+    规范化标题文本
+
+    全角字符转半角（NFKC），去除开头的自动编号和所有空白，英文转小写。
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).strip()
+    text = _NUMBERING_PATTERN.sub("", text, count=1)
+    return _WHITESPACE_PATTERN.sub("", text).lower()
+
+class _AhoCorasick:
+    """Aho-Corasick 自动机，用于在一次扫描中找出文本包含的所有期望标题"""
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Hashable]] = [[]]
+        self._built = True
+
+    def add(self, pattern: str, key: Hashable) -> None:
+        """添加一个模式串"""
+        node = 0
+        for char in pattern:
+            nxt = self.goto[node].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = nxt
+        self.output[node].append(key)
+        self._built = False
+
+    def build(self) -> None:
+        """构建失败指针"""
+        queue = deque(self.goto[0].values())
+        for node in queue:
+            self.fail[node] = 0
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+        self._built = True
+
+    def search(self, text: str) -> List[Hashable]:
+        """返回文本中出现的所有模式串对应的键"""
+        if not self._built:
+            self.build()
+        found: List[Hashable] = []
+        node = 0
+        for char in text:
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            if self.output[node]:
+                found.extend(self.output[node])
+        return found
+
+class HeadingMatcher:
+    """
+    标题匹配器
+
+    用法：
+        matcher = HeadingMatcher()
+        matcher.add("适用产品", "适用产品", mode="exact")
+        matcher.match("4.1.2 适用产品")  # -> ["适用产品"]
+    """
+
+    def __init__(self):
+        self._exact: Dict[str, List[Hashable]] = {}
+        self._contains = _AhoCorasick()
+        # fuzzy 模式的反向匹配：期望标题的所有子串 -> 键
+        self._substrings: Dict[str, List[Hashable]] = {}
+        self._order: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def add(self, key: Hashable, text: str, mode: str = "exact") -> None:
+        """
+        添加一个期望标题
+
+        Args:
+            key: 匹配成功时返回的键（如规则下标或标题文本）
+            text: 期望标题文本
+            mode: 匹配方式，exact / contains / fuzzy
+        """
+        if mode not in MATCH_MODES:
+            raise ValueError(f"不支持的标题匹配方式: {mode}，可选值: {', '.join(MATCH_MODES)}")
+        normalized = normalize_heading(text)
+        if not normalized:
+            return
+        self._order.setdefault(key, len(self._order))
+
+        if mode == "exact":
+            self._exact.setdefault(normalized, []).append(key)
+            return
+
+        self._contains.add(normalized, key)
+        if mode == "fuzzy":
+            length = len(normalized)
+            for start in range(length):
+                for end in range(start + 1, length + 1):
+                    keys = self._substrings.setdefault(normalized[start:end], [])
+                    if key not in keys:
+                        keys.append(key)
+
+    def match(self, text: str) -> List[Hashable]:
+        """
+        返回与标题文本匹配的所有键，按添加顺序排列
+
+        Args:
+            text: 文档中的标题文本
+        """
+        normalized = normalize_heading(text)
+        if not normalized:
+            return []
+
+        keys: Set[Hashable] = set(self._exact.get(normalized, ()))
+        keys.update(self._contains.search(normalized))
+        keys.update(self._substrings.get(normalized, ()))
+        return sorted(keys, key=self._order.__getitem__)
+
+    def first(self, text: str) -> Optional[Hashable]:
+        """返回第一个匹配的键，没有匹配时返回 None"""
+        keys = self.match(text)
+        return keys[0] if keys else None
+
+def rule_match_mode(rule: Dict[str, Any], default: str = "exact") -> str:
+    """读取规则中的 match 字段，未设置时返回默认匹配方式"""
+    return rule.get("match") or default
@@ -60,6 +60,26 @@ def launch_gui():
         logging.error(f"GUI启动失败: {str(e)}")
         raise
 
+def resolve_config_path(config_path: str = None) -> Path:
+    """
+    解析配置文件路径，未指定时使用默认配置目录中的第一个配置文件
+
+    Args:
+        config_path: 配置文件路径（可选）
+
+    Returns:
+        实际使用的配置文件路径
+    """
+    if config_path:
+        return Path(config_path)
+
+    # 使用实际存在的配置文件
+    default_config_dir = Path(__file__).parent / "config"
+    config_files = list(default_config_dir.glob("*.json"))
+    if config_files:
+        return config_files[0]  # 使用第一个找到的配置文件
+    raise FileNotFoundError("未找到任何配置文件")
+
 def check_single_document(doc_path: str, config_path: str = None) -> List[CheckResult]:
     """
     检查单个文档
@@ -73,22 +93,13 @@ def check_single_document(doc_path: str, config_path: str = None) -> List[CheckR
     """
     try:
         # 加载配置
-        if not config_path:
-            # 使用实际存在的配置文件
-            default_config_dir = Path(__file__).parent / "config"
-            config_files = list(default_config_dir.glob("*.json"))
-            if config_files:
-                effective_config_path = config_files[0]  # 使用第一个找到的配置文件
-            else:
-                raise FileNotFoundError("未找到任何配置文件")
-        else:
-            effective_config_path = Path(config_path)
+        effective_config_path = resolve_config_path(config_path)
 
         config = Config(effective_config_path)
         config.validate()
 
         # 创建批处理器
-        processor = BatchProcessor(config_path=config_path)
+        processor = BatchProcessor(config_path=effective_config_path)
         
         # 执行检查
         doc_result = processor.process_document(doc_path)
@@ -174,9 +185,190 @@ def parse_arguments():
         "-c", "--config",
         help="配置文件路径（可选）"
     )
+    batch_parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=4,
+        help="并发线程数（默认4）"
+    )
+    batch_parser.add_argument(
+        "--db",
+        help="结果数据库路径（可选），指定时将检查结果写入SQLite"
+    )
+
+    # 导出文档结构
+    dump_parser = subparsers.add_parser("dump", help="导出文档结构（标题、段落、表格、字体）")
+    dump_parser.add_argument(
+        "-f", "--file",
+        required=True,
+        help="要分析的Word文档路径"
+    )
+    dump_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="以JSON格式输出"
+    )
+    dump_parser.add_argument(
+        "-o", "--output",
+        help="输出文件路径（可选，默认输出到控制台）"
+    )
+
+    # 扫描Vendor目录
+    scan_parser = subparsers.add_parser("scan", help="扫描Vendor目录的文档完整性并检查其中的Word文档")
+    scan_parser.add_argument(
+        "-b", "--base-path",
+        default=None,
+        help="Vendor根目录（默认 /HDD_Raid/SVN_MODEL_REPO/Vendor）"
+    )
+    scan_parser.add_argument(
+        "--vendors",
+        nargs="+",
+        help="要扫描的厂商目录（默认全部厂商）"
+    )
+    scan_parser.add_argument(
+        "-c", "--config",
+        help="配置文件路径（可选）"
+    )
+    scan_parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=4,
+        help="文档检查并发线程数（默认4）"
+    )
+    scan_parser.add_argument(
+        "--db",
+        help="结果数据库路径（可选），指定时将检查结果写入SQLite"
+    )
+    scan_parser.add_argument(
+        "--no-check",
+        action="store_true",
+        help="只检查文档完整性，不检查Word文档内容"
+    )
+
+    # 查询结果数据库
+    query_parser = subparsers.add_parser("query", help="查询结果数据库")
+    query_parser.add_argument(
+        "report",
+        choices=["failures", "trend", "top"],
+        help="报告类型: failures=失败项明细, trend=失败数量趋势, top=最常失败的检查项"
+    )
+    query_parser.add_argument(
+        "--db",
+        required=True,
+        help="结果数据库路径"
+    )
+    query_parser.add_argument("-t", "--type", help="检查类型，如 表格检查")
+    query_parser.add_argument("-l", "--location", help="位置（标题文本）前缀，如 适用产品")
+    query_parser.add_argument("-c", "--config", help="配置文件路径")
+    query_parser.add_argument("--since", help="起始日期（含），如 2024-12-01")
+    query_parser.add_argument("--until", help="截止日期（不含），如 2025-01-01")
+    query_parser.add_argument("-n", "--limit", type=int, help="最多显示的条数")
 
     return parser.parse_args()
 
+def run_batch(directory: str, config_path: str = None, workers: int = 4, db_path: str = None) -> int:
+    """
+    批量检查目录下的所有Word文档
+
+    Returns:
+        int: 退出码，0表示全部通过，1表示有失败项
+    """
+    doc_paths = sorted(
+        str(p) for p in Path(directory or ".").rglob("*.docx") if not p.name.startswith("~$")
+    )
+    if not doc_paths:
+        print(f"目录中未找到Word文档: {directory}")
+        return 0
+
+    processor = BatchProcessor(resolve_config_path(config_path))
+    results = processor.process_batch(doc_paths, max_workers=workers, db_path=db_path)
+
+    print("\n=== 批量检查完成 ===\n")
+    for doc in results["documents"]:
+        status = "✓" if doc.get("passed") else "✗"
+        print(f"[{status}] {doc['file']}")
+        if "error" in doc:
+            print(f"   错误: {doc['error']}")
+    print(f"\n总计: {results['total']} 个文档, 通过: {results['passed']} 个, 失败: {results['failed']} 个")
+    if db_path:
+        print(f"结果已写入数据库: {db_path}")
+
+    return 1 if results["failed"] > 0 else 0
+
+def run_dump(args) -> int:
+    """导出文档结构"""
+    from h3c_doc_checker.outline import extract_outline, format_outline
+
+    outline = extract_outline(load_document(args.file))
+    outline = {"file": str(args.file), **outline}
+    text = format_outline(outline, as_json=args.json)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+        print(f"文档结构已保存到: {args.output}")
+    else:
+        print(text)
+    return 0
+
+def run_scan(args) -> int:
+    """
+    扫描Vendor目录并检查发现的Word文档
+
+    Returns:
+        int: 退出码，0表示完整性和文档检查全部通过，1表示有失败项
+    """
+    from h3c_doc_checker.vendor_scanner import (
+        VendorScanner, DEFAULT_BASE_PATH, collect_docx_files, format_scan_report
+    )
+
+    scanner = VendorScanner(args.base_path or DEFAULT_BASE_PATH, args.vendors)
+    scan_result = scanner.scan()
+
+    print("\n=== 文档完整性检查 ===\n")
+    print(format_scan_report(scan_result))
+    exit_code = 1 if scan_result["failed"] > 0 else 0
+
+    if args.no_check:
+        return exit_code
+
+    doc_paths = collect_docx_files(scan_result)
+    if not doc_paths:
+        print("\n未发现需要检查的Word文档")
+        return exit_code
+
+    processor = BatchProcessor(resolve_config_path(args.config))
+    results = processor.process_batch(doc_paths, max_workers=args.workers, db_path=args.db)
+
+    print("\n=== 文档内容检查 ===\n")
+    for doc in results["documents"]:
+        if not doc.get("passed"):
+            print(f"[✗] {doc['file']}")
+            if "error" in doc:
+                print(f"   错误: {doc['error']}")
+    print(f"\n总计: {results['total']} 个文档, 通过: {results['passed']} 个, 失败: {results['failed']} 个")
+    if args.db:
+        print(f"结果已写入数据库: {args.db}")
+
+    return 1 if exit_code or results["failed"] > 0 else 0
+
+def run_query(args) -> int:
+    """执行结果数据库查询"""
+    from h3c_doc_checker.results_db import ResultsDatabase, format_rows
+
+    if not Path(args.db).exists():
+        print(f"数据库不存在: {args.db}")
+        return 1
+
+    config = str(Path(args.config).resolve()) if args.config else None
+    with ResultsDatabase(args.db) as db:
+        if args.report == "failures":
+            rows = db.query_failures(args.type, args.location, config, args.since, args.until, args.limit)
+        elif args.report == "trend":
+            rows = db.query_trend(args.type, config, args.since, args.until)
+        else:
+            rows = db.query_top_failures(config, args.since, args.until, args.limit or 20)
+    print(format_rows(rows))
+    return 0
+
 def main():
     """主函数"""
     try:
@@ -192,11 +384,13 @@ def main():
             
             return output_check_results(results, total, passed, failed)
         elif args.command == "batch":
-            from h3c_doc_checker.batch_processor import BatchProcessor
-            processor = BatchProcessor(args.config)
-            # 这里可以添加批量处理逻辑
-            print("批量处理功能正在开发中...")
-            return 0
+            return run_batch(args.directory, args.config, args.workers, args.db)
+        elif args.command == "dump":
+            return run_dump(args)
+        elif args.command == "scan":
+            return run_scan(args)
+        elif args.command == "query":
+            return run_query(args)
         else:
             # 如果没有指定命令，默认启动GUI
             return launch_gui()
@@ -0,0 +1,212 @@
+"""
+文档结构提取模块
+
+对文档 body 做一次流式遍历，提取标题层级、各章节段落数、表格尺寸与表头以及章节内使用的字体，
+用于编写新配置时快速了解文档结构。直接读取 XML 元素，不为每个段落创建 python-docx 对象。
+"""
+import json
+import re
+from collections import Counter
+from typing import Dict, Any, List, Optional
+from docx.document import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml.ns import qn
+
+W_P = qn("w:p")
+W_TBL = qn("w:tbl")
+W_TR = qn("w:tr")
+W_TC = qn("w:tc")
+W_T = qn("w:t")
+W_R = qn("w:r")
+W_VAL = qn("w:val")
+W_EAST_ASIA = qn("w:eastAsia")
+W_ASCII = qn("w:ascii")
+
+HEADING_STYLE_PATTERN = re.compile(r"^(?:Heading|标题)\s*(\d+)$")
+
+def _heading_level(style_name: str) -> int:
+    """根据样式名称返回标题级别，非标题返回0"""
+    if not style_name:
+        return 0
+    match = HEADING_STYLE_PATTERN.match(style_name)
+    if match:
+        return int(match.group(1))
+    if style_name in ("Title", "标题"):
+        return 1
+    return 0
+
+def _element_text(element) -> str:
+    """拼接元素下所有 w:t 的文本"""
+    return "".join(t.text or "" for t in element.iter(W_T))
+
+class OutlineExtractor:
+    """文档结构提取器"""
+
+    def __init__(self, doc: Document):
+        """
+        初始化结构提取器
+
+        Args:
+            doc: Word文档对象
+        """
+        self.doc = doc
+        self._styles = {style.style_id: style for style in doc.styles}
+        self._style_fonts: Dict[Optional[str], Dict[str, Any]] = {}
+        default_style = doc.styles.default(WD_STYLE_TYPE.PARAGRAPH)
+        self._default_style_id = default_style.style_id if default_style is not None else None
+
+    def _style_font(self, style_id: Optional[str]) -> Dict[str, Any]:
+        """获取段落样式的字体设置（按样式缓存）"""
+        style_id = style_id or self._default_style_id
+        if style_id in self._style_fonts:
+            return self._style_fonts[style_id]
+
+        font: Dict[str, Any] = {"east_asia": None, "ascii": None, "size": None}
+        style = self._styles.get(style_id)
+        while style is not None and None in font.values():
+            rpr = style.element.rPr
+            if rpr is not None:
+                rfonts = rpr.find(qn("w:rFonts"))
+                if rfonts is not None:
+                    font["east_asia"] = font["east_asia"] or rfonts.get(W_EAST_ASIA)
+                    font["ascii"] = font["ascii"] or rfonts.get(W_ASCII)
+                sz = rpr.find(qn("w:sz"))
+                if font["size"] is None and sz is not None and sz.get(W_VAL):
+                    font["size"] = float(sz.get(W_VAL)) / 2
+            style = style.base_style
+        self._style_fonts[style_id] = font
+        return font
+
+    def _new_section(self, heading: Optional[str], level: int, style: Optional[str],
+                     index: Optional[int]) -> Dict[str, Any]:
+        """创建一个章节记录"""
+        return {
+            "heading": heading,
+            "level": level,
+            "style": style,
+            "paragraph_index": index,
+            "paragraphs": 0,
+            "tables": [],
+            "fonts": Counter(),
+            "font_sizes": Counter()
+        }
+
+    def extract(self) -> Dict[str, Any]:
+        """
+        一次遍历提取文档结构
+
+        Returns:
+            文档结构字典，sections 中每一项对应一个标题及其下属内容
+        """
+        body = self.doc.element.body
+        sections: List[Dict[str, Any]] = []
+        current = self._new_section(None, 0, None, None)
+        paragraph_index = 0
+        table_index = 0
+
+        for child in body.iterchildren():
+            if child.tag == W_P:
+                paragraph_index += 1
+                ppr = child.pPr
+                style_id = ppr.pStyle.val if ppr is not None and ppr.pStyle is not None else None
+                style = self._styles.get(style_id)
+                style_name = style.name if style is not None else style_id
+                level = _heading_level(style_name)
+                text = _element_text(child).strip()
+
+                if level and text:
+                    sections.append(current)
+                    current = self._new_section(text, level, style_name, paragraph_index)
+                    continue
+
+                if text:
+                    current["paragraphs"] += 1
+                    self._collect_fonts(child, style_id, current)
+
+            elif child.tag == W_TBL:
+                table_index += 1
+                rows = [tr for tr in child.iterchildren(W_TR)]
+                columns = max((sum(1 for _ in tr.iterchildren(W_TC)) for tr in rows), default=0)
+                header = [_element_text(tc).strip() for tc in rows[0].iterchildren(W_TC)] if rows else []
+                current["tables"].append({
+                    "index": table_index,
+                    "rows": len(rows),
+                    "columns": columns,
+                    "header": header
+                })
+
+        sections.append(current)
+        # 文档开头没有任何内容时省略该章节
+        if not sections[0]["paragraphs"] and not sections[0]["tables"]:
+            sections.pop(0)
+
+        for section in sections:
+            section["fonts"] = dict(section["fonts"].most_common())
+            section["font_sizes"] = {str(k): v for k, v in section["font_sizes"].most_common()}
+
+        return {
+            "paragraphs": paragraph_index,
+            "tables": table_index,
+            "headings": sum(1 for s in sections if s["level"]),
+            "sections": sections
+        }
+
+    def _collect_fonts(self, paragraph, style_id: Optional[str], section: Dict[str, Any]) -> None:
+        """统计段落中各 run 实际使用的字体和字号"""
+        style_font = self._style_font(style_id)
+        for run in paragraph.iter(W_R):
+            text = "".join(t.text or "" for t in run.iterchildren(W_T))
+            if not text.strip():
+                continue
+            east_asia = style_font["east_asia"]
+            ascii_font = style_font["ascii"]
+            size = style_font["size"]
+            rpr = run.rPr
+            if rpr is not None:
+                rfonts = rpr.find(qn("w:rFonts"))
+                if rfonts is not None:
+                    east_asia = rfonts.get(W_EAST_ASIA) or east_asia
+                    ascii_font = rfonts.get(W_ASCII) or ascii_font
+                sz = rpr.find(qn("w:sz"))
+                if sz is not None and sz.get(W_VAL):
+                    size = float(sz.get(W_VAL)) / 2
+            for font in {east_asia, ascii_font}:
+                if font:
+                    section["fonts"][font] += 1
+            if size is not None:
+                section["font_sizes"][size] += 1
+
+def extract_outline(doc: Document) -> Dict[str, Any]:
+    """提取文档结构"""
+    return OutlineExtractor(doc).extract()
+
+def format_outline(outline: Dict[str, Any], as_json: bool = False) -> str:
+    """
+    格式化文档结构
+
+    Args:
+        outline: extract_outline 的返回值
+        as_json: 是否输出JSON格式
+    """
+    if as_json:
+        return json.dumps(outline, ensure_ascii=False, indent=2)
+
+    lines = [
+        f"段落总数: {outline['paragraphs']}, 表格总数: {outline['tables']}, 标题总数: {outline['headings']}",
+        ""
+    ]
+    for section in outline["sections"]:
+        indent = "  " * max(section["level"] - 1, 0)
+        heading = section["heading"] or "[文档开头]"
+        style = f" ({section['style']})" if section["style"] else ""
+        lines.append(f"{indent}{heading}{style}  段落: {section['paragraphs']}")
+        for table in section["tables"]:
+            header = " | ".join(cell if len(cell) <= 30 else cell[:30] + "..." for cell in table["header"])
+            lines.append(f"{indent}  表格{table['index']}: {table['rows']}行 x {table['columns']}列  表头: {header}")
+        if section["fonts"]:
+            fonts = ", ".join(f"{name}({count})" for name, count in section["fonts"].items())
+            lines.append(f"{indent}  字体: {fonts}")
+        if section["font_sizes"]:
+            sizes = ", ".join(f"{size}pt({count})" for size, count in section["font_sizes"].items())
+            lines.append(f"{indent}  字号: {sizes}")
+    return "\n".join(lines)
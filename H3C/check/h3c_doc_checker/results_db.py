@@ -0,0 +1,259 @@
+"""
+检查结果数据库模块
+
+将批量检查结果持久化到 SQLite，便于按检查类型、位置、配置和日期查询失败项及趋势。
+"""
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    config TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    passed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    document_id INTEGER NOT NULL REFERENCES documents(id),
+    checker_type TEXT NOT NULL,
+    location TEXT,
+    passed INTEGER NOT NULL,
+    message TEXT,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_config_date ON runs(config, started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_date ON runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_results_type_location ON results(checker_type, location, passed);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results(run_id, passed);
+CREATE INDEX IF NOT EXISTS idx_results_document ON results(document_id);
+"""
+
+# 文档加载失败时记录的检查类型
+LOAD_ERROR_TYPE = "文档加载"
+
+class ResultsDatabase:
+    """检查结果数据库"""
+
+    def __init__(self, db_path: str | Path, flush_size: int = 5000):
+        """
+        初始化结果数据库
+
+        Args:
+            db_path: SQLite 数据库文件路径，不存在时自动创建
+            flush_size: 缓冲的结果行数达到该值时批量写入一次
+        """
+        self.db_path = Path(db_path)
+        self.flush_size = flush_size
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        # WAL + NORMAL 同步在批量写入时吞吐量更高，且崩溃后数据库仍保持一致
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._document_ids: Dict[str, int] = {}
+        self._pending: List[Tuple] = []
+        self._run_id: Optional[int] = None
+
+    def close(self) -> None:
+        """刷新缓冲并关闭数据库"""
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self) -> "ResultsDatabase":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+    def start_run(self, config: str) -> int:
+        """开始一次批量检查运行，返回运行ID"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (started_at, config) VALUES (?, ?)",
+                (datetime.now().isoformat(timespec="seconds"), str(config))
+            )
+        self._run_id = cursor.lastrowid
+        return self._run_id
+
+    def finish_run(self, total: int, passed: int, failed: int) -> None:
+        """结束当前运行并写入汇总数据"""
+        self.flush()
+        with self.conn:
+            self.conn.execute(
+                "UPDATE runs SET finished_at = ?, total = ?, passed = ?, failed = ? WHERE id = ?",
+                (datetime.now().isoformat(timespec="seconds"), total, passed, failed, self._run_id)
+            )
+        self._run_id = None
+
+    def add_document_result(self, doc_result: Dict[str, Any]) -> None:
+        """
+        缓冲单个文档的检查结果（process_document 的返回值）
+
+        Args:
+            doc_result: 包含 file、passed、results 或 error 字段的字典
+        """
+        if self._run_id is None:
+            raise RuntimeError("请先调用 start_run 开始一次运行")
+
+        document_id = self._get_document_id(doc_result["file"])
+        if "error" in doc_result:
+            self._pending.append((
+                self._run_id, document_id, LOAD_ERROR_TYPE, None, 0, doc_result["error"], None
+            ))
+        for result in doc_result.get("results", []):
+            details = result.get("details") or {}
+            location = details.get("location") if isinstance(details, dict) else None
+            self._pending.append((
+                self._run_id,
+                document_id,
+                result.get("type"),
+                location,
+                1 if result.get("passed") else 0,
+                result.get("message"),
+                json.dumps(details, ensure_ascii=False, default=str) if details else None
+            ))
+
+        if len(self._pending) >= self.flush_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """在单个事务中批量写入缓冲的结果"""
+        if not self._pending:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO results (run_id, document_id, checker_type, location, passed, message, details) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._pending
+            )
+        self._pending = []
+
+    def _get_document_id(self, path: str) -> int:
+        """获取文档ID，不存在时插入"""
+        path = str(path)
+        document_id = self._document_ids.get(path)
+        if document_id is None:
+            self.conn.execute("INSERT OR IGNORE INTO documents (path) VALUES (?)", (path,))
+            document_id = self.conn.execute(
+                "SELECT id FROM documents WHERE path = ?", (path,)
+            ).fetchone()[0]
+            self._document_ids[path] = document_id
+        return document_id
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+    def query_failures(self, checker_type: Optional[str] = None, location: Optional[str] = None,
+                       config: Optional[str] = None, since: Optional[str] = None,
+                       until: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        查询失败的检查项
+
+        Args:
+            checker_type: 检查类型，如 "表格检查"
+            location: 位置（标题文本）前缀，如 "适用产品"
+            config: 配置文件路径
+            since: 起始日期（含），ISO 格式，如 "2024-12-01"
+            until: 截止日期（不含），ISO 格式
+            limit: 最多返回的条数
+
+        Returns:
+            失败项列表，按运行时间倒序
+        """
+        clauses, params = self._run_filters(config, since, until)
+        clauses.append("r.passed = 0")
+        if checker_type:
+            clauses.append("r.checker_type = ?")
+            params.append(checker_type)
+        if location:
+            # 位置通常形如 "适用产品#表格1"，按前缀匹配以命中索引
+            clauses.append("r.location >= ? AND r.location < ?")
+            params.extend([location, location + "\uffff"])
+
+        sql = (
+            "SELECT runs.started_at, runs.config, d.path, r.checker_type, r.location, r.message "
+            "FROM results r JOIN runs ON runs.id = r.run_id JOIN documents d ON d.id = r.document_id "
+            f"WHERE {' AND '.join(clauses)} ORDER BY runs.started_at DESC, d.path"
+        )
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def query_trend(self, checker_type: Optional[str] = None, config: Optional[str] = None,
+                    since: Optional[str] = None, until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        按运行统计失败数量趋势
+
+        Returns:
+            每次运行一条记录，包含运行时间、文档数、失败文档数和失败检查项数
+        """
+        clauses, params = self._run_filters(config, since, until)
+        join_filter = "AND r.checker_type = ?" if checker_type else ""
+        if checker_type:
+            params.insert(0, checker_type)
+
+        sql = (
+            "SELECT runs.id AS run_id, runs.started_at, runs.config, runs.total, runs.failed AS failed_documents, "
+            "COUNT(r.id) AS failed_checks "
+            f"FROM runs LEFT JOIN results r ON r.run_id = runs.id AND r.passed = 0 {join_filter} "
+            f"WHERE {' AND '.join(clauses)} GROUP BY runs.id ORDER BY runs.started_at"
+        )
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def query_top_failures(self, config: Optional[str] = None, since: Optional[str] = None,
+                           until: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """按检查类型和位置统计最常失败的检查项"""
+        clauses, params = self._run_filters(config, since, until)
+        clauses.append("r.passed = 0")
+        sql = (
+            "SELECT r.checker_type, r.location, COUNT(*) AS failures, COUNT(DISTINCT r.document_id) AS documents "
+            "FROM results r JOIN runs ON runs.id = r.run_id "
+            f"WHERE {' AND '.join(clauses)} "
+            "GROUP BY r.checker_type, r.location ORDER BY failures DESC LIMIT ?"
+        )
+        params.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    @staticmethod
+    def _run_filters(config: Optional[str], since: Optional[str],
+                     until: Optional[str]) -> Tuple[List[str], List[Any]]:
+        """构造运行级别的过滤条件"""
+        clauses: List[str] = ["1 = 1"]
+        params: List[Any] = []
+        if config:
+            clauses.append("runs.config = ?")
+            params.append(str(config))
+        if since:
+            clauses.append("runs.started_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("runs.started_at < ?")
+            params.append(until)
+        return clauses, params
+
+def format_rows(rows: Iterable[Dict[str, Any]]) -> str:
+    """将查询结果格式化为制表符分隔的文本"""
+    rows = list(rows)
+    if not rows:
+        return "无匹配记录"
+    headers = list(rows[0].keys())
+    lines = ["\t".join(headers)]
+    for row in rows:
+        lines.append("\t".join("" if row[h] is None else str(row[h]).replace("\n", " ") for h in headers))
+    return "\n".join(lines)
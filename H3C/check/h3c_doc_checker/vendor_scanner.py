@@ -0,0 +1,191 @@
+"""
+Vendor目录扫描模块
+
+按厂商目录规范（Vendor/厂商/模型/.../训练类型/版本/doc）查找所有版本目录，
+统计doc文件夹中的Word和PDF文档完整性，并可将发现的.docx文档直接交给BatchProcessor检查。
+与 release/check_doc_files.sh 的检查规则保持一致。
+"""
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterator
+
+# 默认的Vendor根目录和厂商列表
+DEFAULT_BASE_PATH = "/HDD_Raid/SVN_MODEL_REPO/Vendor"
+DEFAULT_VENDORS = ["Cambricon", "Enflame", "Iluvatar", "Kunlunxin", "MetaX", "Moffett"]
+
+# 版本目录名称，如 v1.0、V2.1
+VERSION_DIR_PATTERN = re.compile(r"^[vV][0-9]+(\.[0-9]+)*$")
+
+# 版本目录的上级目录必须是以下训练类型之一（不区分大小写）
+TRAINING_TYPE_DIRS = {
+    "inference", "inferece", "training", "推理", "训练", "pre-training", "pre_training",
+    "lora_fine-tuning", "lora_fine-tuing", "fine-tuning", "sft_fine-tuning", "微调", "预训练"
+}
+
+WORD_SUFFIXES = (".doc", ".docx")
+PDF_SUFFIXES = (".pdf",)
+
+def _iter_version_dirs(root: str) -> Iterator[os.DirEntry]:
+    """
+    基于 os.scandir 遍历目录，产出符合规范的版本目录
+
+    找到版本目录后不再向下遍历，避免扫描版本目录中的大量模型文件。
+    """
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        parent_name = os.path.basename(current).lower()
+        try:
+            with os.scandir(current) as entries:
+                subdirs = [e for e in entries if e.is_dir(follow_symlinks=False) and e.name != ".svn"]
+        except OSError:
+            continue
+
+        for entry in subdirs:
+            if VERSION_DIR_PATTERN.match(entry.name) and parent_name in TRAINING_TYPE_DIRS:
+                yield entry
+            else:
+                stack.append(entry.path)
+
+def _list_doc_files(doc_dir: str) -> Dict[str, List[str]]:
+    """列出doc文件夹（仅第一层）中的Word和PDF文档"""
+    files: Dict[str, List[str]] = {"word": [], "pdf": []}
+    with os.scandir(doc_dir) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            name = entry.name.lower()
+            if name.endswith(WORD_SUFFIXES):
+                files["word"].append(entry.path)
+            elif name.endswith(PDF_SUFFIXES):
+                files["pdf"].append(entry.path)
+    files["word"].sort()
+    files["pdf"].sort()
+    return files
+
+class VendorScanner:
+    """Vendor目录文档完整性扫描器"""
+
+    def __init__(self, base_path: str = DEFAULT_BASE_PATH, vendors: Optional[List[str]] = None):
+        """
+        初始化扫描器
+
+        Args:
+            base_path: Vendor根目录
+            vendors: 要扫描的厂商目录名称列表，默认使用 DEFAULT_VENDORS
+        """
+        self.base_path = Path(base_path)
+        self.vendors = vendors or DEFAULT_VENDORS
+
+    def scan_vendor(self, vendor: str) -> Dict[str, Any]:
+        """
+        扫描单个厂商目录
+
+        Returns:
+            厂商统计结果，包含版本目录列表及Word/PDF文档情况
+        """
+        vendor_path = self.base_path / vendor
+        result = {
+            "vendor": vendor,
+            "exists": vendor_path.is_dir(),
+            "versions": [],
+            "version_dirs": 0,
+            "word_dirs": 0,
+            "pdf_dirs": 0,
+            "passed": False
+        }
+        if not result["exists"]:
+            return result
+
+        with os.scandir(vendor_path) as entries:
+            model_dirs = sorted(
+                e.path for e in entries if e.is_dir(follow_symlinks=False) and e.name != ".svn"
+            )
+
+        for model_dir in model_dirs:
+            model_name = os.path.basename(model_dir)
+            for version_entry in _iter_version_dirs(model_dir):
+                doc_dir = os.path.join(version_entry.path, "doc")
+                # 与 check_doc_files.sh 一致：只统计包含doc文件夹的版本目录
+                if not os.path.isdir(doc_dir):
+                    continue
+                files = _list_doc_files(doc_dir)
+                result["versions"].append({
+                    "model": model_name,
+                    "path": version_entry.path,
+                    "training_type": os.path.basename(os.path.dirname(version_entry.path)),
+                    "version": version_entry.name,
+                    "word_files": files["word"],
+                    "pdf_files": files["pdf"]
+                })
+
+        result["versions"].sort(key=lambda v: v["path"])
+        result["version_dirs"] = len(result["versions"])
+        result["word_dirs"] = sum(1 for v in result["versions"] if v["word_files"])
+        result["pdf_dirs"] = sum(1 for v in result["versions"] if v["pdf_files"])
+        result["passed"] = (
+            result["version_dirs"] > 0
+            and result["version_dirs"] == result["word_dirs"] == result["pdf_dirs"]
+        )
+        return result
+
+    def scan(self, max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        并行扫描所有厂商目录
+
+        Args:
+            max_workers: 并发线程数，默认每个厂商一个线程
+
+        Returns:
+            扫描汇总结果
+        """
+        if not self.base_path.is_dir():
+            raise FileNotFoundError(f"基础路径不存在: {self.base_path}")
+
+        workers = max_workers or len(self.vendors) or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            vendor_results = list(executor.map(self.scan_vendor, self.vendors))
+
+        return {
+            "base_path": str(self.base_path),
+            "vendors": vendor_results,
+            "passed": sum(1 for v in vendor_results if v["passed"]),
+            "failed": sum(1 for v in vendor_results if not v["passed"])
+        }
+
+def collect_docx_files(scan_result: Dict[str, Any]) -> List[str]:
+    """从扫描结果中提取可由 python-docx 检查的 .docx 文档"""
+    return [
+        path
+        for vendor in scan_result["vendors"]
+        for version in vendor["versions"]
+        for path in version["word_files"]
+        if path.lower().endswith(".docx") and not os.path.basename(path).startswith("~$")
+    ]
+
+def format_scan_report(scan_result: Dict[str, Any]) -> str:
+    """格式化扫描结果为易读的字符串"""
+    lines = []
+    for vendor in scan_result["vendors"]:
+        status = "通过✓" if vendor["passed"] else "未通过✗"
+        lines.append(f"📁 {vendor['vendor']}: {status}")
+        if not vendor["exists"]:
+            lines.append("  厂商目录不存在")
+            continue
+        lines.append(f"  版本目录数量: {vendor['version_dirs']}")
+        lines.append(f"  Word文件数量: {vendor['word_dirs']}")
+        lines.append(f"  PDF文件数量: {vendor['pdf_dirs']}")
+        for version in vendor["versions"]:
+            missing = []
+            if not version["word_files"]:
+                missing.append("Word")
+            if not version["pdf_files"]:
+                missing.append("PDF")
+            if missing:
+                lines.append(f"  ✗ 缺少{'/'.join(missing)}文档: {version['path']}")
+    lines.append("")
+    lines.append(f"厂商总数: {len(scan_result['vendors'])}, "
+                 f"通过: {scan_result['passed']}, 未通过: {scan_result['failed']}")
+    return "\n".join(lines)
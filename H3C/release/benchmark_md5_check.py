@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MD5校验基准测试：check_md5_optimized.sh 与 check_md5_parallel.py 对比
+
+在临时目录下生成与 SVN_MODEL_REPO 相同结构的测试树（Model/Vendor 下若干目录，
+每个目录包含大小不一的文件和 compass_folder.sh 格式的 md5sums.txt），
+然后分别运行 shell 版本和 Python 版本并比较耗时与统计结果。
+shell 脚本中的仓库路径和日志路径写死为 /HDD_Raid，测试时复制一份并替换为临时目录。
+
+用法:
+    python benchmark_md5_check.py
+    python benchmark_md5_check.py -d 40 -f 20 --max-size 64 -t 8
+    python benchmark_md5_check.py --keep --work-dir /tmp/md5_bench
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+SHELL_SCRIPT = SCRIPT_DIR / "check_md5_optimized.sh"
+PYTHON_SCRIPT = SCRIPT_DIR / "check_md5_parallel.py"
+REPO_DIR = "/HDD_Raid/SVN_MODEL_REPO"
+LOG_DIR = "/HDD_Raid/log/md5_checks"
+
+def generate_tree(base, dirs, files, max_size_mb, seed=0):
+    """
+    生成测试树，文件大小在 1KB 到 max_size_mb 之间按对数分布，模拟少量大文件和大量小文件
+
+    Returns:
+        (文件数, 总字节数)
+    """
+    rng = random.Random(seed)
+    block = os.urandom(1024 * 1024)
+    count = 0
+    total = 0
+    for i in range(dirs):
+        top = "Model" if i % 4 else "Vendor"
+        directory = base / top / f"dir_{i:03d}" / "release"
+        directory.mkdir(parents=True, exist_ok=True)
+        lines = []
+        for j in range(files):
+            size = int(2 ** rng.uniform(10, 20 + max(max_size_mb, 1).bit_length() - 1))
+            size = min(size, max_size_mb * 1024 * 1024)
+            md5 = hashlib.md5()
+            path = directory / f"file_{j:03d}.bin"
+            with open(path, 'wb') as f:
+                remaining = size
+                while remaining:
+                    chunk = block[:min(remaining, len(block))]
+                    f.write(chunk)
+                    md5.update(chunk)
+                    remaining -= len(chunk)
+            lines.append(f"{md5.hexdigest()}  ./{path.name}\n")
+            count += 1
+            total += size
+        with open(directory / "md5sums.txt", 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+    return count, total
+
+def corrupt_one(base):
+    """修改一个文件的首字节，使两种实现都应报告1个失败"""
+    target = sorted(base.glob("Model/*/release/file_000.bin"))[0]
+    with open(target, 'r+b') as f:
+        first = f.read(1)
+        f.seek(0)
+        f.write(bytes([first[0] ^ 0xFF]) if first else b"x")
+    return target
+
+def prepare_shell_script(work_dir, repo_dir, log_dir):
+    """复制 shell 脚本并把写死的仓库路径和日志路径替换为测试目录"""
+    text = SHELL_SCRIPT.read_text(encoding='utf-8')
+    text = text.replace(LOG_DIR, str(log_dir)).replace(REPO_DIR, str(repo_dir))
+    script = work_dir / SHELL_SCRIPT.name
+    script.write_text(text, encoding='utf-8')
+    script.chmod(0o755)
+    return script
+
+def drop_page_cache(repo_dir):
+    """将测试文件逐出页缓存，使每次运行都从磁盘读取"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for path in repo_dir.rglob("*"):
+        if path.is_file():
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+
+def read_summary(log_dir):
+    """读取最新日志中的最终统计"""
+    logs = sorted(log_dir.glob("md5_check_optimized_*.log"), key=lambda p: p.stat().st_mtime)
+    summary = {}
+    if not logs:
+        return summary
+    for line in logs[-1].read_text(encoding='utf-8', errors='replace').splitlines():
+        for key in ("处理的MD5文件数", "成功校验文件数", "校验失败文件数"):
+            if line.startswith(key + ":"):
+                summary[key] = line.split(":", 1)[1].strip()
+    return summary
+
+def run(command, repo_dir, log_dir, cold):
+    """运行一次校验，返回 (耗时秒数, 退出码, 统计)"""
+    if log_dir.exists():
+        shutil.rmtree(log_dir)
+    if cold:
+        drop_page_cache(repo_dir)
+    start = time.perf_counter()
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    elapsed = time.perf_counter() - start
+    return elapsed, result.returncode, read_summary(log_dir)
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="check_md5_optimized.sh 与 check_md5_parallel.py 基准对比")
+    parser.add_argument("-d", "--dirs", type=int, default=20, help="md5sums.txt 目录数（默认20）")
+    parser.add_argument("-f", "--files", type=int, default=10, help="每个目录的文件数（默认10）")
+    parser.add_argument("--max-size", type=int, default=32, help="单个文件最大大小，单位MB（默认32）")
+    parser.add_argument("-t", "--threads", type=int, help="两种实现使用的并发数（默认各自的默认值）")
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="每种实现重复次数，取最快的一次")
+    parser.add_argument("--warm", action="store_true", help="不逐出页缓存（默认每次运行前逐出）")
+    parser.add_argument("--corrupt", action="store_true", help="损坏一个文件，验证两种实现都能发现")
+    parser.add_argument("--work-dir", help="测试目录（默认创建临时目录）")
+    parser.add_argument("--keep", action="store_true", help="保留测试目录")
+    return parser.parse_args()
+
+def main():
+    """主函数"""
+    args = parse_arguments()
+    work_dir = Path(args.work_dir or tempfile.mkdtemp(prefix="md5_bench_"))
+    repo_dir = work_dir / "SVN_MODEL_REPO"
+    log_dir = work_dir / "log"
+
+    print("MD5校验基准测试")
+    print("=" * 60)
+    try:
+        if repo_dir.exists():
+            shutil.rmtree(repo_dir)
+        count, total = generate_tree(repo_dir, args.dirs, args.files, args.max_size)
+        print(f"测试树: {repo_dir}")
+        print(f"md5sums.txt: {args.dirs} 个, 文件: {count} 个, 总大小: {total / 1024 / 1024:.1f} MB")
+        if args.corrupt:
+            print(f"已损坏文件: {corrupt_one(repo_dir)}")
+        print("-" * 60)
+
+        threads = [str(args.threads)] if args.threads else []
+        shell_script = prepare_shell_script(work_dir, repo_dir, log_dir)
+        cases = [
+            ("check_md5_optimized.sh", ["bash", str(shell_script)] + threads),
+            ("check_md5_parallel.py", [sys.executable, str(PYTHON_SCRIPT)] + threads
+             + ["--base", str(repo_dir), "--log-dir", str(log_dir)]),
+        ]
+        results = {}
+        for name, command in cases:
+            best = None
+            for _ in range(args.repeat):
+                outcome = run(command, repo_dir, log_dir, not args.warm)
+                if best is None or outcome[0] < best[0]:
+                    best = outcome
+            results[name] = best
+            elapsed, code, summary = best
+            print(f"{name:<26}{elapsed:>8.2f} 秒  {total / 1024 / 1024 / elapsed:>8.1f} MB/s  退出码 {code}")
+            print(f"{'':<26}{summary}")
+
+        print("-" * 60)
+        (shell_time, _, shell_summary), (python_time, _, python_summary) = results.values()
+        print(f"加速比: {shell_time / python_time:.2f}x")
+        if shell_summary.get("校验失败文件数") != python_summary.get("校验失败文件数"):
+            print("⚠️  两种实现报告的失败文件数不一致")
+            return 1
+        return 0
+    finally:
+        if args.keep:
+            print(f"测试目录已保留: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+check_md5_optimized.sh 的 Python 版本
+
+查找 Model 和 Vendor 目录下所有 md5sums.txt，将其中的每个文件作为一个任务交给进程池校验：
+    - 所有 md5sums.txt 的条目统一调度，大文件优先，避免最后只剩一个大文件拖尾
+    - 计数器保存在主进程内存中，不再使用临时目录、flock 计数器文件和子 shell
+    - 日志格式与 check_md5_optimized.sh 相同，写入 /HDD_Raid/log/md5_checks
+
+用法:
+    python check_md5_parallel.py            # 默认进程数为 CPU核心数 * 2（最多32）
+    python check_md5_parallel.py 8
+    python check_md5_parallel.py 8 --base /HDD_Raid/SVN_MODEL_REPO --log-dir /tmp/md5_checks
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+BASE_DIR = "/HDD_Raid/SVN_MODEL_REPO"
+LOG_DIR = "/HDD_Raid/log/md5_checks"
+SUB_DIRS = ("Model", "Vendor")
+MD5_FILE = "md5sums.txt"
+MAX_THREADS = 32
+BUFFER_SIZE = 8 * 1024 * 1024
+MD5SUM_PATTERN = re.compile(r"^\\?([0-9a-fA-F]{32}) [ *](.+)$")
+
+def default_workers():
+    """与 shell 版本一致：CPU核心数 * 2，最多32"""
+    return min((os.cpu_count() or 1) * 2, MAX_THREADS)
+
+def find_md5_files(base_dir):
+    """递归查找目录下所有 md5sums.txt"""
+    found = []
+    for root, _, files in os.walk(base_dir):
+        if MD5_FILE in files:
+            found.append(Path(root) / MD5_FILE)
+    return sorted(found)
+
+def parse_md5_file(md5_file):
+    """解析 md5sums.txt，返回 [(文件路径, 期望md5), ...]，路径相对于 md5sums.txt 所在目录"""
+    entries = []
+    with open(md5_file, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            match = MD5SUM_PATTERN.match(line.rstrip('\r\n'))
+            if match:
+                md5, filename = match.groups()
+                entries.append((md5_file.parent / filename, md5.lower()))
+    return entries
+
+def md5_of_file(path, buffer_size=BUFFER_SIZE):
+    """
+    计算文件MD5（在子进程中运行）
+
+    Returns:
+        (md5, 文件大小)；文件不存在或无法读取时 md5 为 None
+    """
+    md5 = hashlib.md5()
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    size = 0
+    try:
+        with open(path, 'rb', buffering=0) as f:
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                md5.update(view[:n])
+                size += n
+    except OSError:
+        return None, 0
+    return md5.hexdigest(), size
+
+class MD5Checker:
+    """MD5并行校验"""
+
+    def __init__(self, workers=None, base_dir=BASE_DIR, log_dir=LOG_DIR):
+        self.workers = workers or default_workers()
+        self.base_dir = Path(base_dir)
+        self.log_dir = Path(log_dir)
+        self.date = time.strftime("%Y-%m-%d_%H-%M-%S")
+        self.log_file = self.log_dir / f"md5_check_optimized_{self.date}.log"
+        self.result_file = self.log_dir / f"md5_check_optimized_{self.date}.results"
+        # 内存中的计数器
+        self.success = 0
+        self.failed = 0
+        self.missing = 0
+        self.processed = 0
+        self.failures = []
+
+    def discover(self):
+        """
+        扫描 Model 和 Vendor 目录
+
+        Returns:
+            (md5文件列表, 任务列表 [(文件路径, 期望md5, md5文件, 文件大小), ...])
+        """
+        md5_files = []
+        tasks = []
+        for name in SUB_DIRS:
+            directory = self.base_dir / name
+            if not directory.is_dir():
+                continue
+            print(f"📂 处理 {name} 目录...")
+            print(f"\n[扫描] {name}...")
+            found = find_md5_files(directory)
+            if not found:
+                print(f"[警告] {name}: 未找到MD5文件")
+                continue
+            print(f"[信息] 发现 {len(found)} 个文件")
+            md5_files.extend(found)
+            for md5_file in found:
+                for path, expected in parse_md5_file(md5_file):
+                    try:
+                        size = path.stat().st_size
+                    except OSError:
+                        size = -1
+                    tasks.append((path, expected, md5_file, size))
+        # 大文件优先提交
+        tasks.sort(key=lambda task: task[3], reverse=True)
+        return md5_files, tasks
+
+    def write_log_header(self):
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.log_file, 'w', encoding='utf-8') as f:
+            f.write(f"多线程MD5校验报告 - {self.date}\n")
+            f.write(f"使用线程数: {self.workers}\n")
+            f.write(f"CPU核心数: {os.cpu_count()}\n")
+            f.write("=========================================\n")
+            f.write("\n")
+
+    def print_progress(self, done, total, done_bytes, total_bytes, start):
+        elapsed = time.time() - start
+        if elapsed <= 0:
+            return
+        rate = done * 60 / elapsed
+        remaining_bytes = max(total_bytes - done_bytes, 0)
+        speed = done_bytes / elapsed
+        eta = int(remaining_bytes / speed) if speed > 0 else 0
+        print(f"\r[进度] {done}/{total} ({done * 100 / total:.1f}%) {rate:.0f}/min "
+              f"{speed / 1024 / 1024:.1f} MB/s ETA: {eta // 60}m{eta % 60}s", end="", flush=True)
+
+    def run(self):
+        """执行校验，返回退出码"""
+        print("\033[1m=== MD5校验工具 ===\033[0m")
+        print(f"线程数: {self.workers}/{os.cpu_count()}")
+        print(f"时间: {time.strftime('%Y-%m-%d %H:%M:%S')}")
+
+        self.write_log_header()
+        start = time.time()
+
+        md5_files, tasks = self.discover()
+        remaining = {md5_file: 0 for md5_file in md5_files}
+        file_failed = {md5_file: 0 for md5_file in md5_files}
+        file_ok = {md5_file: 0 for md5_file in md5_files}
+        for _, _, md5_file, _ in tasks:
+            remaining[md5_file] += 1
+        # 没有有效条目的 md5sums.txt 直接计为已处理
+        result_lines = [f"SUCCESS:0:{md5_file.parent}" for md5_file, count in remaining.items() if not count]
+        self.processed += len(result_lines)
+
+        total_bytes = sum(max(task[3], 0) for task in tasks)
+        done_bytes = 0
+        if tasks:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(md5_of_file, task[0]): task for task in tasks}
+                for done, future in enumerate(as_completed(futures), 1):
+                    path, expected, md5_file, _ = futures[future]
+                    actual, size = future.result()
+                    done_bytes += size
+                    if actual == expected:
+                        self.success += 1
+                        file_ok[md5_file] += 1
+                    else:
+                        self.failed += 1
+                        file_failed[md5_file] += 1
+                        if actual is None:
+                            self.missing += 1
+                            self.failures.append(f"{path}: FAILED open or read")
+                        else:
+                            self.failures.append(f"{path}: FAILED")
+
+                    remaining[md5_file] -= 1
+                    if remaining[md5_file] == 0:
+                        self.processed += 1
+                        if file_failed[md5_file]:
+                            result_lines.append(f"FAILED:{file_failed[md5_file]}:{md5_file.parent}")
+                        else:
+                            result_lines.append(f"SUCCESS:{file_ok[md5_file]}:{md5_file.parent}")
+                    self.print_progress(done, len(tasks), done_bytes, total_bytes, start)
+            print()
+        for name in SUB_DIRS:
+            if (self.base_dir / name).is_dir():
+                print(f"✅ {name} 目录处理完成")
+
+        total_time = int(time.time() - start)
+        self.write_results(result_lines)
+        self.write_log_footer(total_time)
+
+        print("\n=== 检查完成 ===")
+        print(f"总文件: {self.processed}")
+        print(f"成功数: {self.success}")
+        print(f"失败数: {self.failed}")
+        print(f"耗时: {total_time}秒")
+        print(f"日志: {self.log_file}")
+
+        if self.failed:
+            print("\n[错误] 检测到校验失败")
+            print("前3个失败文件:")
+            for line in self.failures[:3]:
+                print(line)
+            return 1
+        return 0
+
+    def write_results(self, result_lines):
+        """写入逐个 md5sums.txt 的结果和失败详情（对应 shell 版本的结果目录）"""
+        with open(self.result_file, 'w', encoding='utf-8') as f:
+            for line in sorted(result_lines):
+                f.write(line + "\n")
+            if self.failures:
+                f.write("\n")
+                for line in self.failures:
+                    f.write(line + "\n")
+
+    def write_log_footer(self, total_time):
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write("\n")
+            f.write("📊 最终统计报告\n")
+            f.write("=========================================\n")
+            f.write(f"处理的MD5文件数: {self.processed}\n")
+            f.write(f"成功校验文件数: {self.success}\n")
+            f.write(f"校验失败文件数: {self.failed}\n")
+            f.write(f"总处理时间: {total_time}秒\n")
+            if total_time > 0:
+                f.write(f"平均处理速度: {self.processed / total_time:.2f} 文件/秒\n")
+            f.write("\n")
+            f.write(f"详细结果文件位置: {self.result_file}\n")
+            f.write(f"检查完成时间: {time.strftime('%a %b %d %H:%M:%S %Z %Y')}\n")
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="MD5并行校验工具（check_md5_optimized.sh 的 Python 版本）")
+    parser.add_argument("threads", nargs="?", type=int,
+                        help=f"并发进程数（默认 CPU核心数 * 2，最多{MAX_THREADS}）")
+    parser.add_argument("--base", default=BASE_DIR, help=f"仓库根目录，其下的 Model 和 Vendor 会被检查（默认 {BASE_DIR}）")
+    parser.add_argument("--log-dir", default=LOG_DIR, help=f"日志目录（默认 {LOG_DIR}）")
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    workers = min(args.threads, MAX_THREADS) if args.threads else None
+    return MD5Checker(workers, args.base, args.log_dir).run()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,16 +5,17 @@
 # 描述: 监控SVN模型仓库目录结构变化，生成JSON格式的目录树并进行对比
 #
 # 功能:
-#   - 使用tree命令生成Model和Vendor目录的JSON格式结构
+#   - 使用tree_snapshot.py（或tree命令）生成Model和Vendor目录的JSON格式结构
 #   - 按月份保存JSON文件到指定目录
-#   - 与上次的结构进行对比，生成差异报告
+#   - 与上次的结构进行对比，生成差异报告（tree_diff.py 可用时包含重命名/修改）
 #   - 支持定时任务执行（每月10号）
 #
-# 用法: ./directory_structure_monitor.sh [--force] [--compare-only]
+# 用法: ./directory_structure_monitor.sh [--force] [--compare-only] [--full-scan]
 #
 # 参数:
 #   --force: 强制重新生成，即使当月文件已存在
 #   --compare-only: 仅进行对比，不生成新的JSON文件
+#   --full-scan: 忽略目录列表缓存，完整扫描（仅 tree_snapshot.py 可用时有效）
 #
 # 定时任务设置:
 #   0 2 10 * * /HDD_Raid/util_script/directory_structure_monitor.sh
@@ -22,6 +23,8 @@
 # 输出:
 #   - JSON文件: /HDD_Raid/log/directory_structure/Vendor_YYYY-MM.json
 #   - 对比报告: /HDD_Raid/log/directory_structure/comparison_YYYY-MM.txt
+#   - JSON差异: /HDD_Raid/log/directory_structure/comparison_YYYY-MM.json
+#   - 快照数据库: /HDD_Raid/log/directory_structure/snapshots.db（snapshot_store.py 可用时）
 #
 # 作者: Claude
 # 创建日期: 2024-12-19
@@ -47,10 +50,16 @@ CURRENT_DATE=$(date +"%Y-%m-%d %H:%M:%S")
 JSON_FILE="${LOG_BASE_DIR}/Vendor_${DATE}.json"
 COMPARISON_FILE="${LOG_BASE_DIR}/comparison_${DATE}.txt"
 TEMP_DIR="/tmp/dir_monitor_$$"
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+TREE_SNAPSHOT="${SCRIPT_DIR}/tree_snapshot.py"
+TREE_DIFF="${SCRIPT_DIR}/tree_diff.py"
+SNAPSHOT_STORE="${SCRIPT_DIR}/snapshot_store.py"
+SNAPSHOT_DB="${LOG_BASE_DIR}/snapshots.db"
 
 # 解析命令行参数
 FORCE_GENERATE=false
 COMPARE_ONLY=false
+FULL_SCAN=false
 
 for arg in "$@"; do
     case $arg in
@@ -62,9 +71,13 @@ for arg in "$@"; do
             COMPARE_ONLY=true
             shift
             ;;
+        --full-scan)
+            FULL_SCAN=true
+            shift
+            ;;
         *)
             echo "未知参数: $arg"
-            echo "用法: $0 [--force] [--compare-only]"
+            echo "用法: $0 [--force] [--compare-only] [--full-scan]"
             exit 1
             ;;
     esac
@@ -103,7 +116,9 @@ create_directories() {
 check_dependencies() {
     local missing_deps=()
 
-    if ! command -v tree >/dev/null 2>&1; then
+    # tree_snapshot.py 可用时不需要 tree
+    if ! command -v tree >/dev/null 2>&1 && \
+       ! { [ -f "$TREE_SNAPSHOT" ] && command -v python3 >/dev/null 2>&1; }; then
         missing_deps+=("tree")
     fi
 
@@ -121,6 +136,28 @@ check_dependencies() {
     fi
 }
 
+# 生成目录的 tree -J 格式JSON，优先使用并行扫描的 tree_snapshot.py，不可用时回退到 tree
+# 第三个参数为目录列表缓存文件，上次扫描后未变化的目录直接复用缓存
+# 附加 size/time（-s -D），tree_diff.py 据此识别文件修改和重命名
+snapshot_tree() {
+    local dir="$1"
+    local output="$2"
+    local cache="$3"
+
+    if [ -f "$TREE_SNAPSHOT" ] && command -v python3 >/dev/null 2>&1; then
+        local cache_args=()
+        if [ -n "$cache" ]; then
+            cache_args=(--cache "$cache")
+            if [ "$FULL_SCAN" = true ]; then
+                cache_args+=(--full)
+            fi
+        fi
+        python3 "$TREE_SNAPSHOT" "$dir" -s -D --compact "${cache_args[@]}" -o "$output" 2>/dev/null
+    else
+        tree -J -s -D --timefmt %s "$dir" > "$output" 2>/dev/null
+    fi
+}
+
 # 生成目录结构JSON
 generate_directory_json() {
     local target_file="$1"
@@ -155,7 +192,7 @@ EOF
     # 生成Model目录的JSON
     log_info "扫描Model目录结构..."
     local model_json="${TEMP_DIR}/model.json"
-    if tree -J "$BASE_MODEL_PATH" > "$model_json" 2>/dev/null; then
+    if snapshot_tree "$BASE_MODEL_PATH" "$model_json" "${LOG_BASE_DIR}/Model.dircache"; then
         # 使用jq合并JSON
         jq --argjson model "$(cat "$model_json")" '.directories.Model = $model[0]' "$temp_json" > "${temp_json}.tmp"
         mv "${temp_json}.tmp" "$temp_json"
@@ -167,7 +204,7 @@ EOF
     # 生成Vendor目录的JSON
     log_info "扫描Vendor目录结构..."
     local vendor_json="${TEMP_DIR}/vendor.json"
-    if tree -J "$BASE_VENDOR_PATH" > "$vendor_json" 2>/dev/null; then
+    if snapshot_tree "$BASE_VENDOR_PATH" "$vendor_json" "${LOG_BASE_DIR}/Vendor.dircache"; then
         # 使用jq合并JSON
         jq --argjson vendor "$(cat "$vendor_json")" '.directories.Vendor = $vendor[0]' "$temp_json" > "${temp_json}.tmp"
         mv "${temp_json}.tmp" "$temp_json"
@@ -191,6 +228,19 @@ EOF
     fi
 }
 
+# 将JSON快照导入SQLite快照数据库，便于按路径前缀查询和保留管理
+store_snapshot() {
+    local json_file="$1"
+
+    if [ -f "$SNAPSHOT_STORE" ] && command -v python3 >/dev/null 2>&1; then
+        if python3 "$SNAPSHOT_STORE" --db "$SNAPSHOT_DB" import "$json_file" >/dev/null; then
+            log_success "快照已导入数据库: $SNAPSHOT_DB"
+        else
+            log_warning "快照导入数据库失败: $json_file"
+        fi
+    fi
+}
+
 # 查找上一个月的JSON文件
 find_previous_json() {
     local current_year_month=$(date +"%Y-%m")
@@ -232,6 +282,15 @@ compare_json_files() {
     log_info "当前文件: $(basename "$current_file")"
     log_info "对比文件: $(basename "$previous_file")"
 
+    # tree_diff.py 可用时按 Merkle 哈希结构化对比（含重命名/修改），并写出 JSON 格式的差异
+    if [ -f "$TREE_DIFF" ] && command -v python3 >/dev/null 2>&1; then
+        if python3 "$TREE_DIFF" diff "$previous_file" "$current_file" -o "$output_file" --json "${output_file%.txt}.json"; then
+            log_success "对比报告已生成: $output_file"
+            return 0
+        fi
+        log_warning "tree_diff.py 对比失败，改用 jq 对比"
+    fi
+
     # 创建对比报告
     cat > "$output_file" << EOF
 目录结构变化对比报告
@@ -402,6 +461,7 @@ main() {
     # 生成新的JSON文件
     if generate_directory_json "$JSON_FILE"; then
         log_success "JSON文件生成成功"
+        store_snapshot "$JSON_FILE"
 
         # 查找上一个文件进行对比
         local previous_file
@@ -458,6 +518,7 @@ show_help() {
 选项:
   --force         强制重新生成，即使当月文件已存在
   --compare-only  仅进行对比，不生成新的JSON文件
+  --full-scan     忽略目录列表缓存，完整扫描
   -h, --help      显示此帮助信息
 
 功能:
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+目录树快照存储（SQLite）
+
+把 tree -J / tree_snapshot.py / directory_structure_monitor.sh 生成的 JSON 快照存入一个 SQLite 文件：
+    - 每个条目一行：父条目 id、名称、类型编码、size、time，比缩进的 JSON 小得多
+    - 条目按先序遍历编号并记录子树的结束编号，子树是一段连续的主键范围；
+      按路径前缀查询时逐级用 (父条目, 名称) 索引定位，再只读取该范围内的行
+    - 可导出为 tree -J 结构的 JSON（按月份和部分导出时与 directory_structure_monitor.sh 的格式相同），
+      供 tree_diff.py 和 validate_vendor_structure.py 使用
+    - 按保留数量清理旧快照，并可删除已入库的历史 JSON 文件
+
+用法:
+    python snapshot_store.py import /HDD_Raid/log/directory_structure/Vendor_2025-05.json
+    python snapshot_store.py list
+    python snapshot_store.py query -l 2025-05 -s Vendor kunlunxin/P800
+    python snapshot_store.py export -l 2025-05 -o Vendor_2025-05.json
+    python snapshot_store.py export -l 2025-05 -s Vendor --prefix kunlunxin -o kunlunxin_tree.json
+    python snapshot_store.py prune --keep 24 --json-dir /HDD_Raid/log/directory_structure
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from tree_diff import document_sections
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+LOG_BASE_DIR = "/HDD_Raid/log/directory_structure"
+DEFAULT_DB = os.path.join(LOG_BASE_DIR, "snapshots.db")
+# 删除历史 JSON 时始终保留最新的几个月，directory_structure_monitor.sh 对比时需要
+DEFAULT_KEEP_JSON = 2
+# tree -J 中出现的条目类型与存储的编码
+TYPE_CODES = {"directory": 0, "file": 1, "link": 2, "fifo": 3, "socket": 4, "char": 5, "block": 6,
+              "door": 7, "port": 8}
+TYPE_NAMES = {code: name for name, code in TYPE_CODES.items()}
+LABEL_PATTERN = re.compile(r"(\d{4}-\d{2}(?:-\d{2})?)")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    label TEXT NOT NULL,
+    section TEXT NOT NULL,
+    root TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    source TEXT,
+    directories INTEGER NOT NULL,
+    files INTEGER NOT NULL,
+    UNIQUE (label, section)
+);
+CREATE TABLE IF NOT EXISTS entries (
+    snapshot_id INTEGER NOT NULL,
+    id INTEGER NOT NULL,
+    end_id INTEGER NOT NULL,
+    parent_id INTEGER,
+    type INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER,
+    time INTEGER,
+    target TEXT,
+    unlisted INTEGER,
+    error TEXT,
+    PRIMARY KEY (snapshot_id, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_child ON entries (snapshot_id, parent_id, name);
+"""
+
+def label_from_filename(path):
+    """从文件名中取出月份/日期作为标签，例如 Vendor_2025-05.json -> 2025-05"""
+    match = LABEL_PATTERN.search(Path(path).name)
+    return match.group(1) if match else Path(path).stem
+
+class SnapshotStore:
+    """SQLite 中的目录树快照集合"""
+
+    def __init__(self, db_path=DEFAULT_DB):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def import_tree(self, label, section, root, created_at=None, source=None):
+        """
+        存入一棵目录树（tree -J 的根目录节点），同一标签和部分已存在时替换，返回快照 id
+
+        条目按先序遍历编号，根目录为 0，每个条目的子树为编号 [id, end_id)。
+        """
+        rows = []
+        parents = []
+        directories = files = 0
+        stack = [(root, None)]
+        while stack:
+            node, parent_id = stack.pop()
+            node_type = node.get("type", "file")
+            if node_type not in TYPE_CODES:
+                raise ValueError(f"未知的条目类型 {node_type!r}: {node.get('name')}")
+            entry_id = len(rows)
+            rows.append([entry_id, entry_id + 1, parent_id, TYPE_CODES[node_type],
+                         node.get("name", "") if parent_id is not None else "",
+                         node.get("size"), node.get("time"), node.get("target"),
+                         1 if node_type == "directory" and "contents" not in node else None, node.get("error")])
+            parents.append(parent_id)
+            if parent_id is not None:
+                if node_type == "directory":
+                    directories += 1
+                else:
+                    files += 1
+            # 逆序压栈，出栈顺序与 contents 中的顺序一致
+            for child in reversed(node.get("contents", ())):
+                stack.append((child, entry_id))
+        # 逆序累加子树大小，得到每个条目子树的结束编号
+        sizes = [1] * len(rows)
+        for entry_id in range(len(rows) - 1, 0, -1):
+            sizes[parents[entry_id]] += sizes[entry_id]
+        for row, size in zip(rows, sizes):
+            row[1] = row[0] + size
+
+        with self.conn:
+            self.delete(label, section)
+            cursor = self.conn.execute(
+                "INSERT INTO snapshots (label, section, root, created_at, source, directories, files) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (label, section, root.get("name", "."), created_at or time.strftime("%Y-%m-%d %H:%M:%S"),
+                 source, directories, files))
+            snapshot_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO entries (snapshot_id, id, end_id, parent_id, type, name, size, time, target, unlisted, "
+                "error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ([snapshot_id] + row for row in rows))
+        return snapshot_id
+
+    def import_file(self, json_path, label=None):
+        """导入一个 JSON 快照文件的所有部分，返回 [(部分名称, 快照 id, 目录数, 文件数)]"""
+        with open(json_path, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+        label = label or label_from_filename(json_path)
+        created_at = document.get("generated_at") if isinstance(document, dict) else None
+        if not created_at:
+            created_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(os.path.getmtime(json_path)))
+        imported = []
+        for section, root in document_sections(document, json_path).items():
+            snapshot_id = self.import_tree(label, section, root, created_at, os.path.abspath(json_path))
+            info = self.snapshot(snapshot_id)
+            imported.append((section, snapshot_id, info["directories"], info["files"]))
+        return imported
+
+    def snapshot(self, snapshot_id):
+        row = self.conn.execute(
+            "SELECT id, label, section, root, created_at, source, directories, files FROM snapshots WHERE id = ?",
+            (snapshot_id,)).fetchone()
+        return self._snapshot_dict(row) if row else None
+
+    def snapshots(self, label=None):
+        """列出快照，按标签、部分排序"""
+        sql = "SELECT id, label, section, root, created_at, source, directories, files FROM snapshots"
+        params = ()
+        if label:
+            sql += " WHERE label = ?"
+            params = (label,)
+        return [self._snapshot_dict(row) for row in self.conn.execute(sql + " ORDER BY label, section", params)]
+
+    @staticmethod
+    def _snapshot_dict(row):
+        keys = ("id", "label", "section", "root", "created_at", "source", "directories", "files")
+        return dict(zip(keys, row))
+
+    def labels(self):
+        """所有标签，从旧到新"""
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT label FROM snapshots ORDER BY label")]
+
+    def find(self, label=None, section=None):
+        """按标签和部分查找快照；label 为空时取最新标签，section 为空时该标签只能有一个部分"""
+        label = label or (self.labels() or [None])[-1]
+        candidates = [s for s in self.snapshots(label) if section is None or s["section"] == section]
+        if len(candidates) != 1:
+            sections = ", ".join(s["section"] for s in self.snapshots(label)) or "无"
+            raise LookupError(f"找不到唯一的快照: 标签 {label}, 部分 {section or '未指定'}（可选部分: {sections}）")
+        return candidates[0]
+
+    def resolve(self, snapshot_id, prefix=""):
+        """
+        逐级查找路径前缀对应的条目，返回其子树的编号范围 (id, end_id)
+
+        Raises:
+            LookupError: 路径不存在
+        """
+        entry_id, end_id = self.conn.execute(
+            "SELECT id, end_id FROM entries WHERE snapshot_id = ? AND id = 0", (snapshot_id,)).fetchone()
+        for name in [part for part in prefix.split("/") if part]:
+            row = self.conn.execute(
+                "SELECT id, end_id FROM entries WHERE snapshot_id = ? AND parent_id = ? AND name = ?",
+                (snapshot_id, entry_id, name)).fetchone()
+            if row is None:
+                raise LookupError(f"快照中不存在路径: {prefix}")
+            entry_id, end_id = row
+        return entry_id, end_id
+
+    def rows(self, snapshot_id, prefix=""):
+        """按先序读取前缀对应子树中的所有条目（主键范围扫描）"""
+        start, end = self.resolve(snapshot_id, prefix)
+        return self.conn.execute(
+            "SELECT id, parent_id, type, name, size, time, target, unlisted, error FROM entries "
+            "WHERE snapshot_id = ? AND id >= ? AND id < ? ORDER BY id", (snapshot_id, start, end))
+
+    def query(self, snapshot_id, prefix=""):
+        """
+        按路径前缀查询条目，返回 [(路径, 类型, size, time, target)]，按先序排列
+
+        prefix 为空时返回整棵树（不含根目录）。
+        """
+        prefix = prefix.strip("/")
+        paths = {}
+        results = []
+        for entry_id, parent_id, code, name, size, mtime, target, _, _ in self.rows(snapshot_id, prefix):
+            if parent_id in paths:
+                path = f"{paths[parent_id]}/{name}" if paths[parent_id] else name
+            else:
+                path = prefix
+            if code == TYPE_CODES["directory"]:
+                paths[entry_id] = path
+            if path:
+                results.append((path, TYPE_NAMES[code], size, mtime, target))
+        return results
+
+    def load_tree(self, snapshot_id, prefix=""):
+        """
+        读回 tree -J 结构的目录节点；指定 prefix 时只读取该子树，根节点名称为 <根目录>/<prefix>
+
+        Raises:
+            LookupError: prefix 不存在
+        """
+        prefix = prefix.strip("/")
+        root_name = self.snapshot(snapshot_id)["root"]
+        nodes = {}
+        root = None
+        directory = TYPE_CODES["directory"]
+        for entry_id, parent_id, code, name, size, mtime, target, unlisted, error in self.rows(snapshot_id, prefix):
+            node = {"type": TYPE_NAMES[code], "name": name}
+            if target is not None:
+                node["target"] = target
+            if size is not None:
+                node["size"] = size
+            if mtime is not None:
+                node["time"] = mtime
+            if code == directory and not unlisted:
+                node["contents"] = []
+                nodes[entry_id] = node
+            if error is not None:
+                node["error"] = error
+            if root is None:
+                root = node
+            else:
+                nodes[parent_id]["contents"].append(node)
+        root["name"] = f"{root_name.rstrip('/')}/{prefix}" if prefix else root_name
+        return root
+
+    def export_document(self, label=None, section=None, prefix=""):
+        """
+        导出 JSON 文档：指定部分（或标签只有一个部分）时为 tree -J 结构，
+        否则为 directory_structure_monitor.sh 的 {"generated_at", "directories": {...}} 结构
+        """
+        label = label or (self.labels() or [None])[-1]
+        snapshots = self.snapshots(label)
+        if section is None and len(snapshots) > 1:
+            if prefix:
+                raise LookupError("按前缀导出时需要用 -s 指定部分")
+            return {
+                "generated_at": snapshots[0]["created_at"],
+                "directories": {s["section"]: self.load_tree(s["id"]) for s in snapshots},
+            }
+        info = self.find(label, section)
+        root = self.load_tree(info["id"], prefix)
+        directories = files = 0
+        stack = [root]
+        while stack:
+            for child in stack.pop().get("contents", ()):
+                if child["type"] == "directory":
+                    directories += 1
+                    stack.append(child)
+                else:
+                    files += 1
+        return [root, {"type": "report", "directories": directories, "files": files}]
+
+    def delete(self, label, section=None):
+        """删除快照，返回删除的快照数"""
+        targets = [s["id"] for s in self.snapshots(label) if section is None or s["section"] == section]
+        with self.conn:
+            for snapshot_id in targets:
+                self.conn.execute("DELETE FROM entries WHERE snapshot_id = ?", (snapshot_id,))
+                self.conn.execute("DELETE FROM snapshots WHERE id = ?", (snapshot_id,))
+        return len(targets)
+
+    def prune(self, keep):
+        """只保留最新的 keep 个标签，返回删除的标签"""
+        labels = self.labels()
+        removed = labels[:-keep] if keep > 0 else labels
+        for label in removed:
+            self.delete(label)
+        return removed
+
+    def vacuum(self):
+        self.conn.execute("VACUUM")
+
+def prune_json_files(store, json_dir, keep_json=DEFAULT_KEEP_JSON):
+    """
+    删除 json_dir 中的历史 JSON 快照（Vendor_<标签>.json），返回删除的文件
+
+    只删除标签仍在库中的文件（已入库，可随时 export 还原）；从未入库或已被 prune 清理的标签不删除。
+    始终保留最新的 keep_json 个。
+    """
+    stored = set(store.labels())
+    if not stored:
+        return []
+    candidates = sorted(Path(json_dir).glob("Vendor_*.json"), key=label_from_filename)
+    removed = []
+    for json_file in candidates[:-keep_json] if keep_json > 0 else candidates:
+        label = label_from_filename(json_file)
+        if label in stored:
+            json_file.unlink()
+            removed.append(json_file)
+    return removed
+
+def format_size(size):
+    if size is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+def write_json(document, output, compact=False):
+    """写出 JSON；output 为空或 - 时写到标准输出"""
+    # json.dumps 在不缩进时使用 C 编码器，json.dump 和带缩进的输出都走纯 Python 实现，慢数倍
+    if compact:
+        text = json.dumps(document, ensure_ascii=False, separators=(',', ':'))
+    else:
+        text = json.dumps(document, ensure_ascii=False, indent=2)
+    if not output or output == "-":
+        sys.stdout.write(text + "\n")
+        return
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text + "\n")
+    os.replace(tmp_path, output)
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="目录树快照存储（SQLite）")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"快照数据库（默认 {DEFAULT_DB}）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="导入 JSON 快照")
+    import_parser.add_argument("json_files", nargs="+", help="JSON 快照文件")
+    import_parser.add_argument("-l", "--label", help="标签（默认从文件名中取月份，如 2025-05）")
+
+    subparsers.add_parser("list", help="列出快照")
+
+    query_parser = subparsers.add_parser("query", help="按路径前缀查询条目")
+    query_parser.add_argument("prefix", nargs="?", default="", help="相对于根目录的路径前缀")
+    query_parser.add_argument("-l", "--label", help="标签（默认最新）")
+    query_parser.add_argument("-s", "--section", help="部分，如 Vendor、Model")
+
+    export_parser = subparsers.add_parser("export", help="导出为 tree -J 结构的 JSON")
+    export_parser.add_argument("-l", "--label", help="标签（默认最新）")
+    export_parser.add_argument("-s", "--section", help="部分；不指定且有多个部分时导出 directory_structure_monitor.sh 格式")
+    export_parser.add_argument("--prefix", default="", help="只导出该路径前缀下的子树")
+    export_parser.add_argument("-o", "--output", help="输出文件（默认标准输出）")
+    export_parser.add_argument("--compact", action="store_true", help="输出不带缩进的紧凑 JSON")
+
+    prune_parser = subparsers.add_parser("prune", help="清理旧快照")
+    prune_parser.add_argument("--keep", type=int, required=True, help="保留最新的标签数")
+    prune_parser.add_argument("--json-dir", help="同时删除该目录中已入库的历史 Vendor_*.json")
+    prune_parser.add_argument("--keep-json", type=int, default=DEFAULT_KEEP_JSON,
+                              help=f"删除历史 JSON 时保留最新的文件数（默认 {DEFAULT_KEEP_JSON}）")
+    prune_parser.add_argument("--vacuum", action="store_true", help="清理后压缩数据库文件")
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    if args.command != "import" and not os.path.exists(args.db):
+        print(f"❌ 快照数据库不存在: {args.db}", file=sys.stderr)
+        return 1
+    store = SnapshotStore(args.db)
+    try:
+        if args.command == "import":
+            for json_file in args.json_files:
+                start = time.time()
+                for section, snapshot_id, directories, files in store.import_file(json_file, args.label):
+                    print(f"✅ {json_file} [{section}]: {directories} 个目录, {files} 个文件 "
+                          f"(快照 {snapshot_id}, 用时 {time.time() - start:.2f} 秒)")
+
+        elif args.command == "list":
+            print(f"{'标签':<12}{'部分':<10}{'目录数':>10}{'文件数':>12}  生成时间")
+            print("-" * 60)
+            for info in store.snapshots():
+                print(f"{info['label']:<12}{info['section']:<10}{info['directories']:>10}{info['files']:>12}"
+                      f"  {info['created_at']}")
+            print(f"数据库大小: {format_size(os.path.getsize(args.db))}")
+
+        elif args.command == "query":
+            info = store.find(args.label, args.section)
+            rows = store.query(info["id"], args.prefix)
+            for path, node_type, size, mtime, target in rows:
+                line = f"{node_type:<10}{format_size(size):>10}  {path}"
+                if target:
+                    line += f" -> {target}"
+                print(line)
+            print(f"共 {len(rows)} 个条目（{info['label']} {info['section']}）", file=sys.stderr)
+
+        elif args.command == "export":
+            write_json(store.export_document(args.label, args.section, args.prefix), args.output, args.compact)
+
+        elif args.command == "prune":
+            removed = store.prune(args.keep)
+            print(f"删除了 {len(removed)} 个标签的快照: {', '.join(removed) or '无'}")
+            if args.json_dir:
+                for json_file in prune_json_files(store, args.json_dir, args.keep_json):
+                    print(f"  删除历史 JSON: {json_file}")
+            if args.vacuum:
+                store.vacuum()
+                print(f"数据库大小: {format_size(os.path.getsize(args.db))}")
+    except (OSError, ValueError, LookupError, sqlite3.Error) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
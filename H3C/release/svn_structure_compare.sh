@@ -36,6 +36,8 @@ LOCAL_VENDOR_PATH="/HDD_Raid/SVN_MODEL_REPO/Vendor"
 LOG_DIR="/HDD_Raid/log/svn_compare"
 DATE=$(date +"%Y-%m-%d_%H-%M-%S")
 TEMP_DIR="/tmp/svn_compare_$$"
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+TREE_SNAPSHOT="${SCRIPT_DIR}/tree_snapshot.py"
 
 # 输出文件
 SVN_LIST_FILE="${TEMP_DIR}/svn_list.txt"
@@ -131,7 +133,9 @@ check_dependencies() {
         missing_deps+=("jq")
     fi
 
-    if ! command -v tree >/dev/null 2>&1; then
+    # tree_snapshot.py 可用时不需要 tree
+    if ! command -v tree >/dev/null 2>&1 && \
+       ! { [ -f "$TREE_SNAPSHOT" ] && command -v python3 >/dev/null 2>&1; }; then
         missing_deps+=("tree")
     fi
 
@@ -267,6 +271,18 @@ EOF
     fi
 }
 
+# 生成目录的 tree -J 格式JSON，优先使用并行扫描的 tree_snapshot.py，不可用时回退到 tree
+snapshot_tree() {
+    local dir="$1"
+    local output="$2"
+
+    if [ -f "$TREE_SNAPSHOT" ] && command -v python3 >/dev/null 2>&1; then
+        python3 "$TREE_SNAPSHOT" "$dir" --compact -o "$output" 2>/dev/null
+    else
+        tree -J "$dir" > "$output" 2>/dev/null
+    fi
+}
+
 # 获取本地Vendor目录结构
 get_local_structure() {
     log_info "获取本地Vendor目录结构..."
@@ -276,8 +292,8 @@ get_local_structure() {
         return 1
     fi
 
-    # 使用tree命令生成JSON
-    if tree -J "$LOCAL_VENDOR_PATH" > "$LOCAL_JSON_FILE" 2>/dev/null; then
+    # 使用tree_snapshot.py（或tree命令）生成JSON
+    if snapshot_tree "$LOCAL_VENDOR_PATH" "$LOCAL_JSON_FILE"; then
         # 包装为标准格式
         local temp_file="${TEMP_DIR}/local_wrapped.json"
         cat > "$temp_file" << EOF
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+目录树快照对比工具（Merkle 哈希）
+
+为快照中的每个目录计算其子条目的 Merkle 哈希（子条目名称 + 子条目哈希/属性），对比两个快照时
+哈希相同的子树直接跳过，只深入有变化的目录，耗时与变化量相关而不是与条目总数相关。
+    - 支持 tree -J / tree_snapshot.py 的输出，以及 directory_structure_monitor.sh（Model/Vendor 两部分）
+      和 svn_structure_compare.sh（structure）写出的 JSON
+    - 结构化报告新增、删除、重命名/移动和修改的路径；快照带 size/time 时可识别文件修改
+    - 删除与新增的条目内容哈希唯一相同时视为重命名/移动
+    - 输出可读报告和 JSON
+
+用法:
+    python tree_diff.py diff Vendor_2025-04.json Vendor_2025-05.json
+    python tree_diff.py diff Vendor_2025-04.json Vendor_2025-05.json -o comparison_2025-05.txt --json comparison_2025-05.json
+    python tree_diff.py annotate Vendor_2025-05.json -o Vendor_2025-05.merkle.json   # 预先写入目录哈希
+    python tree_diff.py diff 2025-04 2025-05 --db /HDD_Raid/log/directory_structure/snapshots.db  # 对比 snapshot_store.py 中的快照
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+# 目录节点上保存 Merkle 哈希的字段；已带该字段的快照（annotate 的输出）不会重复计算
+HASH_KEY = "merkle"
+# 参与文件签名的属性，快照不含 size/time 时文件只能比较有无
+LEAF_FIELDS = ("type", "size", "time", "target")
+
+def leaf_signature(node):
+    """文件/链接的签名：类型和可用的属性（与 LEAF_FIELDS 对应）"""
+    return f"{node.get('type', '')}\0{node.get('size', '')}\0{node.get('time', '')}\0{node.get('target', '')}"
+
+def node_signature(node):
+    """条目内容的签名，不含条目自身的名称；目录为其 Merkle 哈希"""
+    if node.get("type") == "directory":
+        return node[HASH_KEY]
+    return leaf_signature(node)
+
+def is_informative(node):
+    """签名是否足以区分不同条目：非空目录，或带大小/时间的文件"""
+    if node.get("type") == "directory":
+        return bool(node.get("contents"))
+    return "size" in node or "time" in node
+
+def annotate(root):
+    """
+    为 root 下所有目录计算 Merkle 哈希（写入 HASH_KEY 字段），返回 (目录数, 文件数)
+
+    使用显式栈做后序遍历，不受递归深度限制。目录自身的 size/time 不参与哈希，
+    否则任何子条目变化都会让所有祖先目录的属性一起变化。
+    """
+    directories = files = 0
+    stack = [(root, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if children_done:
+            digest = hashlib.blake2b(digest_size=16)
+            if "contents" not in node:
+                # 超过 -L 层数未列出的目录与空目录区分开
+                digest.update(b"\0pruned")
+            # 整个目录拼成一个字符串再哈希，比逐个子条目 update 快得多
+            children = sorted(node.get("contents", ()), key=lambda c: c.get("name", ""))
+            text = "\n".join(f"{child.get('name', '')}\0{node_signature(child)}" for child in children)
+            digest.update(text.encode('utf-8', 'surrogateescape'))
+            node[HASH_KEY] = digest.hexdigest()
+            continue
+        if HASH_KEY in node:
+            continue
+        stack.append((node, True))
+        for child in node.get("contents", ()):
+            if child.get("type") == "directory":
+                directories += 1
+                stack.append((child, False))
+            else:
+                files += 1
+    return directories, files
+
+def count_entries(node):
+    """统计子树中的条目数（含自身）"""
+    count = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        count += 1
+        stack.extend(current.get("contents", ()))
+    return count
+
+def count_tree(root):
+    """统计 root 下的目录数和文件数"""
+    directories = files = 0
+    stack = [root]
+    while stack:
+        for child in stack.pop().get("contents", ()):
+            if child.get("type") == "directory":
+                directories += 1
+                stack.append(child)
+            else:
+                files += 1
+    return directories, files
+
+def document_sections(document, path=""):
+    """
+    返回已读取快照中的 {部分名称: 根目录节点}，节点为文档中的原对象
+
+    directory_structure_monitor.sh 的文件返回 Model 和 Vendor 两部分，其他格式返回一个部分，
+    名称为根目录的目录名。
+    """
+    if isinstance(document, dict):
+        if isinstance(document.get("directories"), dict):
+            return {name: root for name, root in document["directories"].items() if isinstance(root, dict)}
+        if not isinstance(document.get("structure"), dict):
+            raise ValueError(f"无法识别的快照格式: {path}")
+        root = document["structure"]
+    else:
+        roots = [node for node in document if isinstance(node, dict) and node.get("type") == "directory"]
+        if not roots:
+            raise ValueError(f"快照中没有目录: {path}")
+        root = roots[0]
+    name = os.path.basename(os.path.normpath(root.get("name", "."))) or "."
+    return {name: root}
+
+def load_sections(path):
+    """读取快照文件，返回 {部分名称: 根目录节点}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return document_sections(json.load(f), path)
+
+def pair_sections(old_sections, new_sections):
+    """按名称配对两个快照的各部分；两边都只有一个部分时直接配对"""
+    if len(old_sections) == 1 and len(new_sections) == 1:
+        (name, new_root), = new_sections.items()
+        return [(name, next(iter(old_sections.values())), new_root)]
+    names = list(new_sections) + [name for name in old_sections if name not in new_sections]
+    return [(name, old_sections.get(name), new_sections.get(name)) for name in names]
+
+class TreeDiff:
+    """两个已计算 Merkle 哈希的目录树之间的差异"""
+
+    def __init__(self):
+        self.added = []       # [(路径, 节点)]
+        self.removed = []     # [(路径, 节点)]
+        self.renamed = []     # [(原路径, 新路径, 节点)]
+        self.modified = []    # [(路径, 原节点, 新节点)]
+        self.compared = 0     # 实际展开比较的目录数
+
+    def has_changes(self):
+        return bool(self.added or self.removed or self.renamed or self.modified)
+
+    def compare(self, old_root, new_root):
+        """比较两棵树，哈希相同的子树直接跳过"""
+        stack = [("", old_root, new_root)]
+        while stack:
+            path, old, new = stack.pop()
+            if old[HASH_KEY] == new[HASH_KEY]:
+                continue
+            self.compared += 1
+            old_children = {child.get("name", ""): child for child in old.get("contents", ())}
+            new_children = {child.get("name", ""): child for child in new.get("contents", ())}
+            for name, child in old_children.items():
+                if name not in new_children:
+                    self.removed.append((path + name, child))
+            for name, child in new_children.items():
+                old_child = old_children.get(name)
+                if old_child is None:
+                    self.added.append((path + name, child))
+                elif old_child.get("type") != child.get("type"):
+                    self.modified.append((path + name, old_child, child))
+                elif child.get("type") == "directory":
+                    stack.append((path + name + "/", old_child, child))
+                elif leaf_signature(old_child) != leaf_signature(child):
+                    self.modified.append((path + name, old_child, child))
+        self.detect_renames()
+        for changes in (self.added, self.removed, self.renamed, self.modified):
+            changes.sort(key=lambda change: change[0])
+        return self
+
+    def detect_renames(self):
+        """删除和新增的条目内容签名一一对应时，视为重命名/移动"""
+        removed_by_signature = {}
+        for path, node in self.removed:
+            if is_informative(node):
+                removed_by_signature.setdefault(node_signature(node), []).append((path, node))
+        added_by_signature = {}
+        for path, node in self.added:
+            if is_informative(node):
+                added_by_signature.setdefault(node_signature(node), []).append((path, node))
+        renamed_old = set()
+        renamed_new = set()
+        for signature, added in added_by_signature.items():
+            removed = removed_by_signature.get(signature, [])
+            if len(added) == 1 and len(removed) == 1:
+                self.renamed.append((removed[0][0], added[0][0], added[0][1]))
+                renamed_old.add(removed[0][0])
+                renamed_new.add(added[0][0])
+        self.removed = [(path, node) for path, node in self.removed if path not in renamed_old]
+        self.added = [(path, node) for path, node in self.added if path not in renamed_new]
+
+def describe_attributes(old, new):
+    """描述文件属性的变化"""
+    changes = []
+    if old.get("type") != new.get("type"):
+        changes.append(f"类型 {old.get('type')} -> {new.get('type')}")
+    if old.get("size") != new.get("size"):
+        changes.append(f"大小 {old.get('size', '?')} -> {new.get('size', '?')}")
+    if old.get("time") != new.get("time"):
+        changes.append(f"修改时间 {format_time(old.get('time'))} -> {format_time(new.get('time'))}")
+    if old.get("target") != new.get("target"):
+        changes.append(f"链接目标 {old.get('target')} -> {new.get('target')}")
+    return ", ".join(changes)
+
+def format_time(value):
+    if value is None:
+        return "?"
+    # tree -J --timefmt %s 输出的 time 是字符串
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(float(value)))
+
+def entry_label(path, node):
+    label = f"{node.get('type', 'file')}:{path}"
+    if node.get("type") == "directory":
+        label += f" ({count_entries(node) - 1} 个条目)"
+    return label
+
+def format_report(results, old_path, new_path):
+    """生成与 directory_structure_monitor.sh 对比报告相同风格的文本"""
+    lines = [
+        "目录结构变化对比报告",
+        "====================",
+        f"生成时间: {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"当前文件: {os.path.basename(new_path)}",
+        f"对比文件: {os.path.basename(old_path)}",
+        "",
+    ]
+    for name, diff, old_counts, new_counts in results:
+        lines.append(f"=== {name}目录变化 ===")
+        if diff is None:
+            lines += ["无法比较（数据不完整）", ""]
+            continue
+        if diff.added:
+            lines.append("新增项目:")
+            lines += [f"  + {entry_label(path, node)}" for path, node in diff.added]
+        if diff.removed:
+            lines.append("删除项目:")
+            lines += [f"  - {entry_label(path, node)}" for path, node in diff.removed]
+        if diff.renamed:
+            lines.append("重命名/移动:")
+            lines += [f"  ~ {old} -> {new}" for old, new, _ in diff.renamed]
+        if diff.modified:
+            lines.append("修改项目:")
+            lines += [f"  * {path} ({describe_attributes(old, new)})" for path, old, new in diff.modified]
+        if not diff.has_changes():
+            lines.append("无变化")
+        lines.append("")
+
+    lines.append("=== 统计信息 ===")
+    for title, index in (("当前", 3), ("对比", 2)):
+        lines.append(f"{title}文件数量:")
+        total = 0
+        for result in results:
+            counts = result[index]
+            if counts:
+                lines.append(f"  {result[0]}目录: {counts[1]} 个文件, {counts[0]} 个子目录")
+                total += counts[1]
+        lines += [f"  总计: {total} 个文件", ""]
+    lines.append("变化量:")
+    total = 0
+    for name, _, old_counts, new_counts in results:
+        if old_counts and new_counts:
+            lines.append(f"  {name}目录: {new_counts[1] - old_counts[1]} 个文件")
+            total += new_counts[1] - old_counts[1]
+    lines.append(f"  总计: {total} 个文件")
+    return "\n".join(lines) + "\n"
+
+def entry_json(path, node):
+    item = {"path": path, "type": node.get("type", "file")}
+    if node.get("type") == "directory":
+        item["entries"] = count_entries(node) - 1
+    return item
+
+def attributes_json(node):
+    return {field: node[field] for field in LEAF_FIELDS if field in node}
+
+def format_json(results, old_path, new_path):
+    """生成 JSON 格式的差异"""
+    sections = {}
+    for name, diff, old_counts, new_counts in results:
+        if diff is None:
+            sections[name] = None
+            continue
+        sections[name] = {
+            "added": [entry_json(path, node) for path, node in diff.added],
+            "removed": [entry_json(path, node) for path, node in diff.removed],
+            "renamed": [{"from": old, "to": new, "type": node.get("type", "file")}
+                        for old, new, node in diff.renamed],
+            "modified": [{"path": path, "old": attributes_json(old), "new": attributes_json(new)}
+                         for path, old, new in diff.modified],
+            "stats": {
+                "previous": {"directories": old_counts[0], "files": old_counts[1]},
+                "current": {"directories": new_counts[0], "files": new_counts[1]},
+                "compared_directories": diff.compared,
+            },
+        }
+    return {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "current": new_path,
+        "previous": old_path,
+        "sections": sections,
+    }
+
+def load_store_sections(db_path, label):
+    """从 snapshot_store.py 的数据库读取一个标签下的所有部分"""
+    from snapshot_store import SnapshotStore
+
+    store = SnapshotStore(db_path)
+    try:
+        sections = {info["section"]: store.load_tree(info["id"]) for info in store.snapshots(label)}
+    finally:
+        store.close()
+    if not sections:
+        raise ValueError(f"快照数据库中没有标签 {label}: {db_path}")
+    return sections
+
+def diff_snapshots(old_path, new_path, db_path=None):
+    """
+    对比两个快照，返回 [(部分名称, TreeDiff 或 None, 原统计, 新统计)]
+
+    指定 db_path 时 old_path/new_path 为 snapshot_store.py 数据库中的标签，否则为 JSON 文件。
+    """
+    load = (lambda label: load_store_sections(db_path, label)) if db_path else load_sections
+    results = []
+    for name, old_root, new_root in pair_sections(load(old_path), load(new_path)):
+        if old_root is None or new_root is None:
+            results.append((name, None, None, None))
+            continue
+        old_counts = annotate(old_root) if HASH_KEY not in old_root else count_tree(old_root)
+        new_counts = annotate(new_root) if HASH_KEY not in new_root else count_tree(new_root)
+        results.append((name, TreeDiff().compare(old_root, new_root), old_counts, new_counts))
+    return results
+
+def write_text(path, text):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="目录树快照对比工具（Merkle 哈希）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    diff_parser = subparsers.add_parser("diff", help="对比两个快照")
+    diff_parser.add_argument("previous", help="上一次的快照")
+    diff_parser.add_argument("current", help="本次的快照")
+    diff_parser.add_argument("-o", "--output", help="可读报告输出文件（默认打印到屏幕）")
+    diff_parser.add_argument("--json", help="JSON 差异输出文件")
+    diff_parser.add_argument("--db", help="从 snapshot_store.py 的数据库读取，previous/current 为标签")
+
+    annotate_parser = subparsers.add_parser("annotate", help="为快照中的目录写入 Merkle 哈希")
+    annotate_parser.add_argument("snapshot", help="快照文件")
+    annotate_parser.add_argument("-o", "--output", required=True, help="输出文件")
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    start = time.time()
+    try:
+        if args.command == "annotate":
+            with open(args.snapshot, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+            for root in document_sections(document, args.snapshot).values():
+                annotate(root)
+            write_text(args.output, json.dumps(document, ensure_ascii=False, separators=(',', ':')) + "\n")
+            print(f"✅ 已写入目录哈希: {args.output} (用时 {time.time() - start:.2f} 秒)", file=sys.stderr)
+            return 0
+
+        results = diff_snapshots(args.previous, args.current, args.db)
+    except (OSError, ValueError, LookupError) as e:
+        print(f"❌ 读取快照失败: {e}", file=sys.stderr)
+        return 1
+
+    report = format_report(results, args.previous, args.current)
+    if args.output:
+        write_text(args.output, report)
+    else:
+        print(report, end="")
+    if args.json:
+        write_text(args.json, json.dumps(format_json(results, args.previous, args.current),
+                                         ensure_ascii=False, indent=2) + "\n")
+
+    changes = sum(len(d.added) + len(d.removed) + len(d.renamed) + len(d.modified)
+                  for _, d, _, _ in results if d)
+    compared = sum(d.compared for _, d, _, _ in results if d)
+    print(f"✅ 对比完成: {changes} 处变化, 展开 {compared} 个目录, 用时 {time.time() - start:.2f} 秒",
+          file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+目录树快照工具（替代 tree -J）
+
+使用线程池并行 os.scandir 各个子目录，输出与 tree -J 相同结构的 JSON：
+    [{"type": "directory", "name": <根目录>, "contents": [...]}, {"type": "report", "directories": N, "files": M}]
+    - 输出可直接交给 validate_vendor_structure.py 校验，也可被 directory_structure_monitor.sh 和
+      svn_structure_compare.sh 当作 tree -J 的输出使用
+    - -s/-D 为每个条目附加 size 和 time（mtime 秒数），相当于 tree -J -s -D --timefmt %s
+    - -L 与 tree 相同，限制列出的层数；超过层数的目录只输出 type 和 name，不含 contents
+    - 条目按名称排序（与 LC_ALL=C tree 一致），默认不包含以 . 开头的隐藏条目
+    - --cache 启用增量刷新：缓存文件记录每个目录的 mtime/ctime/inode 和列表，下次运行时只对
+      这些值有变化的目录重新列出，其余目录只 stat 一次、直接复用缓存中的列表；--full 忽略缓存
+      完整扫描，--scrub 按比例随机抽查未变化的目录并与缓存比对
+      注意：文件内容被原地改写不会改变目录的 mtime，复用目录中文件的 size/time 沿用缓存值，
+      需要精确值时使用 --full
+
+用法:
+    python tree_snapshot.py /HDD_Raid/SVN_MODEL_REPO/Vendor -o vendor_tree.json
+    python tree_snapshot.py /HDD_Raid/SVN_MODEL_REPO/Vendor -L 6 -o vendor_tree.json   # Vendor 校验需要的 6 层
+    python tree_snapshot.py /HDD_Raid/SVN_MODEL_REPO/Model -s -D -j 64 --compact -o model_tree.json
+    python tree_snapshot.py /HDD_Raid/SVN_MODEL_REPO/Vendor --cache Vendor.dircache -o vendor_tree.json
+    python tree_snapshot.py /HDD_Raid/SVN_MODEL_REPO/Vendor --cache Vendor.dircache --full -o vendor_tree.json
+"""
+
+import argparse
+import json
+import os
+import queue
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+# scandir 的耗时主要在等待 I/O，线程数可以远多于 CPU 核心数
+DEFAULT_WORKERS = 32
+CACHE_VERSION = 1
+# 增量刷新时默认抽查的未变化目录比例
+DEFAULT_SCRUB_FRACTION = 0.01
+
+class TreeSnapshotter:
+    """并行扫描目录树，生成 tree -J 结构的快照"""
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_depth=None, with_size=False, with_time=False,
+                 show_hidden=False, dirs_first=False, cache=None, scrub_fraction=0.0):
+        """
+        cache 为 None 时不做增量刷新；为字典（可以为空）时，{相对路径: [mtime_ns, ctime_ns, inode, 列表]}
+        中 stat 值未变的目录直接复用列表，扫描后 self.new_cache 为本次的缓存内容
+        """
+        self.workers = workers
+        self.max_depth = max_depth
+        self.with_size = with_size
+        self.with_time = with_time
+        self.show_hidden = show_hidden
+        self.dirs_first = dirs_first
+        self.cache = cache
+        self.scrub_fraction = scrub_fraction
+        self.new_cache = {}
+        self.directories = 0
+        self.files = 0
+        self.errors = 0
+        # 增量刷新统计：重新列出 / 复用 / 抽查 / 抽查不一致的目录数
+        self.listed = 0
+        self.reused = 0
+        self.scrubbed = 0
+        self.mismatched = []
+
+    def options(self):
+        """影响目录列表内容的选项，缓存只在选项相同时可用"""
+        return {"size": self.with_size, "time": self.with_time, "hidden": self.show_hidden,
+                "dirsfirst": self.dirs_first}
+
+    def make_node(self, entry):
+        """由 os.DirEntry 生成条目，返回 (条目, 是否需要继续列出)"""
+        node = {"name": entry.name}
+        descend = False
+        try:
+            if entry.is_symlink():
+                node = {"type": "link", "name": entry.name, "target": os.readlink(entry.path)}
+            elif entry.is_dir(follow_symlinks=False):
+                node = {"type": "directory", "name": entry.name}
+                descend = True
+            else:
+                node = {"type": "file", "name": entry.name}
+            if self.with_size or self.with_time:
+                self.add_stat(node, entry.stat(follow_symlinks=False))
+        except OSError as e:
+            node.setdefault("type", "file")
+            node["error"] = e.strerror or str(e)
+        return node, descend
+
+    def add_stat(self, node, st):
+        if self.with_size:
+            node["size"] = st.st_size
+        if self.with_time:
+            node["time"] = int(st.st_mtime)
+
+    def sort_key(self, node):
+        if self.dirs_first:
+            return (node["type"] != "directory", node["name"])
+        return node["name"]
+
+    def list_directory(self, path):
+        """列出一个目录，返回 (条目列表, 需要继续列出的子目录名, 错误信息)"""
+        try:
+            with os.scandir(path) as it:
+                entries = [entry for entry in it if self.show_hidden or not entry.name.startswith('.')]
+        except OSError as e:
+            return [], [], e.strerror or str(e)
+        contents = []
+        subdirs = []
+        for entry in entries:
+            node, descend = self.make_node(entry)
+            contents.append(node)
+            if descend:
+                subdirs.append(node)
+        contents.sort(key=self.sort_key)
+        return contents, subdirs, None
+
+    def listing_key(self, listing):
+        """抽查时比较的内容：目录自身的 size/time 随其子条目变化，不参与比较"""
+        return [(node["name"], node["type"]) if node["type"] == "directory" else node for node in listing]
+
+    def refresh_directory(self, path, rel_path, node):
+        """
+        增量刷新一个目录，返回 (条目列表, 子目录列表, 错误信息, 缓存项, 状态)
+
+        先 stat 再列出，列出期间目录发生的变化会使下次运行时 stat 值不一致而重新列出。
+        状态为 listed / reused / scrubbed / mismatch 之一。
+        父目录复用缓存时其列表中本目录的 size/time 可能已过期，这里用本次 stat 的结果更新 node。
+        """
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            return [], [], e.strerror or str(e), None, "listed"
+        if self.with_size or self.with_time:
+            self.add_stat(node, st)
+        stamp = [st.st_mtime_ns, st.st_ctime_ns, st.st_ino]
+        cached = self.cache.get(rel_path)
+        status = "listed"
+        if cached is not None and cached[:3] == stamp:
+            if not (self.scrub_fraction and random.random() < self.scrub_fraction):
+                contents = [dict(node) for node in cached[3]]
+                subdirs = [node for node in contents if node["type"] == "directory"]
+                return contents, subdirs, None, cached, "reused"
+            status = "scrubbed"
+        contents, subdirs, error = self.list_directory(path)
+        if error:
+            return contents, subdirs, error, None, status
+        listing = [dict(node) for node in contents]
+        if status == "scrubbed" and self.listing_key(listing) != self.listing_key(cached[3]):
+            status = "mismatch"
+        return contents, subdirs, None, stamp + [listing], status
+
+    def scan(self, root):
+        """
+        扫描 root 并返回 tree -J 结构的快照
+
+        每个目录是一个任务，完成后通过队列交回主线程，由主线程挂到父节点上并提交其子目录，
+        因此无论有多少目录，调度开销都与目录数成线性关系。
+        """
+        root_node = {"type": "directory", "name": root}
+        if self.with_size or self.with_time:
+            self.add_stat(root_node, os.stat(root))
+        self.directories = self.files = self.errors = 0
+        if self.max_depth is not None and self.max_depth < 1:
+            return [root_node, self.report()]
+
+        self.listed = self.reused = self.scrubbed = 0
+        self.mismatched = []
+        self.new_cache = {}
+
+        results = queue.Queue()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            def submit(node, path, rel_path, depth):
+                if self.cache is None:
+                    future = executor.submit(self.list_directory, path)
+                else:
+                    future = executor.submit(self.refresh_directory, path, rel_path, node)
+                future.add_done_callback(lambda f: results.put((node, path, rel_path, depth, f)))
+
+            submit(root_node, root, "", 0)
+            outstanding = 1
+            while outstanding:
+                node, path, rel_path, depth, future = results.get()
+                outstanding -= 1
+                if self.cache is None:
+                    contents, subdirs, error = future.result()
+                    self.listed += 1
+                else:
+                    contents, subdirs, error, entry, status = future.result()
+                    if entry is not None:
+                        self.new_cache[rel_path] = entry
+                    if status == "reused":
+                        self.reused += 1
+                    else:
+                        self.listed += 1
+                    if status in ("scrubbed", "mismatch"):
+                        self.scrubbed += 1
+                    if status == "mismatch":
+                        self.mismatched.append(rel_path or ".")
+                node["contents"] = contents
+                if error:
+                    node["error"] = error
+                    self.errors += 1
+                for child in contents:
+                    if child["type"] == "directory":
+                        self.directories += 1
+                    else:
+                        self.files += 1
+                    if "error" in child:
+                        self.errors += 1
+                if self.max_depth is None or depth + 1 < self.max_depth:
+                    for child in subdirs:
+                        child_rel = f"{rel_path}/{child['name']}" if rel_path else child["name"]
+                        submit(child, os.path.join(path, child["name"]), child_rel, depth + 1)
+                        outstanding += 1
+        return [root_node, self.report()]
+
+    def report(self):
+        return {"type": "report", "directories": self.directories, "files": self.files}
+
+def load_cache(cache_file, root, options):
+    """
+    读取目录列表缓存，返回 {相对路径: [mtime_ns, ctime_ns, inode, 列表]}
+
+    缓存不存在、损坏，或根目录/选项与本次不同时返回空字典（即完整扫描）。
+    """
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if (not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION
+            or cache.get("root") != os.path.abspath(root) or cache.get("options") != options):
+        return {}
+    return cache.get("directories", {})
+
+def save_cache(cache_file, root, options, directories):
+    """写出目录列表缓存（先写临时文件再替换）"""
+    cache = {"version": CACHE_VERSION, "root": os.path.abspath(root), "options": options,
+             "directories": directories}
+    tmp_path = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(cache, ensure_ascii=False, separators=(',', ':')))
+    os.replace(tmp_path, cache_file)
+
+def write_snapshot(document, output=None, compact=False):
+    """写出快照；output 为空或 - 时写到标准输出，写文件时先写临时文件再替换"""
+    # json.dumps 在不缩进时使用 C 编码器，json.dump 和带缩进的输出都走纯 Python 实现，慢数倍
+    if compact:
+        text = json.dumps(document, ensure_ascii=False, separators=(',', ':'))
+    else:
+        text = json.dumps(document, ensure_ascii=False, indent=2)
+    if not output or output == "-":
+        sys.stdout.write(text + "\n")
+        return
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text + "\n")
+    os.replace(tmp_path, output)
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="目录树快照工具（输出与 tree -J 相同结构的 JSON）")
+    parser.add_argument("root", help="要扫描的目录")
+    parser.add_argument("-o", "--output", help="输出文件（默认标准输出）")
+    parser.add_argument("-j", "--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"并行扫描线程数（默认 {DEFAULT_WORKERS}）")
+    parser.add_argument("-L", "--level", type=int, help="最多列出的层数，与 tree -L 相同")
+    parser.add_argument("-s", "--size", action="store_true", help="附加文件大小（size）")
+    parser.add_argument("-D", "--mtime", action="store_true", help="附加修改时间（time，秒）")
+    parser.add_argument("-a", "--all", action="store_true", help="包含以 . 开头的隐藏条目")
+    parser.add_argument("--dirsfirst", action="store_true", help="目录排在文件之前")
+    parser.add_argument("--compact", action="store_true", help="输出不带缩进的紧凑 JSON")
+    parser.add_argument("--cache", help="目录列表缓存文件，存在时只重新列出有变化的目录，扫描后更新")
+    parser.add_argument("--full", action="store_true", help="忽略缓存完整扫描（仍会写出新的缓存）")
+    parser.add_argument("--scrub", type=float, default=DEFAULT_SCRUB_FRACTION,
+                        help=f"随机抽查未变化目录的比例（默认 {DEFAULT_SCRUB_FRACTION}，0 表示不抽查）")
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    if not os.path.isdir(args.root):
+        print(f"❌ 目录不存在: {args.root}", file=sys.stderr)
+        return 1
+
+    snapshotter = TreeSnapshotter(args.workers, args.level, args.size, args.mtime, args.all, args.dirsfirst,
+                                  scrub_fraction=args.scrub)
+    if args.cache:
+        snapshotter.cache = {} if args.full else load_cache(args.cache, args.root, snapshotter.options())
+    start = time.time()
+    document = snapshotter.scan(args.root)
+    scan_time = time.time() - start
+    write_snapshot(document, args.output, args.compact)
+    if args.cache:
+        save_cache(args.cache, args.root, snapshotter.options(), snapshotter.new_cache)
+
+    # 统计信息写到标准错误，避免混入标准输出的 JSON
+    print(f"✅ 扫描完成: {snapshotter.directories} 个目录, {snapshotter.files} 个文件, "
+          f"用时 {scan_time:.2f} 秒", file=sys.stderr)
+    if args.cache:
+        print(f"   重新列出 {snapshotter.listed} 个目录, 复用缓存 {snapshotter.reused} 个, "
+              f"抽查 {snapshotter.scrubbed} 个", file=sys.stderr)
+    if snapshotter.mismatched:
+        print(f"⚠️ {len(snapshotter.mismatched)} 个目录 stat 未变但内容与缓存不一致，已使用重新列出的结果:",
+              file=sys.stderr)
+        for rel_path in snapshotter.mismatched[:20]:
+            print(f"   - {rel_path}", file=sys.stderr)
+    if snapshotter.errors:
+        print(f"⚠️ {snapshotter.errors} 个条目无法读取，已在快照中标记 error", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
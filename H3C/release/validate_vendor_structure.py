@@ -1,34 +1,470 @@
+import argparse
+import hashlib
 import json
+import os
+import re
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 import jsonschema
 
-def validate_json_structure(json_file_path, schema_file_path):
+# Compiled validators are cached here as Python source, keyed by the schema hash
+CACHE_DIR = Path.home() / ".cache" / "h3c_schema_validators"
+# Bump when the generated code changes so stale cache entries are not reused
+GENERATOR_VERSION = "3"
+READ_SIZE = 1024 * 1024
+# Trees smaller than this are validated in-process; worker start-up would cost more than it saves
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+# Vendors in flight per worker; bounds how much of the tree is held in pending work items
+IN_FLIGHT_PER_WORKER = 2
+
+# Keywords the code generator understands; schemas using anything else fall back to jsonschema
+ANNOTATION_KEYWORDS = {"$schema", "$id", "$comment", "title", "description", "default", "examples"}
+SUPPORTED_KEYWORDS = ANNOTATION_KEYWORDS | {
+    "type", "const", "enum", "properties", "required", "additionalProperties",
+    "items", "additionalItems", "minItems", "maxItems", "minLength", "maxLength", "pattern",
+}
+TYPE_CHECKS = {
+    "object": "isinstance({v}, dict)",
+    "array": "isinstance({v}, list)",
+    "string": "isinstance({v}, str)",
+    "integer": "(isinstance({v}, int) and not isinstance({v}, bool))",
+    "number": "(isinstance({v}, (int, float)) and not isinstance({v}, bool))",
+    "boolean": "isinstance({v}, bool)",
+    "null": "({v} is None)",
+}
+
+# `tree -J <dir>` output starts with the root directory object whose contents are the vendors
+TREE_ROOT_PREFIX = re.compile(
+    r'\s*\[\s*\{\s*"type"\s*:\s*"directory"\s*,\s*"name"\s*:\s*"(?:[^"\\]|\\.)*"'
+    r'(?:\s*,\s*"\w+"\s*:\s*(?:"(?:[^"\\]|\\.)*"|-?[\d.eE+]+))*'
+    r'\s*,\s*"contents"\s*:\s*\['
+)
+# ...and ends with the report object, which tells it apart from a plain array of vendors
+TREE_REPORT_SUFFIX = re.compile(r'\{\s*"type"\s*:\s*"report"[^{}]*\}\s*\]\s*$')
+ARRAY_PREFIX = re.compile(r'\s*\[')
+
+# JSON equality as jsonschema defines it for const/enum: booleans never equal numbers
+EQUAL_SOURCE = """\
+def _equal(a, b):
+    if isinstance(a, str) or isinstance(b, str):
+        return a == b
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_equal(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_equal(a[key], b[key]) for key in a)
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool) and a == b
+    return a == b
+"""
+
+class UnsupportedSchema(Exception):
+    """The schema uses keywords the code generator does not handle."""
+
+class _CodeGenerator:
+    """Translates a JSON schema into Python source with one function per subschema."""
+
+    def __init__(self):
+        self.lines = []
+        self.constants = []
+        self.count = 0
+
+    def constant(self, value):
+        self.constants.append(f"_C{len(self.constants)} = {value!r}")
+        return f"_C{len(self.constants) - 1}"
+
+    def function(self, schema):
+        """Emits a validator function for `schema` and returns its name."""
+        name = f"_v{self.count}"
+        self.count += 1
+        if schema is True or schema == {}:
+            self.lines += [f"def {name}(value, path, errors):", "    pass", ""]
+            return name
+        if schema is False:
+            self.lines += [f"def {name}(value, path, errors):",
+                           "    errors.append((path, 'False schema does not allow ' + repr(value)))", ""]
+            return name
+        if not isinstance(schema, dict):
+            raise UnsupportedSchema(f"schema must be an object or boolean, got {schema!r}")
+        unsupported = set(schema) - SUPPORTED_KEYWORDS
+        if unsupported:
+            raise UnsupportedSchema(f"unsupported keywords: {', '.join(sorted(unsupported))}")
+
+        # Child functions are emitted first so the body can reference them
+        properties = {key: self.function(sub) for key, sub in schema.get("properties", {}).items()}
+        additional = schema.get("additionalProperties", True)
+        additional_fn = self.function(additional) if isinstance(additional, dict) else None
+        items = schema.get("items")
+        items_fn = self.function(items) if isinstance(items, (dict, bool)) else None
+        tuple_fns = [self.function(sub) for sub in items] if isinstance(items, list) else None
+        extra_items = schema.get("additionalItems", True)
+        extra_items_fn = self.function(extra_items) if isinstance(extra_items, dict) and tuple_fns else None
+
+        body = []
+        types = schema.get("type")
+        if types is not None:
+            types = [types] if isinstance(types, str) else types
+            if any(t not in TYPE_CHECKS for t in types):
+                raise UnsupportedSchema(f"unsupported type: {types!r}")
+            check = " or ".join(TYPE_CHECKS[t].format(v="value") for t in types)
+            expected = " is not of type " + ", ".join(repr(t) for t in types)
+            body += [f"if not ({check}):",
+                     f"    errors.append((path, repr(value) + {expected!r}))",
+                     "    return"]
+        # Python's == treats True as 1; string constants are unaffected, anything else uses _equal
+        if "const" in schema:
+            const = self.constant(schema["const"])
+            check = (f"value != {const}" if isinstance(schema["const"], str)
+                     else f"not _equal(value, {const})")
+            body += [f"if {check}:",
+                     f"    errors.append((path, repr({const}) + ' was expected'))"]
+        if "enum" in schema:
+            enum = self.constant(list(schema["enum"]))
+            check = (f"value not in {enum}" if all(isinstance(item, str) for item in schema["enum"])
+                     else f"not any(_equal(value, item) for item in {enum})")
+            body += [f"if {check}:",
+                     f"    errors.append((path, repr(value) + ' is not one of ' + repr({enum})))"]
+
+        obj = []
+        for key in schema.get("required", []):
+            obj += [f"if {key!r} not in value:",
+                    f"    errors.append((path, {repr(key) + ' is a required property'!r}))"]
+        for key, fn in properties.items():
+            obj += [f"if {key!r} in value:",
+                    f"    {fn}(value[{key!r}], path + ({key!r},), errors)"]
+        if additional is False or additional_fn:
+            known = self.constant(frozenset(properties))
+            if additional is False:
+                obj += [f"extra = value.keys() - {known}",
+                        "if extra:",
+                        "    errors.append((path, 'Additional properties are not allowed ('"
+                        " + ', '.join(sorted(map(repr, extra))) + ' unexpected)'))"]
+            else:
+                obj += [f"for key in value.keys() - {known}:",
+                        f"    {additional_fn}(value[key], path + (key,), errors)"]
+        if obj:
+            body += ["if isinstance(value, dict):"] + ["    " + line for line in obj]
+
+        arr = []
+        if "minItems" in schema:
+            arr += [f"if len(value) < {int(schema['minItems'])}:",
+                    f"    errors.append((path, 'expected at least {int(schema['minItems'])} items, got '"
+                    " + str(len(value))))"]
+        if "maxItems" in schema:
+            arr += [f"if len(value) > {int(schema['maxItems'])}:",
+                    f"    errors.append((path, 'expected at most {int(schema['maxItems'])} items, got '"
+                    " + str(len(value))))"]
+        if items_fn:
+            arr += ["for index, item in enumerate(value):",
+                    f"    {items_fn}(item, path + (index,), errors)"]
+        if tuple_fns:
+            for index, fn in enumerate(tuple_fns):
+                arr += [f"if len(value) > {index}:",
+                        f"    {fn}(value[{index}], path + ({index},), errors)"]
+            if extra_items is False:
+                arr += [f"if len(value) > {len(tuple_fns)}:",
+                        "    errors.append((path, 'Additional items are not allowed'))"]
+            elif extra_items_fn:
+                arr += [f"for index in range({len(tuple_fns)}, len(value)):",
+                        f"    {extra_items_fn}(value[index], path + (index,), errors)"]
+        if arr:
+            body += ["if isinstance(value, list):"] + ["    " + line for line in arr]
+
+        text = []
+        if "minLength" in schema:
+            text += [f"if len(value) < {int(schema['minLength'])}:",
+                     "    errors.append((path, repr(value) + ' is too short'))"]
+        if "maxLength" in schema:
+            text += [f"if len(value) > {int(schema['maxLength'])}:",
+                     "    errors.append((path, repr(value) + ' is too long'))"]
+        if "pattern" in schema:
+            pattern = self.constant(schema["pattern"])
+            text += [f"if _re.search({pattern}, value) is None:",
+                     f"    errors.append((path, repr(value) + ' does not match ' + repr({pattern})))"]
+        if text:
+            body += ["if isinstance(value, str):"] + ["    " + line for line in text]
+
+        self.lines += [f"def {name}(value, path, errors):"] + ["    " + line for line in body or ["pass"]] + [""]
+        return name
+
+def generate_validator_source(schema):
+    """
+    Generates Python source for a schema validator.
+
+    The module defines `validate(value, path, errors)`. For an array schema whose `items` is a single
+    schema it also defines `validate_item` (one element) and `validate_container` (array-level
+    constraints only), which allow vendors to be validated one at a time.
+
+    Raises:
+        UnsupportedSchema: If the schema uses keywords the generator does not handle.
+    """
+    generator = _CodeGenerator()
+    entries = {"validate": generator.function(schema)}
+    if isinstance(schema, dict) and isinstance(schema.get("items"), (dict, bool)):
+        entries["validate_item"] = generator.function(schema["items"])
+        container = {k: v for k, v in schema.items() if k not in ("items", "additionalItems")}
+        entries["validate_container"] = generator.function(container)
+    lines = ["# Generated by validate_vendor_structure.py, do not edit", "import re as _re", "", EQUAL_SOURCE]
+    lines += generator.constants + [""] + generator.lines
+    lines += [f"{entry} = {fn}" for entry, fn in entries.items()]
+    # Written last, so a truncated cache file is detected by its absence
+    lines += [f"ENTRIES = {tuple(entries)!r}"]
+    return "\n".join(lines) + "\n"
+
+def load_validator_source(schema_file_path, use_cache=True):
+    """
+    Returns (validator source, cache path or None) for a schema file.
+
+    The generated source is cached on disk keyed by the SHA256 of the schema file, so the schema
+    is parsed, checked and compiled only when it changes.
+
+    Raises:
+        UnsupportedSchema: If the schema cannot be compiled.
+    """
+    raw = Path(schema_file_path).read_bytes()
+    key = hashlib.sha256(raw + GENERATOR_VERSION.encode()).hexdigest()
+    cache_path = CACHE_DIR / f"{key}.py"
+    if use_cache and cache_path.exists():
+        try:
+            source = cache_path.read_text(encoding='utf-8')
+            compile_validator(source, str(cache_path))
+            return source, cache_path
+        except (OSError, UnicodeDecodeError, SyntaxError, ValueError) as e:
+            print(f"Cached validator {cache_path} is unusable ({e}); regenerating")
+
+    schema = json.loads(raw)
+    jsonschema.validators.validator_for(schema).check_schema(schema)
+    source = generate_validator_source(schema)
+    if not use_cache:
+        return source, None
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(source)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        return source, None
+    return source, cache_path
+
+def compile_validator(source, filename="<schema validator>"):
+    """
+    Executes generated validator source and returns its namespace.
+
+    Raises:
+        SyntaxError: If the source does not compile.
+        ValueError: If the source does not define every entry point listed in its ENTRIES.
+    """
+    namespace = {}
+    exec(compile(source, filename, "exec"), namespace)
+    entries = namespace.get("ENTRIES")
+    if not isinstance(entries, tuple) or "validate" not in entries \
+            or any(not callable(namespace.get(entry)) for entry in entries):
+        raise ValueError("generated validator is incomplete")
+    return namespace
+
+def _skip_whitespace(buffer, pos):
+    while pos < len(buffer) and buffer[pos] in " \t\r\n":
+        pos += 1
+    return pos
+
+def iter_vendor_subtrees(json_file_path):
+    """
+    Streams the vendor directories of a tree snapshot one at a time.
+
+    Handles `tree -J <dir>` output (the root directory object, whose contents are the vendors,
+    followed by a report object) and a plain JSON array of vendors. Only one vendor subtree is held
+    in memory at a time.
+
+    Returns:
+        An iterator of vendor subtrees, or None if the file has some other layout.
+
+    Raises:
+        json.JSONDecodeError: If the file is malformed.
+    """
+    with open(json_file_path, 'rb') as f:
+        f.seek(max(0, os.path.getsize(json_file_path) - 4096))
+        tail = f.read().decode('utf-8', errors='ignore')
+    f = open(json_file_path, 'r', encoding='utf-8')
+    buffer = f.read(READ_SIZE)
+    match = TREE_ROOT_PREFIX.match(buffer)
+    array = ARRAY_PREFIX.match(buffer)
+    if match and TREE_REPORT_SUFFIX.search(tail):
+        start = match.end()
+    elif array:
+        start = array.end()
+    else:
+        f.close()
+        return None
+
+    def generate(buffer, pos):
+        decoder = json.JSONDecoder()
+        eof = False
+        with f:
+            while True:
+                pos = _skip_whitespace(buffer, pos)
+                if pos < len(buffer) and buffer[pos] == ']':
+                    return
+                if pos < len(buffer) and buffer[pos] == ',':
+                    pos += 1
+                    continue
+                try:
+                    if pos == len(buffer):
+                        raise json.JSONDecodeError("Expecting value", buffer, pos)
+                    value, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    # The element is incomplete; read more (at least doubling) and retry
+                    more = f.read(max(READ_SIZE, len(buffer) - pos))
+                    eof = not more
+                    buffer, pos = buffer[pos:] + more, 0
+                    continue
+                yield value
+                pos = end
+                if pos > READ_SIZE:
+                    buffer, pos = buffer[pos:], 0
+
+    return generate(buffer, start)
+
+def extract_vendor_list(document):
+    """
+    Finds the vendor array in a loaded tree document.
+
+    Accepts `tree -J` output, a plain vendor array, and the wrapped formats written by
+    svn_structure_compare.sh (`{"structure": root}`) and directory_structure_monitor.sh
+    (`{"directories": {"Vendor": root}}`).
     """
-    Validates a JSON file against a JSON schema file.
+    if isinstance(document, dict):
+        root = document.get("structure") or (document.get("directories") or {}).get("Vendor")
+        return root.get("contents", []) if isinstance(root, dict) else document
+    if (isinstance(document, list) and document and isinstance(document[-1], dict)
+            and document[-1].get("type") == "report"):
+        return document[0].get("contents", [])
+    return document
+
+def format_path(path):
+    """Formats a path tuple as a JSON path, e.g. $[3].contents[0].name"""
+    text = "$"
+    for step in path:
+        text += f"[{step}]" if isinstance(step, int) else f".{step}"
+    return text
+
+def describe_location(vendors, path):
+    """Returns the directory names along a path, e.g. kunlunxin/P800, for readable error messages."""
+    names = []
+    node = vendors
+    for step in path:
+        try:
+            node = node[step]
+        except (IndexError, KeyError, TypeError):
+            break
+        if isinstance(node, dict) and isinstance(node.get("name"), str):
+            names.append(node["name"])
+    return "/".join(names)
+
+_worker_namespace = None
+
+def _init_worker(source):
+    global _worker_namespace
+    _worker_namespace = compile_validator(source)
+
+def _validate_vendor(index, vendor, namespace=None):
+    """Validates one vendor subtree; returns [(json path, location, message), ...]."""
+    namespace = namespace or _worker_namespace
+    errors = []
+    namespace["validate_item"](vendor, (index,), errors)
+    return [(format_path(path), describe_location({index: vendor}, path), message)
+            for path, message in errors]
+
+def validate_document(instance, schema_file_path):
+    """Validates a whole document with jsonschema, reporting every error (fallback path)."""
+    with open(schema_file_path, 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+    validator = jsonschema.validators.validator_for(schema)(schema)
+    return [(format_path(error.absolute_path), describe_location(instance, error.absolute_path), error.message)
+            for error in validator.iter_errors(instance)]
+
+def validate_json_structure(json_file_path, schema_file_path, workers=None, use_cache=True, max_errors=50):
+    """
+    Validates a directory-structure JSON file against a JSON schema file.
+
+    The schema is compiled to Python once and cached on disk by its hash. Vendor subtrees are
+    streamed from the tree file and validated in parallel for large trees, and every error is
+    reported with its JSON path rather than stopping at the first one.
 
     Args:
         json_file_path (str): The path to the JSON file containing the data (directory structure).
         schema_file_path (str): The path to the JSON schema file.
+        workers (int): Worker processes for large trees (default: CPU count).
+        use_cache (bool): Whether to use the on-disk cache of compiled validators.
+        max_errors (int): Maximum number of errors to print.
 
     Returns:
         int: 0 if validation is successful, 1 if validation fails, 2 if there's an error reading files or arguments.
     """
     try:
-        # Read JSON data
-        with open(json_file_path, 'r') as f:
-            json_data = json.load(f)
-        print(f"Successfully read JSON data from {json_file_path}")
+        try:
+            source, cache_path = load_validator_source(schema_file_path, use_cache)
+        except UnsupportedSchema as e:
+            source, cache_path = None, None
+            print(f"Schema cannot be compiled ({e}); falling back to jsonschema")
+        else:
+            cached = f" (compiled validator: {cache_path})" if cache_path else ""
+            print(f"Successfully read JSON schema from {schema_file_path}{cached}")
 
-        # Read JSON schema
-        with open(schema_file_path, 'r') as f:
-            json_schema = json.load(f)
-        print(f"Successfully read JSON schema from {schema_file_path}")
+        namespace = compile_validator(source) if source else None
+        vendors = iter_vendor_subtrees(json_file_path) if namespace and "validate_item" in namespace else None
+        errors = []
+        if vendors is not None:
+            workers = workers or os.cpu_count() or 1
+            parallel = workers > 1 and os.path.getsize(json_file_path) >= PARALLEL_MIN_BYTES
+            count = 0
+            if parallel:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         initargs=(source,)) as executor:
+                    futures = deque()
+                    for count, vendor in enumerate(vendors, 1):
+                        if len(futures) >= workers * IN_FLIGHT_PER_WORKER:
+                            errors.extend(futures.popleft().result())
+                        futures.append(executor.submit(_validate_vendor, count - 1, vendor))
+                    while futures:
+                        errors.extend(futures.popleft().result())
+            else:
+                for count, vendor in enumerate(vendors, 1):
+                    errors.extend(_validate_vendor(count - 1, vendor, namespace))
+            container_errors = []
+            namespace["validate_container"]([None] * count, (), container_errors)
+            errors = [(format_path(path), "", message) for path, message in container_errors] + errors
+            print(f"Successfully read JSON data from {json_file_path} ({count} vendors"
+                  f"{f', {workers} workers' if parallel else ''})")
+        else:
+            with open(json_file_path, 'r', encoding='utf-8') as f:
+                instance = extract_vendor_list(json.load(f))
+            print(f"Successfully read JSON data from {json_file_path}")
+            if namespace:
+                raw_errors = []
+                namespace["validate"](instance, (), raw_errors)
+                errors = [(format_path(path), describe_location(instance, path), message)
+                          for path, message in raw_errors]
+            else:
+                errors = validate_document(instance, schema_file_path)
 
-        # Perform validation
-        jsonschema.validate(instance=json_data, schema=json_schema)
+        if not errors:
+            print("JSON validation successful!")
+            return 0 # Success
 
-        print("JSON validation successful!")
-        return 0 # Success
+        print(f"JSON validation failed: {len(errors)} error(s)", file=sys.stderr)
+        for path, location, message in errors[:max_errors]:
+            where = f" ({location})" if location else ""
+            print(f"  {path}{where}: {message}", file=sys.stderr)
+        if len(errors) > max_errors:
+            print(f"  ... {len(errors) - max_errors} more", file=sys.stderr)
+        return 1 # Validation failure
 
     except FileNotFoundError:
         print(f"Error: File not found. Check paths: {json_file_path} or {schema_file_path}", file=sys.stderr)
@@ -36,24 +472,25 @@ def validate_json_structure(json_file_path, schema_file_path):
     except json.JSONDecodeError:
         print(f"Error: Could not decode JSON from {json_file_path} or {schema_file_path}. Check file format.", file=sys.stderr)
         return 2 # JSON format error
-    except jsonschema.exceptions.ValidationError as e:
-        print("JSON validation failed:", file=sys.stderr)
-        print(f"Error details: {e.message}", file=sys.stderr)
-        # You might want to print more details for complex schemas
-        # print(e.path)
-        # print(e.schema_path)
-        return 1 # Validation failure
+    except jsonschema.exceptions.SchemaError as e:
+        print(f"Error: Invalid JSON schema {schema_file_path}: {e.message}", file=sys.stderr)
+        return 2 # Schema error
     except Exception as e:
         print(f"An unexpected error occurred: {e}", file=sys.stderr)
         return 2 # Other errors
 
-if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python validate_script.py <json_file_path> <schema_file_path>", file=sys.stderr)
-        sys.exit(2) # Incorrect arguments
-
-    json_file = sys.argv[1]
-    schema_file = sys.argv[2]
+def parse_arguments():
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(description="Validate a vendor directory tree snapshot against a JSON schema.")
+    parser.add_argument("json_file", help="Tree snapshot (tree -J output or a JSON array of vendors)")
+    parser.add_argument("schema_file", help="JSON schema file, e.g. vendor_schema.json")
+    parser.add_argument("-j", "--workers", type=int, help="Worker processes for large trees (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the compiled-validator cache")
+    parser.add_argument("--max-errors", type=int, default=50, help="Maximum number of errors to print (default: 50)")
+    return parser.parse_args()
 
-    exit_code = validate_json_structure(json_file, schema_file)
-    sys.exit(exit_code)
\ No newline at end of file
+if __name__ == "__main__":
+    args = parse_arguments()
+    exit_code = validate_json_structure(args.json_file, args.schema_file, args.workers,
+                                        not args.no_cache, args.max_errors)
+    sys.exit(exit_code)
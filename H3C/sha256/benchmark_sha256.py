@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地SHA256读取方式基准测试
+对比 buffered / fadvise / direct 三种读取方式在不同缓冲区大小下的吞吐，
+以及计算后页缓存（/proc/meminfo 中的 Cached）的增长量，用于选择 local_sha256.py 的参数。
+
+每轮测试前用 POSIX_FADV_DONTNEED 将测试文件逐出页缓存，保证冷读取（无需 root 权限）；
+指定 --drop-caches 时改为写 /proc/sys/vm/drop_caches（需要 root）。
+
+用法:
+    python benchmark_sha256.py /HDD_Raid/SVN_MODEL_REPO/Model/DeepSeek-R1-0528/model-0000[1-4]-of-000163.safetensors
+    python benchmark_sha256.py <文件...> -m fadvise direct -b 4 16 64
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from local_sha256 import IO_MODES, hash_file, resolve_io_mode, format_size, format_speed
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+def cached_bytes():
+    """返回 /proc/meminfo 中的页缓存大小（字节），不支持时返回 None"""
+    try:
+        with open('/proc/meminfo', 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('Cached:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def evict(paths, drop_caches=False):
+    """将测试文件逐出页缓存"""
+    if drop_caches:
+        os.sync()
+        with open('/proc/sys/vm/drop_caches', 'w') as f:
+            f.write('3\n')
+        return
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+def run_case(paths, io_mode, buffer_size, drop_caches=False):
+    """
+    运行一组测试
+
+    Returns:
+        (总字节数, 耗时秒数, 页缓存增长字节数或None, 各文件sha256)
+    """
+    evict(paths, drop_caches)
+    before = cached_bytes()
+    total = 0
+    digests = {}
+    start = time.perf_counter()
+    for path in paths:
+        _, sha256, size, _ = hash_file(path, buffer_size, io_mode)
+        digests[path] = sha256
+        total += size
+    elapsed = time.perf_counter() - start
+    after = cached_bytes()
+    growth = after - before if before is not None and after is not None else None
+    return total, elapsed, growth, digests
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="本地SHA256读取方式基准测试")
+    parser.add_argument("files", nargs="+", help="测试文件（建议使用多个GB级的大文件）")
+    parser.add_argument("-m", "--modes", nargs="+", choices=IO_MODES, default=list(IO_MODES), help="读取方式")
+    parser.add_argument("-b", "--buffer-sizes", nargs="+", type=int, default=[1, 4, 16, 64],
+                        help="缓冲区大小，单位MB（默认 1 4 16 64）")
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="每组重复次数，取最快的一次")
+    parser.add_argument("--drop-caches", action="store_true", help="每轮前写 /proc/sys/vm/drop_caches（需要root）")
+    return parser.parse_args()
+
+def main():
+    """主函数"""
+    args = parse_arguments()
+    paths = [p for p in args.files if os.path.isfile(p)]
+    if not paths:
+        print("❌ 未找到测试文件")
+        return 1
+
+    total_size = sum(os.path.getsize(p) for p in paths)
+    print("本地SHA256读取方式基准测试")
+    print("=" * 60)
+    print(f"测试文件: {len(paths)} 个, 总大小: {format_size(total_size)}")
+    print(f"{'读取方式':<10}{'缓冲区':>10}{'吞吐':>14}{'页缓存增长':>14}")
+    print("-" * 60)
+
+    reference = None
+    for io_mode in args.modes:
+        actual_mode = resolve_io_mode(io_mode)
+        label = io_mode if actual_mode == io_mode else f"{io_mode}->{actual_mode}"
+        for buffer_mb in args.buffer_sizes:
+            best = None
+            for _ in range(args.repeat):
+                total, elapsed, growth, digests = run_case(paths, io_mode, buffer_mb * 1024 * 1024,
+                                                           args.drop_caches)
+                if best is None or elapsed < best[1]:
+                    best = (total, elapsed, growth)
+                # 各读取方式的结果必须一致
+                if reference is None:
+                    reference = digests
+                elif digests != reference:
+                    print(f"❌ {label} {buffer_mb}MB 的SHA256结果与其他方式不一致")
+            total, elapsed, growth = best
+            growth_text = format_size(max(growth, 0)) if growth is not None else "--"
+            print(f"{label:<10}{buffer_mb:>8}MB{format_speed(total, elapsed):>14}{growth_text:>14}")
+
+    print("-" * 60)
+    print("页缓存增长越小，计算过程对服务器上其他文件的缓存影响越小")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
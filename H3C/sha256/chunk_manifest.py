@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分块SHA256清单（Merkle清单）
+按固定块大小计算每块的SHA256，并记录Merkle根和整文件SHA256。
+清单按块增量写入并定期落盘，中断后从最后完成的块继续；
+可只校验指定块范围，或对比两份清单精确定位损坏区域。
+计算过程中顺带记录采样指纹（见 fingerprint.py），可导出后与其他主机快速对比。
+
+清单格式（文本，每行一条记录）:
+    # h3c-chunk-manifest v1
+    file model-00001-of-000163.safetensors
+    size 5234491392
+    mtime_ns 1717000000000000000
+    chunk_size 67108864
+    chunk 0 <sha256>
+    chunk 1 <sha256>
+    ...
+    root <merkle根>
+    fingerprint <指纹版本> <采样参数> <采样指纹>
+    sha256 <整文件sha256>
+
+用法:
+    python chunk_manifest.py create model-*.safetensors -d chunk_manifests
+    python chunk_manifest.py verify model-00001-of-000163.safetensors --chunks 10-20
+    python chunk_manifest.py diff a.manifest b.manifest
+    python chunk_manifest.py export chunk_manifests -o local_sha256.txt
+    python chunk_manifest.py export chunk_manifests --fingerprint-output local_fingerprint.txt
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+from fingerprint import (DEFAULT_PARAMS, FINGERPRINT_VERSION, Fingerprinter, format_params, parse_params,
+                         write_fingerprint_file)
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+MANIFEST_HEADER = "# h3c-chunk-manifest v1"
+MANIFEST_SUFFIX = ".manifest"
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+# 每完成多少块落盘一次（检查点）
+CHECKPOINT_INTERVAL = 8
+READ_SIZE = 8 * 1024 * 1024
+
+class ManifestError(Exception):
+    """清单内容损坏，无法解析"""
+
+class ChunkManifest:
+    """单个文件的分块清单"""
+
+    def __init__(self, file, size, mtime_ns, chunk_size, chunks=None, root=None, sha256=None,
+                 fingerprint=None, fingerprint_params=None):
+        self.file = file
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.chunk_size = chunk_size
+        self.chunks = chunks or []
+        self.root = root
+        self.sha256 = sha256
+        self.fingerprint = fingerprint
+        self.fingerprint_params = fingerprint_params
+
+    @property
+    def chunk_count(self):
+        """文件应有的块数"""
+        return max((self.size + self.chunk_size - 1) // self.chunk_size, 1)
+
+    @property
+    def complete(self):
+        """清单是否已完成"""
+        return self.sha256 is not None and len(self.chunks) == self.chunk_count
+
+    def chunk_range(self, index):
+        """返回块对应的字节范围 (起始, 结束)"""
+        start = index * self.chunk_size
+        return start, min(start + self.chunk_size, self.size)
+
+    @classmethod
+    def load(cls, manifest_path):
+        """
+        读取清单文件
+
+        最后一行可能因中断而不完整：写了一半或无法解析的块记录及其后的块会被忽略。
+        文件头字段或采样参数无法解析时抛出 ManifestError。
+        """
+        fields = {}
+        chunks = []
+        fingerprint = fingerprint_params = None
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break  # 中断时写了一半的行
+                line = line.rstrip('\n')
+                if not line or line.startswith('#'):
+                    continue
+                key, _, value = line.partition(' ')
+                if key == 'chunk':
+                    index, _, digest = value.partition(' ')
+                    if not index.isdigit() or int(index) != len(chunks) or len(digest) != 64:
+                        break
+                    chunks.append(digest)
+                elif key == 'fingerprint':
+                    version, _, value = value.partition(' ')
+                    if version != FINGERPRINT_VERSION:
+                        continue  # 旧版本的指纹不能与当前版本比较，视为没有指纹
+                    params, _, fingerprint = value.partition(' ')
+                    try:
+                        fingerprint_params = parse_params(params)
+                    except ValueError:
+                        raise ManifestError(f"{manifest_path}: 无效的采样参数 {params!r}")
+                else:
+                    fields[key] = value
+
+        try:
+            size = int(fields.get('size', 0))
+            mtime_ns = int(fields.get('mtime_ns', 0))
+            chunk_size = int(fields.get('chunk_size', DEFAULT_CHUNK_SIZE))
+        except ValueError as e:
+            raise ManifestError(f"{manifest_path}: 文件头字段无效: {e}")
+        if chunk_size <= 0:
+            raise ManifestError(f"{manifest_path}: 无效的块大小 {chunk_size}")
+
+        return cls(
+            file=fields.get('file'),
+            size=size,
+            mtime_ns=mtime_ns,
+            chunk_size=chunk_size,
+            chunks=chunks,
+            root=fields.get('root'),
+            sha256=fields.get('sha256'),
+            fingerprint=fingerprint,
+            fingerprint_params=fingerprint_params,
+        )
+
+def merkle_root(digests):
+    """根据块摘要计算Merkle根，奇数节点直接上提"""
+    level = [bytes.fromhex(d) for d in digests]
+    if not level:
+        return hashlib.sha256(b'').hexdigest()
+    while len(level) > 1:
+        next_level = []
+        for i in range(0, len(level), 2):
+            if i + 1 < len(level):
+                next_level.append(hashlib.sha256(level[i] + level[i + 1]).digest())
+            else:
+                next_level.append(level[i])
+        level = next_level
+    return level[0].hex()
+
+def manifest_path_for(file_path, manifest_dir):
+    """返回文件对应的清单路径"""
+    return Path(manifest_dir) / (Path(file_path).name + MANIFEST_SUFFIX)
+
+def _hash_range(f, start, end, buffer, extras=()):
+    """读取 [start, end) 范围并返回其SHA256，同时更新 extras 中的整文件哈希对象"""
+    chunk_hash = hashlib.sha256()
+    view = memoryview(buffer)
+    f.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        n = f.readinto(view[:min(len(buffer), remaining)])
+        if not n:
+            raise IOError(f"文件在偏移 {end - remaining} 处提前结束")
+        chunk_hash.update(view[:n])
+        for extra in extras:
+            extra.update(view[:n])
+        remaining -= n
+    return chunk_hash.hexdigest()
+
+def create_manifest(file_path, manifest_dir="chunk_manifests", chunk_size=DEFAULT_CHUNK_SIZE,
+                    checkpoint_interval=CHECKPOINT_INTERVAL):
+    """
+    创建或续写文件的分块清单
+
+    已存在且与文件状态一致的清单会从最后完成的块继续。
+    整文件SHA256的中间状态无法保存（hashlib 对象不可序列化），续写时会顺序重读已完成部分
+    来计算整文件SHA256和采样指纹，但不会重新计算这些块的摘要。
+
+    Returns:
+        ChunkManifest
+    """
+    file_path = Path(file_path)
+    st = file_path.stat()
+    manifest_path = manifest_path_for(file_path, manifest_dir)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+
+    manifest = None
+    if manifest_path.exists():
+        try:
+            manifest = ChunkManifest.load(manifest_path)
+        except ManifestError as e:
+            print(f"⚠️  {file_path.name} 的清单已损坏，重新计算: {e}")
+        else:
+            if (manifest.file != file_path.name or manifest.size != st.st_size
+                    or manifest.mtime_ns != st.st_mtime_ns or manifest.chunk_size != chunk_size):
+                print(f"⚠️  {file_path.name} 的清单与文件状态不一致，重新计算")
+                manifest = None
+            elif manifest.complete:
+                print(f"✅ {file_path.name} 清单已完成，跳过")
+                return manifest
+
+    if manifest is None:
+        manifest = ChunkManifest(file_path.name, st.st_size, st.st_mtime_ns, chunk_size)
+        with open(manifest_path, 'w', encoding='utf-8') as out:
+            out.write(f"{MANIFEST_HEADER}\n")
+            out.write(f"file {manifest.file}\n")
+            out.write(f"size {manifest.size}\n")
+            out.write(f"mtime_ns {manifest.mtime_ns}\n")
+            out.write(f"chunk_size {manifest.chunk_size}\n")
+    else:
+        # 丢弃可能存在的不完整末行，只保留已解析的记录
+        _rewrite_manifest(manifest, manifest_path)
+        print(f"🔄 {file_path.name} 从第 {len(manifest.chunks)}/{manifest.chunk_count} 块继续")
+
+    full_hash = hashlib.sha256()
+    fingerprinter = Fingerprinter(st.st_size, DEFAULT_PARAMS)
+    buffer = bytearray(READ_SIZE)
+    with open(file_path, 'rb', buffering=0) as f, open(manifest_path, 'a', encoding='utf-8') as out:
+        # 续写时先顺序读取已完成的部分，仅用于整文件SHA256和采样指纹
+        if manifest.chunks:
+            done_end = manifest.chunk_range(len(manifest.chunks) - 1)[1]
+            _hash_range(f, 0, done_end, buffer, extras=(full_hash, fingerprinter))
+
+        for index in range(len(manifest.chunks), manifest.chunk_count):
+            start, end = manifest.chunk_range(index)
+            digest = _hash_range(f, start, end, buffer, extras=(full_hash, fingerprinter))
+            manifest.chunks.append(digest)
+            out.write(f"chunk {index} {digest}\n")
+            if (index + 1) % checkpoint_interval == 0:
+                out.flush()
+                os.fsync(out.fileno())
+
+        manifest.root = merkle_root(manifest.chunks)
+        manifest.sha256 = full_hash.hexdigest()
+        manifest.fingerprint = fingerprinter.hexdigest()
+        manifest.fingerprint_params = fingerprinter.params
+        out.write(f"root {manifest.root}\n")
+        out.write(f"fingerprint {FINGERPRINT_VERSION} {format_params(manifest.fingerprint_params)} "
+                  f"{manifest.fingerprint}\n")
+        out.write(f"sha256 {manifest.sha256}\n")
+        out.flush()
+        os.fsync(out.fileno())
+
+    return manifest
+
+def _rewrite_manifest(manifest, manifest_path):
+    """按已解析的内容重写清单文件"""
+    tmp_path = manifest_path.with_suffix(manifest_path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        out.write(f"{MANIFEST_HEADER}\n")
+        out.write(f"file {manifest.file}\n")
+        out.write(f"size {manifest.size}\n")
+        out.write(f"mtime_ns {manifest.mtime_ns}\n")
+        out.write(f"chunk_size {manifest.chunk_size}\n")
+        for index, digest in enumerate(manifest.chunks):
+            out.write(f"chunk {index} {digest}\n")
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp_path, manifest_path)
+
+def verify_chunks(file_path, manifest, first=0, last=None):
+    """
+    只校验指定块范围 [first, last]
+
+    Returns:
+        不匹配的块列表 [(块序号, 起始偏移, 结束偏移, 期望摘要, 实际摘要), ...]
+    """
+    last = manifest.chunk_count - 1 if last is None else min(last, manifest.chunk_count - 1)
+    mismatches = []
+    buffer = bytearray(READ_SIZE)
+    with open(file_path, 'rb', buffering=0) as f:
+        for index in range(first, last + 1):
+            start, end = manifest.chunk_range(index)
+            try:
+                actual = _hash_range(f, start, end, buffer)
+            except IOError:
+                actual = None
+            expected = manifest.chunks[index] if index < len(manifest.chunks) else None
+            if actual != expected:
+                mismatches.append((index, start, end, expected, actual))
+    return mismatches
+
+def diff_manifests(a, b):
+    """
+    对比两份清单（如本地和另一台主机），无需读取文件即可定位不同的区域
+
+    Returns:
+        不同的块列表 [(块序号, 起始偏移, 结束偏移), ...]；两份清单块大小不同时抛出 ValueError
+    """
+    if a.chunk_size != b.chunk_size:
+        raise ValueError("两份清单的块大小不同，无法逐块对比")
+    if a.root and a.root == b.root and a.size == b.size:
+        return []
+    reference = a if a.size >= b.size else b
+    count = max(len(a.chunks), len(b.chunks))
+    return [
+        (index, *reference.chunk_range(index))
+        for index in range(count)
+        if index >= len(a.chunks) or index >= len(b.chunks) or a.chunks[index] != b.chunks[index]
+    ]
+
+def export_sha256sum(manifest_dir, output_file):
+    """将已完成清单的整文件SHA256导出为sha256sum格式，供 compare_sha256.py 使用"""
+    results = {}
+    for manifest_path in sorted(Path(manifest_dir).glob(f"*{MANIFEST_SUFFIX}")):
+        try:
+            manifest = ChunkManifest.load(manifest_path)
+        except ManifestError as e:
+            print(f"⚠️  清单已损坏，跳过: {e}")
+            continue
+        if manifest.complete:
+            results[manifest.file] = manifest.sha256
+        else:
+            print(f"⚠️  清单未完成，跳过: {manifest_path.name}")
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for filename in sorted(results):
+            f.write(f"{results[filename]}  {filename}\n")
+    print(f"📋 已导出 {len(results)} 个文件的SHA256到: {output_file}")
+    return results
+
+def export_fingerprints(manifest_dir, output_file):
+    """将清单中记录的采样指纹导出为指纹文件，供 fingerprint.py compare 使用"""
+    results = {}
+    params = None
+    for manifest_path in sorted(Path(manifest_dir).glob(f"*{MANIFEST_SUFFIX}")):
+        try:
+            manifest = ChunkManifest.load(manifest_path)
+        except ManifestError as e:
+            print(f"⚠️  清单已损坏，跳过: {e}")
+            continue
+        if not manifest.complete or not manifest.fingerprint:
+            print(f"⚠️  清单未完成或没有当前版本的指纹，跳过: {manifest_path.name}")
+            continue
+        if params is None:
+            params = manifest.fingerprint_params
+        if manifest.fingerprint_params != params:
+            print(f"⚠️  清单的采样参数与其他清单不同，跳过: {manifest_path.name}")
+            continue
+        results[manifest.file] = manifest.fingerprint
+    write_fingerprint_file(results, output_file, params or DEFAULT_PARAMS)
+    print(f"📋 已导出 {len(results)} 个文件的指纹到: {output_file}")
+    return results
+
+def parse_chunk_range(text):
+    """解析块范围参数，如 "10-20" 或 "5"（用作 argparse 的 type，格式错误时给出用法提示）"""
+    first, _, last = text.partition('-')
+    try:
+        first, last = int(first), int(last) if last else int(first)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的块范围: {text}（应为 10-20 或 5）")
+    if first < 0 or last < first:
+        raise argparse.ArgumentTypeError(f"无效的块范围: {text}（应为 10-20 或 5）")
+    return first, last
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="分块SHA256清单工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    create_parser = subparsers.add_parser("create", help="创建或续写分块清单")
+    create_parser.add_argument("files", nargs="+", help="要计算的文件")
+    create_parser.add_argument("-d", "--manifest-dir", default="chunk_manifests", help="清单目录")
+    create_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE // 1024 // 1024,
+                               help="块大小，单位MB（默认64）")
+
+    verify_parser = subparsers.add_parser("verify", help="按清单校验文件")
+    verify_parser.add_argument("file", help="要校验的文件")
+    verify_parser.add_argument("-d", "--manifest-dir", default="chunk_manifests", help="清单目录")
+    verify_parser.add_argument("--chunks", type=parse_chunk_range, help="只校验指定块范围，如 10-20")
+
+    diff_parser = subparsers.add_parser("diff", help="对比两份清单并定位不同区域")
+    diff_parser.add_argument("manifest_a")
+    diff_parser.add_argument("manifest_b")
+
+    export_parser = subparsers.add_parser("export", help="导出sha256sum格式文件")
+    export_parser.add_argument("manifest_dir", help="清单目录")
+    export_parser.add_argument("-o", "--output", default="local_sha256.txt", help="输出文件")
+    export_parser.add_argument("--fingerprint-output", help="同时导出采样指纹文件（可选）")
+
+    return parser.parse_args()
+
+def main():
+    """主函数"""
+    args = parse_arguments()
+
+    if args.command == "create":
+        for file_path in args.files:
+            manifest = create_manifest(file_path, args.manifest_dir, args.chunk_size * 1024 * 1024)
+            print(f"✅ {manifest.file}: {manifest.sha256} ({len(manifest.chunks)} 块, root {manifest.root[:16]}...)")
+        return 0
+
+    if args.command == "verify":
+        manifest_path = manifest_path_for(args.file, args.manifest_dir)
+        try:
+            manifest = ChunkManifest.load(manifest_path)
+        except OSError as e:
+            print(f"❌ 无法读取清单 {manifest_path}: {e}")
+            return 1
+        except ManifestError as e:
+            print(f"❌ 清单已损坏: {e}")
+            return 1
+        first, last = args.chunks or (0, None)
+        try:
+            mismatches = verify_chunks(args.file, manifest, first, last)
+        except OSError as e:
+            print(f"❌ 无法读取文件 {args.file}: {e}")
+            return 1
+        if not mismatches:
+            print(f"✅ {args.file} 校验通过")
+            return 0
+        print(f"❌ {args.file} 有 {len(mismatches)} 个块不匹配:")
+        for index, start, end, expected, actual in mismatches:
+            print(f"  块 {index}: 字节 {start}-{end}  期望 {expected}  实际 {actual}")
+        return 1
+
+    if args.command == "diff":
+        try:
+            a = ChunkManifest.load(args.manifest_a)
+            b = ChunkManifest.load(args.manifest_b)
+        except OSError as e:
+            print(f"❌ 无法读取清单: {e}")
+            return 1
+        except ManifestError as e:
+            print(f"❌ 清单已损坏: {e}")
+            return 1
+        differences = diff_manifests(a, b)
+        if not differences:
+            print("✅ 两份清单一致")
+            return 0
+        print(f"❌ 有 {len(differences)} 个块不同:")
+        for index, start, end in differences:
+            print(f"  块 {index}: 字节 {start}-{end}")
+        return 1
+
+    if args.command == "export":
+        export_sha256sum(args.manifest_dir, args.output)
+        if args.fingerprint_output:
+            export_fingerprints(args.manifest_dir, args.fingerprint_output)
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
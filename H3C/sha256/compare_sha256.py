@@ -4,12 +4,26 @@
 对比本地SHA256和网站SHA256值
 """
 
+import argparse
+import heapq
 import sys
 import re
+import tempfile
+import time
 from pathlib import Path
 
+from local_sha256 import hash_directory, add_cache_arguments
+from manifest_parser import iter_manifest_entries, parse_manifest
+
 sys.stdout.reconfigure(encoding='utf-8')
 
+# 流式对比时每个排序段在内存中保留的最大条目数
+DEFAULT_RUN_SIZE = 500000
+
+def iter_sha256_entries(filepath):
+    """逐行解析SHA256文件，依次返回 (filename, sha256)，格式自动识别"""
+    return iter_manifest_entries(filepath)
+
 def parse_sha256_file(filepath):
     """解析SHA256文件，返回字典 {filename: sha256}"""
     results = {}
@@ -18,37 +32,13 @@ def parse_sha256_file(filepath):
         print(f"文件不存在: {filepath}")
         return results
     
+    # 支持多种格式（自动识别，可为 gzip 压缩文件）:
+    # 1. sha256  filename / sha256 *filename
+    # 2. filename: sha256
+    # 3. filename,sha256
+    # 4. SHA256 (filename) = sha256
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
-                # 支持多种格式:
-                # 1. sha256  filename
-                # 2. filename: sha256
-                # 3. filename,sha256
-                
-                if '  ' in line:  # 标准格式
-                    parts = line.split('  ', 1)
-                    if len(parts) == 2:
-                        sha256, filename = parts
-                        results[filename.strip()] = sha256.strip().lower()
-                elif ':' in line:  # filename: sha256 格式
-                    parts = line.split(':', 1)
-                    if len(parts) == 2:
-                        filename, sha256 = parts
-                        results[filename.strip()] = sha256.strip().lower()
-                elif ',' in line:  # filename,sha256 格式
-                    parts = line.split(',', 1)
-                    if len(parts) == 2:
-                        filename, sha256 = parts
-                        results[filename.strip()] = sha256.strip().lower()
-                else:
-                    print(f"第{line_num}行格式无法识别: {line}")
-                    continue
-    
+        results = parse_manifest(filepath)
     except Exception as e:
         print(f"读取文件 {filepath} 时出错: {e}")
     
@@ -153,14 +143,202 @@ def compare_sha256_files(local_file, remote_file, output_file="sha256_comparison
         'remote_only': len(remote_only)
     }
 
+# 排序段文件以制表符和换行分隔，文件名中的这些字符按 sha256sum 的方式用反斜杠转义
+_RUN_ESCAPES = {'\\': '\\\\', '\n': '\\n', '\t': '\\t', '\r': '\\r'}
+_RUN_UNESCAPES = {escaped[1]: char for char, escaped in _RUN_ESCAPES.items()}
+_RUN_ESCAPE_PATTERN = re.compile(r'[\\\n\t\r]')
+_RUN_UNESCAPE_PATTERN = re.compile(r'\\(.)')
+
+def _write_run(entries, tmp_dir, index):
+    """将已排序的一段条目写入临时文件，返回文件路径"""
+    run_path = Path(tmp_dir) / f"run_{index:05d}.txt"
+    with open(run_path, 'w', encoding='utf-8', newline='') as f:
+        for filename, sha256 in entries:
+            escaped = _RUN_ESCAPE_PATTERN.sub(lambda m: _RUN_ESCAPES[m.group()], filename)
+            f.write(f"{sha256}\t{escaped}\n")
+    return run_path
+
+def _read_run(run_path):
+    """读取排序段文件"""
+    with open(run_path, 'r', encoding='utf-8', newline='') as f:
+        for line in f:
+            sha256, filename = line.rstrip('\n').split('\t', 1)
+            yield _RUN_UNESCAPE_PATTERN.sub(lambda m: _RUN_UNESCAPES[m.group(1)], filename), sha256
+
+def _keep_last(entries):
+    """同名文件只保留最后一条，与 parse_sha256_file 的字典覆盖行为一致"""
+    previous = None
+    for entry in entries:
+        if previous is not None and entry[0] != previous[0]:
+            yield previous
+        previous = entry
+    if previous is not None:
+        yield previous
+
+def iter_sorted_entries(filepath, tmp_dir, run_size=DEFAULT_RUN_SIZE):
+    """
+    外部排序：按文件名有序地返回SHA256文件中的条目
+
+    每读取 run_size 条排序后写入临时文件，最后用 heapq.merge 归并，内存占用与文件大小无关。
+    文件较小只有一段时直接在内存中排序。
+    """
+    runs = []
+    buffer = []
+    for entry in iter_sha256_entries(filepath):
+        buffer.append(entry)
+        if len(buffer) >= run_size:
+            buffer.sort(key=lambda item: item[0])
+            runs.append(_write_run(buffer, tmp_dir, len(runs)))
+            buffer = []
+
+    buffer.sort(key=lambda item: item[0])
+    if not runs:
+        yield from _keep_last(buffer)
+        return
+
+    if buffer:
+        runs.append(_write_run(buffer, tmp_dir, len(runs)))
+    del buffer
+    # heapq.merge 对相同的键按段的先后顺序输出，因此保留的是文件中靠后的条目
+    merged = heapq.merge(*(_read_run(run_path) for run_path in runs), key=lambda item: item[0])
+    yield from _keep_last(merged)
+
+def merge_join(local_entries, remote_entries):
+    """
+    对两个按文件名有序的条目流做归并连接
+
+    Yields:
+        (filename, 本地sha256或None, 远程sha256或None)
+    """
+    local_iter = iter(local_entries)
+    remote_iter = iter(remote_entries)
+    local = next(local_iter, None)
+    remote = next(remote_iter, None)
+    while local is not None or remote is not None:
+        if remote is None or (local is not None and local[0] < remote[0]):
+            yield local[0], local[1], None
+            local = next(local_iter, None)
+        elif local is None or remote[0] < local[0]:
+            yield remote[0], None, remote[1]
+            remote = next(remote_iter, None)
+        else:
+            yield local[0], local[1], remote[1]
+            local = next(local_iter, None)
+            remote = next(remote_iter, None)
+
+def compare_sha256_files_streaming(local_file, remote_file, output_file="sha256_comparison_report.txt",
+                                   run_size=DEFAULT_RUN_SIZE):
+    """
+    流式对比两个SHA256文件，适用于数百万条目的清单
+
+    两个文件分别外部排序后做归并连接，每个文件的对比结果按文件名顺序
+    即时输出到控制台和报告文件，统计信息在报告末尾给出，返回值与 compare_sha256_files 相同。
+    """
+    print("开始流式对比SHA256值...")
+    print("=" * 60)
+
+    for filepath in (local_file, remote_file):
+        if not Path(filepath).exists():
+            print(f"文件不存在: {filepath}")
+
+    stats = {
+        'total_local': 0,
+        'total_remote': 0,
+        'common': 0,
+        'matches': 0,
+        'mismatches': 0,
+        'local_only': 0,
+        'remote_only': 0
+    }
+
+    with tempfile.TemporaryDirectory(prefix="sha256_sort_") as tmp_dir, \
+            open(output_file, 'w', encoding='utf-8') as report:
+
+        def emit(line):
+            print(line)
+            report.write(line + '\n')
+
+        emit("SHA256 对比报告（流式）")
+        emit("=" * 60)
+        emit(f"生成时间: {time.strftime('%Y-%m-%d %H:%M:%S')}")
+        emit("")
+        emit("📋 逐文件结果（按文件名排序）:")
+
+        local_dir = Path(tmp_dir) / "local"
+        remote_dir = Path(tmp_dir) / "remote"
+        local_dir.mkdir()
+        remote_dir.mkdir()
+        local_entries = iter_sorted_entries(local_file, local_dir, run_size) if Path(local_file).exists() else ()
+        remote_entries = iter_sorted_entries(remote_file, remote_dir, run_size) if Path(remote_file).exists() else ()
+
+        for filename, local_hash, remote_hash in merge_join(local_entries, remote_entries):
+            if local_hash is not None:
+                stats['total_local'] += 1
+            if remote_hash is not None:
+                stats['total_remote'] += 1
+
+            if local_hash is None:
+                stats['remote_only'] += 1
+                emit(f"  🌐 {filename} 仅远程存在 (SHA256: {remote_hash})")
+            elif remote_hash is None:
+                stats['local_only'] += 1
+                emit(f"  📁 {filename} 仅本地存在 (SHA256: {local_hash})")
+            elif local_hash == remote_hash:
+                stats['common'] += 1
+                stats['matches'] += 1
+                emit(f"  ✓ {filename}")
+            else:
+                stats['common'] += 1
+                stats['mismatches'] += 1
+                emit(f"  ✗ {filename}")
+                emit(f"    本地:  {local_hash}")
+                emit(f"    远程:  {remote_hash}")
+
+        emit("")
+        emit("📊 统计信息:")
+        emit(f"  - 本地文件数量: {stats['total_local']}")
+        emit(f"  - 远程文件数量: {stats['total_remote']}")
+        emit(f"  - 共同文件数量: {stats['common']}")
+        emit(f"  - 仅本地存在: {stats['local_only']}")
+        emit(f"  - 仅远程存在: {stats['remote_only']}")
+        emit(f"  - SHA256匹配: {stats['matches']}")
+        emit(f"  - SHA256不匹配: {stats['mismatches']}")
+
+    print(f"\n📋 详细报告已保存到: {output_file}")
+    return stats
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="SHA256 对比工具")
+    parser.add_argument("local_file", nargs="?", default="local_sha256.txt",
+                        help="本地SHA256文件（默认 local_sha256.txt）")
+    parser.add_argument("remote_file", nargs="?", default="modelscope_sha256.txt",
+                        help="远程SHA256文件（默认 modelscope_sha256.txt）")
+    parser.add_argument("--local-dir",
+                        help="模型目录（可选），指定时先借助哈希缓存生成本地SHA256文件，未变化的文件不会重新计算")
+    parser.add_argument("-p", "--pattern", default="*.safetensors", help="--local-dir 下的文件匹配模式")
+    parser.add_argument("--stream", action="store_true",
+                        help="流式对比：外部排序后归并连接，逐条输出结果，适用于数百万条目的清单")
+    parser.add_argument("--run-size", type=int, default=DEFAULT_RUN_SIZE,
+                        help=f"流式对比时每个排序段的条目数（默认 {DEFAULT_RUN_SIZE}）")
+    add_cache_arguments(parser)
+    return parser.parse_args()
+
 def main():
     """主函数"""
+    args = parse_arguments()
     print("SHA256 对比工具")
     print("=" * 60)
     
     # 检查文件是否存在
-    local_file = "local_sha256.txt"  # SSH服务器上计算的SHA256
-    remote_file = "modelscope_sha256.txt"  # 从网站爬取的SHA256
+    local_file = args.local_file  # SSH服务器上计算的SHA256
+    remote_file = args.remote_file  # 从网站爬取的SHA256
+    
+    if args.local_dir:
+        hash_directory(args.local_dir, local_file, args.pattern,
+                       cache_file=None if args.no_cache else args.cache,
+                       rehash=args.rehash, scrub_days=args.scrub_days)
+        print()
     
     # 如果有测试文件，也可以使用
     if Path("test_sha256.txt").exists() and not Path(remote_file).exists():
@@ -178,7 +356,10 @@ def main():
         return
     
     # 执行对比
-    stats = compare_sha256_files(local_file, remote_file)
+    if args.stream:
+        stats = compare_sha256_files_streaming(local_file, remote_file, run_size=args.run_size)
+    else:
+        stats = compare_sha256_files(local_file, remote_file)
     
     # 总结
     print("\n" + "=" * 60)
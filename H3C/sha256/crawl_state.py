@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬取状态存储
+以追加方式将每个文件的爬取结果（成功的SHA256或失败次数）写入 JSON Lines 文件，
+批量 fsync；启动时读回已完成的文件以跳过，程序中断时写了一半的末行会被丢弃。
+
+记录格式（每行一条）:
+    {"file": "model-00001-of-000163.safetensors", "status": "ok", "sha256": "...", "attempts": 1, "time": ...}
+    {"file": "model-00002-of-000163.safetensors", "status": "failed", "error": "...", "attempts": 2, "time": ...}
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_STATE_FILE = "crawl_state.jsonl"
+# 每写入多少条记录或经过多少秒执行一次 fsync
+FSYNC_EVERY = 16
+FSYNC_INTERVAL = 2.0
+
+def model_key(model_id, revision):
+    """模型和版本组成的文件名片段，如 deepseek-ai__DeepSeek-V3.1@master"""
+    return f"{model_id.replace('/', '__')}@{revision.replace('/', '__')}"
+
+def state_file_for(model_id, revision):
+    """返回按模型和版本区分的默认状态文件名，如 crawl_state_deepseek-ai__DeepSeek-V3.1@master.jsonl"""
+    return f"crawl_state_{model_key(model_id, revision)}.jsonl"
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """指数退避加随机抖动（full jitter）：在 [0, min(cap, base * 2^attempt)] 内随机取值"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+class CrawlState:
+    """追加写入的爬取状态存储，可在线程间共享"""
+
+    def __init__(self, state_file=DEFAULT_STATE_FILE, fsync_every=FSYNC_EVERY, fsync_interval=FSYNC_INTERVAL):
+        self.state_file = Path(state_file)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.completed = {}
+        self.failures = {}
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._load()
+        self._file = open(self.state_file, 'a', encoding='utf-8')
+
+    def _load(self):
+        """读取已有状态，截掉中断时写了一半的末行"""
+        if not self.state_file.exists():
+            return
+        good_size = 0
+        with open(self.state_file, 'rb') as f:
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    break
+                good_size += len(raw)
+                self._apply(record)
+        if good_size != self.state_file.stat().st_size:
+            print(f"⚠️  爬取状态文件末尾不完整，已截断: {self.state_file}")
+            with open(self.state_file, 'r+b') as f:
+                f.truncate(good_size)
+
+    def _apply(self, record):
+        filename = record.get('file')
+        if not filename:
+            return
+        self._attempts[filename] = record.get('attempts', self._attempts.get(filename, 0))
+        if record.get('status') == 'ok':
+            self.completed[filename] = record['sha256']
+            self.failures.pop(filename, None)
+        else:
+            self.failures[filename] = record
+
+    def _append(self, record):
+        with self._lock:
+            self._apply(record)
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def attempts(self, filename):
+        """返回文件累计尝试次数"""
+        return self._attempts.get(filename, 0)
+
+    def is_done(self, filename):
+        return filename in self.completed
+
+    def pending(self, filenames):
+        """返回尚未成功获取的文件"""
+        return [f for f in filenames if f not in self.completed]
+
+    def record_success(self, filename, sha256):
+        """记录成功获取的SHA256"""
+        self._append({
+            'file': filename,
+            'status': 'ok',
+            'sha256': sha256,
+            'attempts': self.attempts(filename) + 1,
+            'time': time.time(),
+        })
+
+    def record_failure(self, filename, error):
+        """记录一次失败，返回累计尝试次数"""
+        attempts = self.attempts(filename) + 1
+        self._append({
+            'file': filename,
+            'status': 'failed',
+            'error': str(error),
+            'attempts': attempts,
+            'time': time.time(),
+        })
+        return attempts
+
+    def flush(self):
+        """立即落盘"""
+        with self._lock:
+            if self._unsynced:
+                self._sync()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采样指纹快速校验
+每个文件只读取开头和末尾各 N MB 以及 K 个伪随机位置的数据块，连同文件大小计算出一个SHA256指纹。
+采样位置只由文件大小和采样参数决定，两台主机对同一文件得到的指纹相同，
+每个分片只需读取约 2N+K MB，数千个分片的对比可在数秒到数分钟内完成。
+
+指纹不同说明文件一定不同；指纹相同只说明采样到的部分相同，需要确认时仍应以完整SHA256为准。
+compare 命令只对指纹不一致的文件计算完整SHA256（升级校验）。
+
+指纹文件格式与 sha256sum 相同，第一行记录采样参数:
+    # h3c-fingerprint v2 4194304:16:1048576
+    <指纹>  model-00001-of-000163.safetensors
+
+用法:
+    python fingerprint.py create /HDD_Raid/SVN_MODEL_REPO/Model/DeepSeek-R1-0528/ -o local_fingerprint.txt
+    python fingerprint.py compare local_fingerprint.txt remote_fingerprint.txt
+    python fingerprint.py compare local_fingerprint.txt remote_fingerprint.txt --dir <目录> --remote-sha256 remote_sha256.txt
+"""
+
+import argparse
+import hashlib
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from local_sha256 import find_files, format_size, hash_files, write_sha256_file
+from manifest_parser import parse_manifest
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+# 采样位置或指纹算法变化时升级版本，不同版本的指纹不能相互比较
+FINGERPRINT_VERSION = "v2"
+FINGERPRINT_HEADER = f"# h3c-fingerprint {FINGERPRINT_VERSION}"
+FINGERPRINT_MAGIC = f"h3c-fingerprint-{FINGERPRINT_VERSION}".encode()
+# 采样参数: (首尾各读取的字节数, 随机采样块数, 采样块大小)
+DEFAULT_PARAMS = (4 * 1024 * 1024, 16, 1024 * 1024)
+# 指纹读取以随机小块读为主，线程数可以比完整计算更多
+DEFAULT_WORKERS = 16
+
+def format_params(params):
+    """采样参数转为文本，如 4194304:16:1048576"""
+    return ":".join(str(value) for value in params)
+
+def parse_params(text):
+    """解析 format_params 生成的文本"""
+    edge, samples, block = (int(value) for value in text.split(":"))
+    if edge < 0 or samples < 0 or block <= 0:
+        raise ValueError(f"无效的采样参数: {text}")
+    return edge, samples, block
+
+def sample_ranges(size, params=DEFAULT_PARAMS):
+    """
+    计算需要读取的字节范围
+
+    第 i 个候选块号为 SHA256(文件大小 ‖ i) 对块数取模（重复的跳过），只依赖文件大小，
+    不同主机、不同 Python 版本对同样大小的文件选取相同的位置；文件小于采样总量时读取整个文件。
+
+    Returns:
+        按偏移排序、互不重叠的 [(起始, 结束), ...]
+    """
+    edge, samples, block = params
+    if size <= 2 * edge + samples * block:
+        return [(0, size)] if size else []
+    ranges = [(0, edge), (size - edge, size)]
+    middle_blocks = (size - 2 * edge) // block
+    chosen = set()
+    counter = 0
+    while len(chosen) < min(samples, middle_blocks):
+        digest = hashlib.sha256(struct.pack('<2Q', size, counter)).digest()
+        chosen.add(int.from_bytes(digest[:8], 'little') % middle_blocks)
+        counter += 1
+    for index in chosen:
+        start = edge + index * block
+        ranges.append((start, start + block))
+    return sorted(ranges)
+
+class Fingerprinter:
+    """
+    采样指纹计算对象
+
+    既可以由 fingerprint_file 只读取采样范围，也可以作为普通哈希对象接收顺序读取的整个文件
+    （update 会跳过采样范围以外的数据），在计算完整SHA256的同时顺带得到指纹。
+    """
+
+    def __init__(self, size, params=DEFAULT_PARAMS):
+        self.size = size
+        self.params = tuple(params)
+        self.ranges = sample_ranges(size, self.params)
+        self.position = 0
+        self._index = 0
+        self._in_range = False
+        self._hasher = hashlib.sha256(FINGERPRINT_MAGIC + struct.pack('<4Q', size, *self.params))
+
+    def update(self, data):
+        """接收从当前位置开始的一段数据"""
+        data = memoryview(data)
+        begin_pos = self.position
+        end_pos = begin_pos + len(data)
+        while self._index < len(self.ranges):
+            begin, end = self.ranges[self._index]
+            if begin >= end_pos:
+                break
+            if not self._in_range:
+                # 每个范围前写入偏移，避免不同位置的相同数据得到相同指纹
+                self._hasher.update(struct.pack('<2Q', begin, end))
+                self._in_range = True
+            low, high = max(begin, begin_pos), min(end, end_pos)
+            self._hasher.update(data[low - begin_pos:high - begin_pos])
+            if high < end:
+                break
+            self._index += 1
+            self._in_range = False
+        self.position = end_pos
+
+    def update_at(self, offset, data):
+        """接收从指定偏移开始的一段数据"""
+        self.position = offset
+        self.update(data)
+
+    def hexdigest(self):
+        """返回指纹；采样范围未读取完整（文件比记录的大小短）时抛出 IOError"""
+        if self._index < len(self.ranges):
+            raise IOError(f"文件在偏移 {self.position} 处提前结束，采样未完成")
+        return self._hasher.hexdigest()
+
+def fingerprint_file(path, params=DEFAULT_PARAMS):
+    """
+    只读取采样范围计算文件指纹
+
+    Returns:
+        (文件路径, 指纹, 读取字节数)
+    """
+    size = Path(path).stat().st_size
+    fingerprinter = Fingerprinter(size, params)
+    read_bytes = 0
+    with open(path, 'rb', buffering=0) as f:
+        for begin, end in fingerprinter.ranges:
+            f.seek(begin)
+            position = begin
+            while position < end:
+                data = f.read(min(end - position, params[2]))
+                if not data:
+                    break
+                fingerprinter.update_at(position, data)
+                position += len(data)
+            read_bytes += position - begin
+    return str(path), fingerprinter.hexdigest(), read_bytes
+
+def fingerprint_files(paths, params=DEFAULT_PARAMS, workers=DEFAULT_WORKERS, base_dir=None):
+    """
+    使用线程池计算多个文件的指纹
+
+    Returns:
+        {文件名: 指纹}
+    """
+    paths = [Path(p) for p in paths]
+    results = {}
+    read_total = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fingerprint_file, p, params): p for p in paths}
+        for completed, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            name = str(path.relative_to(base_dir)) if base_dir else path.name
+            try:
+                _, fingerprint, read_bytes = future.result()
+            except OSError as e:
+                print(f"❌ [{completed}/{len(paths)}] {name}: {e}")
+                continue
+            results[name] = fingerprint
+            read_total += read_bytes
+    elapsed = time.perf_counter() - start
+    print(f"完成 {len(results)}/{len(paths)} 个文件的指纹, 读取 {format_size(read_total)}, 耗时 {elapsed:.1f} 秒")
+    return results
+
+def write_fingerprint_file(fingerprints, output_file, params=DEFAULT_PARAMS):
+    """写入指纹文件，第一行为采样参数"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(f"{FINGERPRINT_HEADER} {format_params(params)}\n")
+        for filename in sorted(fingerprints):
+            f.write(f"{fingerprints[filename]}  {filename}\n")
+
+def read_fingerprint_file(fingerprint_file):
+    """
+    读取指纹文件
+
+    Returns:
+        (采样参数, {文件名: 指纹})；不是指纹文件时抛出 ValueError
+    """
+    with open(fingerprint_file, 'r', encoding='utf-8') as f:
+        header = f.readline().rstrip('\n')
+    if header.startswith("# h3c-fingerprint ") and not header.startswith(FINGERPRINT_HEADER + " "):
+        version = header.split()[2]
+        raise ValueError(f"{fingerprint_file} 的指纹版本为 {version}，与当前版本 {FINGERPRINT_VERSION} 不同，需要重新生成")
+    if not header.startswith(FINGERPRINT_HEADER + " "):
+        raise ValueError(f"{fingerprint_file} 不是指纹文件（缺少 {FINGERPRINT_HEADER} 头）")
+    params = parse_params(header[len(FINGERPRINT_HEADER) + 1:])
+    return params, parse_manifest(fingerprint_file, "sha256sum")
+
+def compare_fingerprints(local, remote):
+    """
+    对比两份指纹
+
+    Returns:
+        {'matched': [...], 'mismatched': [...], 'local_only': [...], 'remote_only': [...]}
+    """
+    common = local.keys() & remote.keys()
+    return {
+        'matched': sorted(name for name in common if local[name] == remote[name]),
+        'mismatched': sorted(name for name in common if local[name] != remote[name]),
+        'local_only': sorted(local.keys() - remote.keys()),
+        'remote_only': sorted(remote.keys() - local.keys()),
+    }
+
+def escalate(filenames, directory, remote_sha256=None, output_file=None):
+    """
+    对指纹不一致的文件计算完整SHA256
+
+    Args:
+        remote_sha256: 远程完整SHA256 {文件名: sha256}（可选），提供时逐个确认
+        output_file: 完整SHA256的输出文件（可选），可发送到另一台主机核对
+
+    Returns:
+        {文件名: (本地sha256, 远程sha256或None)}
+    """
+    directory = Path(directory)
+    paths = [directory / name for name in filenames if (directory / name).is_file()]
+    local_sha256 = hash_files(paths, base_dir=directory)
+    if output_file and local_sha256:
+        write_sha256_file(local_sha256, output_file)
+        print(f"📋 完整SHA256已保存到: {output_file}")
+    remote_sha256 = remote_sha256 or {}
+    return {name: (sha256, remote_sha256.get(name)) for name, sha256 in local_sha256.items()}
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="采样指纹快速校验")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    create_parser = subparsers.add_parser("create", help="计算目录下文件的指纹")
+    create_parser.add_argument("directory", help="文件所在目录")
+    create_parser.add_argument("-p", "--pattern", default="*.safetensors", help="文件匹配模式（默认 *.safetensors）")
+    create_parser.add_argument("-o", "--output", default="local_fingerprint.txt", help="输出文件")
+    create_parser.add_argument("-j", "--workers", type=int, default=DEFAULT_WORKERS, help="并发线程数")
+    create_parser.add_argument("--edge", type=int, default=DEFAULT_PARAMS[0] // 1024 // 1024,
+                               help="首尾各读取的大小，单位MB（默认4）")
+    create_parser.add_argument("--samples", type=int, default=DEFAULT_PARAMS[1], help="随机采样块数（默认16）")
+    create_parser.add_argument("--block", type=int, default=DEFAULT_PARAMS[2] // 1024 // 1024,
+                               help="采样块大小，单位MB（默认1）")
+
+    compare_parser = subparsers.add_parser("compare", help="对比两份指纹，不一致时计算完整SHA256")
+    compare_parser.add_argument("local", help="本地指纹文件")
+    compare_parser.add_argument("remote", help="远程指纹文件")
+    compare_parser.add_argument("--dir", help="本地文件所在目录，提供时对指纹不一致的文件计算完整SHA256")
+    compare_parser.add_argument("--remote-sha256", help="远程完整SHA256文件，用于确认指纹不一致的文件")
+    compare_parser.add_argument("--sha256-output", default="escalated_sha256.txt",
+                                help="升级校验得到的完整SHA256输出文件")
+    return parser.parse_args()
+
+def main():
+    """主函数"""
+    args = parse_arguments()
+    print("采样指纹快速校验")
+    print("=" * 60)
+
+    if args.command == "create":
+        params = (args.edge * 1024 * 1024, args.samples, args.block * 1024 * 1024)
+        files = find_files(args.directory, args.pattern)
+        if not files:
+            print(f"❌ 目录 {args.directory} 下未找到匹配 {args.pattern} 的文件")
+            return 1
+        fingerprints = fingerprint_files(files, params, args.workers)
+        write_fingerprint_file(fingerprints, args.output, params)
+        print(f"📋 指纹已保存到: {args.output}")
+        return 0 if len(fingerprints) == len(files) else 1
+
+    try:
+        local_params, local = read_fingerprint_file(args.local)
+        remote_params, remote = read_fingerprint_file(args.remote)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    if local_params != remote_params:
+        print(f"❌ 两份指纹的采样参数不同（{format_params(local_params)} / {format_params(remote_params)}），无法对比")
+        return 1
+
+    report = compare_fingerprints(local, remote)
+    print(f"指纹一致: {len(report['matched'])}, 不一致: {len(report['mismatched'])}, "
+          f"仅本地: {len(report['local_only'])}, 仅远程: {len(report['remote_only'])}")
+    for name in report['local_only']:
+        print(f"📁 仅本地存在: {name}")
+    for name in report['remote_only']:
+        print(f"🌐 仅远程存在: {name}")
+    if not report['mismatched']:
+        if not report['local_only'] and not report['remote_only']:
+            print("✅ 所有文件指纹一致")
+        return 0 if not report['local_only'] and not report['remote_only'] else 1
+
+    for name in report['mismatched']:
+        print(f"❌ 指纹不一致: {name}")
+    if not args.dir:
+        print("提供 --dir 可对以上文件计算完整SHA256")
+        return 1
+
+    print("-" * 60)
+    print(f"对 {len(report['mismatched'])} 个指纹不一致的文件计算完整SHA256")
+    remote_sha256 = parse_manifest(args.remote_sha256) if args.remote_sha256 else None
+    for name, (local_hash, remote_hash) in sorted(
+            escalate(report['mismatched'], args.dir, remote_sha256, args.sha256_output).items()):
+        if remote_hash is None:
+            print(f"  {name}  本地: {local_hash}")
+        elif local_hash == remote_hash:
+            # 完整SHA256一致时，通常是生成指纹后文件发生了变化
+            print(f"  ⚠️  {name} 完整SHA256一致，请重新生成指纹")
+        else:
+            print(f"  ✗ {name} SHA256不匹配  本地: {local_hash}  远程: {remote_hash}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
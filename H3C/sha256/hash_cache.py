@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SHA256哈希缓存
+以文件的 (设备号, inode, 大小, mtime_ns, ctime_ns) 为键持久化保存SHA256，
+文件状态未变化时直接复用缓存结果，任何stat变化都会使缓存失效。
+"""
+
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_FILE = Path.home() / ".cache" / "h3c_sha256_cache.db"
+
+class HashCache:
+    """基于文件stat的SHA256持久化缓存（SQLite）"""
+
+    def __init__(self, cache_file=DEFAULT_CACHE_FILE):
+        self.cache_file = Path(cache_file)
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.cache_file))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sha256_cache (
+                dev INTEGER NOT NULL,
+                ino INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                ctime_ns INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                verified_at REAL NOT NULL,
+                PRIMARY KEY (dev, ino)
+            )
+        """)
+        self.conn.commit()
+
+    def close(self):
+        """关闭缓存数据库"""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @staticmethod
+    def stat_key(path_or_stat):
+        """返回用于缓存的stat键 (dev, ino, size, mtime_ns, ctime_ns)"""
+        st = os.stat(path_or_stat) if isinstance(path_or_stat, (str, Path)) else path_or_stat
+        return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns
+
+    def lookup(self, key, max_age_days=None):
+        """
+        查找缓存的SHA256
+
+        Args:
+            key: stat_key 的返回值
+            max_age_days: 缓存最长有效天数（用于定期复核），超过则视为未命中
+
+        Returns:
+            sha256 或 None
+        """
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, ctime_ns, sha256, verified_at FROM sha256_cache WHERE dev = ? AND ino = ?",
+            key[:2]
+        ).fetchone()
+        if row is None or tuple(row[:3]) != tuple(key[2:]):
+            return None
+        if max_age_days is not None and time.time() - row[4] > max_age_days * 86400:
+            return None
+        return row[3]
+
+    def store(self, key, path, sha256):
+        """保存SHA256，同一 (dev, ino) 的旧记录会被替换"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sha256_cache (dev, ino, size, mtime_ns, ctime_ns, path, sha256, verified_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (*key, str(Path(path).resolve()), sha256, time.time())
+        )
+        self.conn.commit()
+
+    def store_many(self, entries):
+        """
+        批量保存SHA256
+
+        Args:
+            entries: [(stat键, 路径, sha256), ...]
+        """
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sha256_cache (dev, ino, size, mtime_ns, ctime_ns, path, sha256, verified_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(*key, str(Path(path).resolve()), sha256, now) for key, path, sha256 in entries]
+            )
+
+    def prune(self):
+        """删除已不存在或状态已变化的文件记录，返回删除条数"""
+        stale = []
+        for dev, ino, size, mtime_ns, ctime_ns, path in self.conn.execute(
+                "SELECT dev, ino, size, mtime_ns, ctime_ns, path FROM sha256_cache"):
+            try:
+                if self.stat_key(path) != (dev, ino, size, mtime_ns, ctime_ns):
+                    stale.append((dev, ino))
+            except OSError:
+                stale.append((dev, ino))
+        with self.conn:
+            self.conn.executemany("DELETE FROM sha256_cache WHERE dev = ? AND ino = ?", stale)
+        return len(stale)
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地SHA256并行计算引擎
+使用进程池同时计算多个文件的SHA256，输出sha256sum格式的 local_sha256.txt
+
+读取方式（--io-mode）:
+    buffered  普通读取，经过页缓存
+    fadvise   声明顺序读取（POSIX_FADV_SEQUENTIAL），并随读随释放已读部分的页缓存（POSIX_FADV_DONTNEED），
+              避免大文件挤出服务器上其他热点文件
+    direct    O_DIRECT 绕过页缓存，使用页对齐的缓冲区；文件系统不支持时回退到 fadvise
+
+用法:
+    python local_sha256.py /HDD_Raid/SVN_MODEL_REPO/Model/DeepSeek-R1-0528/
+    python local_sha256.py <目录> -p "model-*.safetensors" -j 8 -o local_sha256.txt
+    python local_sha256.py <目录> --io-mode fadvise -b 32
+"""
+
+import argparse
+import contextlib
+import hashlib
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from hash_cache import HashCache, DEFAULT_CACHE_FILE
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+# 每次读取的块大小（4 KiB 对齐），大块读取可减少系统调用次数
+DEFAULT_BUFFER_SIZE = 16 * 1024 * 1024
+# 默认并发数上限：RAID 阵列上同时进行的顺序读过多反而会退化为随机读
+DEFAULT_MAX_WORKERS = 8
+IO_MODES = ("buffered", "fadvise", "direct")
+# O_DIRECT 要求缓冲区地址、读取长度和偏移按块对齐
+DIRECT_ALIGNMENT = 4096
+# fadvise 模式下每读取多少字节释放一次已读部分的页缓存
+DONTNEED_WINDOW = 64 * 1024 * 1024
+
+def default_workers(file_count=None):
+    """根据CPU核心数和文件数量确定默认并发进程数"""
+    workers = min(os.cpu_count() or 1, DEFAULT_MAX_WORKERS)
+    if file_count:
+        workers = min(workers, file_count)
+    return max(workers, 1)
+
+def resolve_io_mode(io_mode):
+    """当前平台不支持时，direct 回退到 fadvise，fadvise 回退到 buffered"""
+    if io_mode not in IO_MODES:
+        raise ValueError(f"不支持的读取方式: {io_mode}，可选值: {', '.join(IO_MODES)}")
+    if io_mode == "direct" and not hasattr(os, 'O_DIRECT'):
+        io_mode = "fadvise"
+    if io_mode == "fadvise" and not hasattr(os, 'posix_fadvise'):
+        io_mode = "buffered"
+    return io_mode
+
+def _open_for_hash(path, io_mode):
+    """按读取方式打开文件，返回 (文件对象, 实际读取方式)"""
+    if io_mode == "direct":
+        try:
+            return open(os.open(path, os.O_RDONLY | os.O_DIRECT), 'rb', buffering=0), io_mode
+        except OSError:
+            # tmpfs 等文件系统不支持 O_DIRECT
+            io_mode = resolve_io_mode("fadvise")
+    return open(path, 'rb', buffering=0), io_mode
+
+def read_into_hashers(path, hashers, buffer_size=DEFAULT_BUFFER_SIZE, io_mode="buffered"):
+    """
+    读取一次文件，用同一块缓冲区依次更新多个哈希对象
+
+    Args:
+        hashers: 具有 update 方法的哈希对象列表（hashlib、xxhash 等）
+        io_mode: 读取方式，buffered / fadvise / direct
+
+    Returns:
+        读取的字节数
+    """
+    size = 0
+    f, io_mode = _open_for_hash(path, resolve_io_mode(io_mode))
+    if io_mode == "direct":
+        # 匿名 mmap 的地址按页对齐，长度向上取整到对齐大小
+        buffer_size = -(-buffer_size // DIRECT_ALIGNMENT) * DIRECT_ALIGNMENT
+        buffer = mmap.mmap(-1, buffer_size)
+    else:
+        buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+
+    try:
+        fd = f.fileno()
+        if io_mode == "fadvise":
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        released = 0
+        while True:
+            n = f.readinto(view)
+            if not n:
+                break
+            chunk = view[:n]
+            for hasher in hashers:
+                hasher.update(chunk)
+            chunk.release()
+            size += n
+            if io_mode == "fadvise" and size - released >= DONTNEED_WINDOW:
+                os.posix_fadvise(fd, released, size - released, os.POSIX_FADV_DONTNEED)
+                released = size
+        if io_mode == "fadvise":
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        view.release()
+        if isinstance(buffer, mmap.mmap):
+            buffer.close()
+        f.close()
+    return size
+
+def hash_file(path, buffer_size=DEFAULT_BUFFER_SIZE, io_mode="buffered"):
+    """
+    计算单个文件的SHA256
+
+    使用预分配缓冲区和 readinto 读取，hashlib 在处理大块数据时会释放GIL。
+
+    Args:
+        io_mode: 读取方式，buffered / fadvise / direct
+
+    Returns:
+        (文件路径, sha256, 文件大小, 耗时秒数)
+    """
+    sha256 = hashlib.sha256()
+    start = time.perf_counter()
+    size = read_into_hashers(path, [sha256], buffer_size, io_mode)
+    return str(path), sha256.hexdigest(), size, time.perf_counter() - start
+
+def find_files(directory, pattern="*.safetensors"):
+    """查找目录下（仅第一层）匹配模式的文件，按文件名排序"""
+    return sorted(p for p in Path(directory).glob(pattern) if p.is_file())
+
+def format_speed(size, seconds):
+    """格式化速度为 MB/s"""
+    if seconds <= 0:
+        return "-- MB/s"
+    return f"{size / seconds / 1024 / 1024:.1f} MB/s"
+
+def format_size(size):
+    """格式化文件大小"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+def write_sha256_file(results, output_file):
+    """按文件名排序写入sha256sum格式文件"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for filename in sorted(results):
+            f.write(f"{results[filename]}  {filename}\n")
+
+def hash_files(paths, workers=None, buffer_size=DEFAULT_BUFFER_SIZE, base_dir=None,
+               cache=None, rehash=False, scrub_days=None, on_result=None, io_mode="buffered", executor=None):
+    """
+    使用进程池并行计算多个文件的SHA256
+
+    Args:
+        paths: 文件路径列表
+        workers: 并发进程数，默认按CPU核心数和文件数量确定
+        buffer_size: 每次读取的块大小
+        base_dir: 输出文件名相对的目录，默认只保留文件名
+        cache: HashCache 对象（可选），文件stat未变化时直接使用缓存的SHA256
+        rehash: 忽略缓存，重新计算所有文件
+        scrub_days: 缓存超过该天数未复核的文件重新计算，并与缓存值比对
+        on_result: 每得到一个文件的SHA256（含缓存命中）时调用 on_result(文件名, sha256, 读取字节数)
+        io_mode: 读取方式，buffered / fadvise / direct
+        executor: 共享的进程池（可选），多个目录同时计算时共用一个进程池以限制总的I/O并发，
+                  此时 workers 参数不起作用
+
+    Returns:
+        {文件名: sha256}
+    """
+    paths = [Path(p) for p in paths]
+    if not paths:
+        return {}
+
+    def output_name(path):
+        return str(path.relative_to(base_dir)) if base_dir else path.name
+
+    # 先查缓存，只有状态变化或需要复核的文件才真正读取
+    results = {}
+    stat_keys = {}
+    pending = []
+    for path in paths:
+        st = path.stat()
+        stat_keys[path] = HashCache.stat_key(st) if cache else None
+        if cache and not rehash:
+            cached = cache.lookup(stat_keys[path], max_age_days=scrub_days)
+            if cached:
+                results[output_name(path)] = cached
+                if on_result:
+                    on_result(output_name(path), cached, 0)
+                continue
+        pending.append((path, st.st_size))
+
+    if cache:
+        print(f"缓存命中: {len(results)} 个文件, 需要计算: {len(pending)} 个文件")
+    if not pending:
+        return results
+
+    workers = workers or default_workers(len(pending))
+    total_size = sum(size for _, size in pending)
+    workers_text = workers if executor is None else "共享进程池"
+    print(f"待计算文件: {len(pending)} 个, 总大小: {format_size(total_size)}, 并发进程: {workers_text}, "
+          f"读取方式: {resolve_io_mode(io_mode)}, 缓冲区: {format_size(buffer_size)}")
+    print("-" * 60)
+
+    done_size = 0
+    hashed = 0
+    start = time.perf_counter()
+
+    # 大文件优先提交，避免最后只剩一个大文件在单核上计算
+    ordered = [path for path, _ in sorted(pending, key=lambda item: item[1], reverse=True)]
+    pool = contextlib.nullcontext(executor) if executor is not None else ProcessPoolExecutor(max_workers=workers)
+    with pool as executor:
+        futures = {executor.submit(hash_file, p, buffer_size, io_mode): p for p in ordered}
+        for completed, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                _, sha256, size, seconds = future.result()
+            except OSError as e:
+                print(f"❌ [{completed}/{len(pending)}] {path.name}: {e}")
+                continue
+
+            name = output_name(path)
+            results[name] = sha256
+            if on_result:
+                on_result(name, sha256, size)
+            hashed += 1
+            done_size += size
+            elapsed = time.perf_counter() - start
+            print(f"✅ [{completed}/{len(pending)}] {name}  {format_size(size)}  {format_speed(size, seconds)}"
+                  f"  | 累计 {format_size(done_size)}/{format_size(total_size)}  {format_speed(done_size, elapsed)}")
+
+            if cache:
+                key = stat_keys[path]
+                previous = cache.lookup(key)
+                if previous and previous != sha256:
+                    # stat 未变化但内容变化，说明存在静默损坏
+                    print(f"⚠️  {name} 文件状态未变化但SHA256与缓存不一致: 缓存 {previous}, 实际 {sha256}")
+                # 计算期间文件被修改时不写入缓存
+                if HashCache.stat_key(path) == key:
+                    cache.store(key, path, sha256)
+
+    elapsed = time.perf_counter() - start
+    print("-" * 60)
+    print(f"完成 {hashed}/{len(pending)} 个文件, 耗时 {elapsed:.1f} 秒, 平均 {format_speed(done_size, elapsed)}")
+    return results
+
+def hash_directory(directory, output_file="local_sha256.txt", pattern="*.safetensors",
+                   workers=None, buffer_size=DEFAULT_BUFFER_SIZE,
+                   cache_file=DEFAULT_CACHE_FILE, rehash=False, scrub_days=None, on_result=None,
+                   io_mode="buffered"):
+    """
+    计算目录下匹配文件的SHA256并写入sha256sum格式文件
+
+    Args:
+        cache_file: 哈希缓存文件路径，为 None 时不使用缓存
+        on_result, io_mode: 见 hash_files
+    """
+    files = find_files(directory, pattern)
+    if not files:
+        print(f"❌ 目录 {directory} 下未找到匹配 {pattern} 的文件")
+        return {}
+
+    cache = HashCache(cache_file) if cache_file else None
+    try:
+        results = hash_files(files, workers=workers, buffer_size=buffer_size,
+                             cache=cache, rehash=rehash, scrub_days=scrub_days, on_result=on_result,
+                             io_mode=io_mode)
+    finally:
+        if cache:
+            cache.close()
+
+    if results:
+        write_sha256_file(results, output_file)
+        print(f"📋 SHA256结果已保存到: {output_file}")
+    return results
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="本地SHA256并行计算工具")
+    parser.add_argument("directory", help="模型文件所在目录")
+    parser.add_argument("-p", "--pattern", default="*.safetensors", help="文件匹配模式（默认 *.safetensors）")
+    parser.add_argument("-o", "--output", default="local_sha256.txt", help="输出文件（默认 local_sha256.txt）")
+    parser.add_argument("-j", "--workers", type=int, help=f"并发进程数（默认 min(CPU核心数, {DEFAULT_MAX_WORKERS})）")
+    parser.add_argument("-b", "--buffer-size", type=int, default=DEFAULT_BUFFER_SIZE // 1024 // 1024,
+                        help="读取块大小，单位MB（默认16）")
+    parser.add_argument("--io-mode", choices=IO_MODES, default="buffered",
+                        help="读取方式：buffered 普通读取；fadvise 顺序读取并释放已读页缓存；direct 使用 O_DIRECT 绕过页缓存")
+    add_cache_arguments(parser)
+    return parser.parse_args()
+
+def add_cache_arguments(parser):
+    """添加哈希缓存相关的命令行参数"""
+    parser.add_argument("--cache", default=str(DEFAULT_CACHE_FILE), help=f"哈希缓存文件（默认 {DEFAULT_CACHE_FILE}）")
+    parser.add_argument("--no-cache", action="store_true", help="不使用哈希缓存")
+    parser.add_argument("--rehash", action="store_true", help="忽略缓存，重新计算所有文件")
+    parser.add_argument("--scrub-days", type=float,
+                        help="复核模式：缓存超过该天数的文件重新计算并与缓存比对")
+
+def main():
+    """主函数"""
+    args = parse_arguments()
+    print("本地SHA256并行计算工具")
+    print("=" * 60)
+    results = hash_directory(args.directory, args.output, args.pattern,
+                             args.workers, args.buffer_size * 1024 * 1024,
+                             None if args.no_cache else args.cache, args.rehash, args.scrub_days,
+                             io_mode=args.io_mode)
+    return 0 if results else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
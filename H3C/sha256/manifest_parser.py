@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SHA256清单解析器
+根据文件开头的若干行自动识别清单格式，之后按大块读取并用该格式对应的一个正则整块匹配，
+只有包含注释、表头等非规范行的块才逐行解析，适合加载数百万行的清单。支持 gzip 压缩的清单（按文件头魔数识别）。
+
+支持的格式:
+    sha256sum   <sha256>  filename   或二进制模式   <sha256> *filename
+    bsd         SHA256 (filename) = <sha256>
+    colon       filename: <sha256>
+    csv         filename,<sha256>
+
+用法:
+    python manifest_parser.py modelscope_sha256.txt
+"""
+
+import gzip
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+FORMATS = ("sha256sum", "bsd", "colon", "csv")
+# 用于识别格式的开头行数
+DETECT_LINES = 20
+# 每次读取的文本块大小（按整行对齐）
+BLOCK_SIZE = 32 * 1024 * 1024
+GZIP_MAGIC = b'\x1f\x8b'
+
+_HEX64 = r"[0-9a-fA-F]{64}"
+_is_hex64 = re.compile(_HEX64).fullmatch
+# 单行匹配，用于格式识别和逐行解析
+_PATTERNS = {
+    "sha256sum": re.compile(rf"^\\?({_HEX64}) [ *](.+)$"),
+    "bsd": re.compile(rf"^SHA256 \((.+)\) = ({_HEX64})$"),
+    "colon": re.compile(rf"^(.+?):\s*({_HEX64})$"),
+    "csv": re.compile(rf"^(.+?)\s*,\s*({_HEX64})$"),
+}
+# 整块匹配（多行模式），只匹配不需要额外处理的规范行；
+# 块内匹配数与行数不一致时（注释、表头、转义文件名等），该块改为逐行解析
+_BLOCK_PATTERNS = {
+    "sha256sum": re.compile(rf"^({_HEX64}) [ *](.*\S)[ \t]*$", re.M),
+    "bsd": re.compile(rf"^SHA256 \((.+)\) = ({_HEX64})[ \t]*$", re.M),
+    "colon": re.compile(rf"^(?![ \t])(.*\S)[ \t]*:[ \t]*({_HEX64})[ \t]*$", re.M),
+    "csv": re.compile(rf"^(?![ \t])(.*\S)[ \t]*,[ \t]*({_HEX64})[ \t]*$", re.M),
+}
+
+def _unescape_sha256sum(filename):
+    """还原 sha256sum 对含反斜杠或换行的文件名所做的转义"""
+    return filename.replace('\\\\', '\0').replace('\\n', '\n').replace('\0', '\\')
+
+def _parse_sha256sum(line):
+    """sha256sum 格式：定长切片，不使用正则"""
+    if len(line) < 67 or line[64] != ' ' or line[65] not in ' *' or not _is_hex64(line, 0, 64):
+        if line.startswith('\\'):
+            # 文件名含特殊字符时 sha256sum 在行首加反斜杠
+            entry = _parse_sha256sum(line[1:])
+            return (_unescape_sha256sum(entry[0]), entry[1]) if entry else None
+        return None
+    return line[66:], line[:64]
+
+def _parse_bsd(line):
+    match = _PATTERNS["bsd"].match(line)
+    return match.groups() if match else None
+
+def _parse_colon(line):
+    # 从右侧切分，文件名中可以包含冒号
+    filename, sep, sha256 = line.rpartition(':')
+    sha256 = sha256.strip()
+    if not sep or not _is_hex64(sha256):
+        return None
+    return filename.strip(), sha256
+
+def _parse_csv(line):
+    # 从右侧切分，文件名中可以包含逗号
+    filename, sep, sha256 = line.rpartition(',')
+    sha256 = sha256.strip()
+    if not sep or not _is_hex64(sha256):
+        return None
+    return filename.strip(), sha256
+
+_PARSERS = {
+    "sha256sum": _parse_sha256sum,
+    "bsd": _parse_bsd,
+    "colon": _parse_colon,
+    "csv": _parse_csv,
+}
+
+def open_manifest(filepath):
+    """打开清单文件，gzip 压缩的文件自动解压"""
+    with open(filepath, 'rb') as f:
+        magic = f.read(2)
+    if magic == GZIP_MAGIC:
+        return gzip.open(filepath, 'rt', encoding='utf-8-sig')
+    return open(filepath, 'r', encoding='utf-8-sig')
+
+def detect_format(lines):
+    """
+    根据若干行内容识别清单格式
+
+    Args:
+        lines: 已去除首尾空白的非注释行
+
+    Returns:
+        格式名，无法识别时返回 None
+    """
+    counts = {name: 0 for name in FORMATS}
+    for line in lines:
+        for name in FORMATS:
+            if _PATTERNS[name].match(line):
+                counts[name] += 1
+                break
+    best = max(FORMATS, key=lambda name: counts[name])
+    return best if counts[best] else None
+
+def _head_lines(text):
+    """返回文本开头的若干非空、非注释行"""
+    lines = []
+    for line in text.splitlines()[:DETECT_LINES * 5]:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            lines.append(line)
+            if len(lines) >= DETECT_LINES:
+                break
+    return lines
+
+def _fallback_parse(line):
+    """行格式与识别结果不一致时依次尝试所有格式"""
+    for name in FORMATS:
+        match = _PATTERNS[name].match(line)
+        if match:
+            first, second = match.groups()
+            return (second, first) if name == "sha256sum" else (first, second)
+    return None
+
+def _parse_lines(block, fmt, first_line_num):
+    """逐行解析一个文本块，无法识别的行输出提示"""
+    intern = sys.intern
+    parse = _PARSERS[fmt]
+    entries = []
+    for line_num, line in enumerate(block.splitlines(), first_line_num):
+        line = line.strip()
+        if not line or line[0] == '#':
+            continue
+        entry = parse(line) or _fallback_parse(line)
+        if entry is None:
+            # 清单开头不含SHA256的行视为表头（如 "filename,sha256"）
+            if not entries and line_num == first_line_num == 1 and not re.search(_HEX64, line):
+                continue
+            print(f"第{line_num}行格式无法识别: {line}")
+            continue
+        entries.append((entry[0], intern(entry[1].lower())))
+    return entries
+
+def _iter_blocks(filepath, fmt=None):
+    """按块解析清单，每次返回一个 [(filename, sha256), ...] 列表"""
+    intern = sys.intern
+    with open_manifest(filepath) as f:
+        line_num = 1
+        while True:
+            block = f.read(BLOCK_SIZE)
+            if not block:
+                break
+            block += f.readline()
+
+            if fmt is None:
+                fmt = detect_format(_head_lines(block))
+                if fmt is None:
+                    print(f"无法识别清单格式: {filepath}")
+                    return
+
+            lines = block.count('\n') + (not block.endswith('\n'))
+            matches = _BLOCK_PATTERNS[fmt].findall(block)
+            if len(matches) != lines:
+                yield _parse_lines(block, fmt, line_num)
+            elif fmt == "sha256sum":
+                yield [(filename, intern(sha256.lower())) for sha256, filename in matches]
+            else:
+                yield [(filename, intern(sha256.lower())) for filename, sha256 in matches]
+            line_num += lines
+
+def iter_manifest_entries(filepath, fmt=None):
+    """
+    解析清单，依次返回 (filename, sha256)
+
+    SHA256经过 sys.intern，本地与远程清单中相同的哈希值共享同一个字符串对象。
+
+    Args:
+        filepath: 清单文件路径（可为 gzip 压缩文件）
+        fmt: 指定格式，默认根据开头的行自动识别
+    """
+    for entries in _iter_blocks(filepath, fmt):
+        yield from entries
+
+def parse_manifest(filepath, fmt=None):
+    """解析清单，返回字典 {filename: sha256}，同名文件以最后一条为准"""
+    results = {}
+    for entries in _iter_blocks(filepath, fmt):
+        results.update(entries)
+    return results
+
+def main():
+    """主函数：解析清单并输出格式和耗时"""
+    if len(sys.argv) < 2:
+        print("用法: python manifest_parser.py <清单文件> [...]")
+        return 1
+    for filepath in sys.argv[1:]:
+        if not Path(filepath).exists():
+            print(f"❌ 文件不存在: {filepath}")
+            continue
+        start = time.perf_counter()
+        with open_manifest(filepath) as f:
+            fmt = detect_format(_head_lines(f.read(1024 * 1024)))
+        results = parse_manifest(filepath, fmt)
+        print(f"✅ {filepath}: 格式 {fmt}, {len(results)} 条, 耗时 {time.perf_counter() - start:.2f} 秒")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
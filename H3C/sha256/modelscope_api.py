@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ModelScope 仓库文件列表获取
+通过 ModelScope 的文件列表JSON接口一次性获取整个模型仓库的文件名和SHA256，
+分页请求复用同一个带连接池的HTTP会话，不再为每个文件打开一个页面。
+
+用法:
+    python modelscope_api.py
+    python modelscope_api.py -m deepseek-ai/DeepSeek-R1-0528 -r master -o modelscope_sha256.txt
+    python modelscope_api.py --endpoint http://127.0.0.1:8000   # 指向本地录制的响应（modelscope_stub_server.py）
+
+同时校验多个模型时，各模型的请求通过共享的 RequestBudget 限制总并发数和每秒请求数。
+"""
+
+import argparse
+import contextlib
+import fnmatch
+import os
+import sys
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from safetensors_check import missing_shards, shard_filename
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+DEFAULT_MODEL_ID = "deepseek-ai/DeepSeek-R1-0528"
+DEFAULT_REVISION = "master"
+# 可通过环境变量 MODELSCOPE_ENDPOINT 指向镜像站或本地服务
+DEFAULT_ENDPOINT = os.environ.get("MODELSCOPE_ENDPOINT", "https://modelscope.cn")
+FILES_API = "{endpoint}/api/v1/models/{model_id}/repo/files"
+FILE_VIEW_URL = "{endpoint}/models/{model_id}/file/view/{revision}"
+DEFAULT_PAGE_SIZE = 500
+# 默认模型的分片数，文件列表接口不可用时据此生成待获取的文件列表
+DEFAULT_SHARD_COUNT = 163
+
+class ModelScopeAPIError(Exception):
+    """文件列表接口返回错误"""
+
+def file_view_url(model_id=DEFAULT_MODEL_ID, revision=DEFAULT_REVISION, endpoint=DEFAULT_ENDPOINT):
+    """返回文件详情页的基础URL，文件名拼接在其后"""
+    return FILE_VIEW_URL.format(endpoint=endpoint.rstrip('/'), model_id=model_id, revision=revision)
+
+def default_files(model_id=DEFAULT_MODEL_ID):
+    """文件列表接口不可用时的默认文件列表：只有默认模型的分片数已知，其他模型返回空列表"""
+    if model_id != DEFAULT_MODEL_ID:
+        return []
+    return [shard_filename(i, DEFAULT_SHARD_COUNT) for i in range(1, DEFAULT_SHARD_COUNT + 1)]
+
+def expected_files(model_id, local_names, api_results):
+    """
+    确定模型应有的文件列表
+
+    以文件列表接口返回的文件为准；接口不可用时使用本地文件加上按分片编号推算出的缺失分片，
+    本地也没有文件时使用默认模型的分片列表。
+    """
+    if api_results:
+        return sorted(api_results)
+    if local_names:
+        return sorted(set(local_names) | set(missing_shards(local_names)))
+    return default_files(model_id)
+
+class RequestBudget:
+    """
+    多个线程共享的请求预算
+
+    限制同时进行的请求数，并可限制每秒发起的请求数（按固定间隔发放）。
+    用作上下文管理器: with budget: session.get(...)
+    """
+
+    def __init__(self, max_concurrent=4, per_second=None):
+        self.max_concurrent = max_concurrent
+        self.interval = 1.0 / per_second if per_second else 0
+        self.requests = 0
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+            self.requests += 1
+        if delay > 0:
+            time.sleep(delay)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+
+def create_session(pool_size=4, retries=3):
+    """创建带连接池和自动重试（429/5xx，指数退避）的HTTP会话"""
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=1,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Accept': 'application/json',
+    })
+    return session
+
+class ModelScopeFileLister:
+    """通过JSON接口获取模型仓库的文件列表"""
+
+    def __init__(self, model_id=DEFAULT_MODEL_ID, revision=DEFAULT_REVISION,
+                 endpoint=DEFAULT_ENDPOINT, session=None, page_size=DEFAULT_PAGE_SIZE, timeout=30, budget=None):
+        self.model_id = model_id
+        self.revision = revision
+        self.endpoint = endpoint.rstrip('/')
+        self.session = session or create_session()
+        self.page_size = page_size
+        self.timeout = timeout
+        # 共享的 RequestBudget（可选）
+        self.budget = budget
+        self.requests_made = 0
+
+    @property
+    def files_url(self):
+        return FILES_API.format(endpoint=self.endpoint, model_id=self.model_id)
+
+    def _fetch_page(self, page_number):
+        """请求一页文件列表，返回 (文件列表, 总数或None)"""
+        params = {
+            'Revision': self.revision,
+            'Root': '',
+            'Recursive': 'true',
+            'PageNumber': page_number,
+            'PageSize': self.page_size,
+        }
+        with self.budget or contextlib.nullcontext():
+            response = self.session.get(self.files_url, params=params, timeout=self.timeout)
+        self.requests_made += 1
+        if response.status_code != 200:
+            raise ModelScopeAPIError(f"文件列表接口返回状态码 {response.status_code}: {response.url}")
+
+        payload = response.json()
+        if payload.get('Success') is False or payload.get('Code', 200) != 200:
+            raise ModelScopeAPIError(f"文件列表接口返回错误: {payload.get('Message') or payload.get('Code')}")
+        data = payload.get('Data') or {}
+        return data.get('Files') or [], data.get('TotalCount')
+
+    def list_files(self):
+        """
+        获取仓库中的全部文件（分页直到取完）
+
+        Returns:
+            接口返回的文件记录列表，每项包含 Path、Name、Sha256、Size、Type 等字段
+        """
+        files = []
+        seen = set()
+        page_number = 1
+        while True:
+            page, total = self._fetch_page(page_number)
+            new_files = [f for f in page if f.get('Path', f.get('Name')) not in seen]
+            for f in new_files:
+                seen.add(f.get('Path', f.get('Name')))
+            files.extend(new_files)
+            # 不支持分页的接口会每页返回相同的全部内容，没有新文件时即停止
+            if not new_files or len(page) < self.page_size or (total is not None and len(files) >= total):
+                break
+            page_number += 1
+        return files
+
+    def fetch_sha256(self, pattern="*.safetensors"):
+        """
+        获取匹配模式的文件的SHA256
+
+        Returns:
+            {文件路径: sha256}
+        """
+        results = {}
+        for f in self.list_files():
+            if f.get('Type', 'blob') != 'blob':
+                continue
+            path = f.get('Path') or f.get('Name')
+            sha256 = f.get('Sha256')
+            if path and sha256 and fnmatch.fnmatch(path, pattern):
+                results[path] = sha256.lower()
+        return results
+
+def save_results(results, filename="modelscope_sha256.txt"):
+    """按文件名排序保存为sha256sum格式"""
+    with open(filename, 'w', encoding='utf-8') as f:
+        for path in sorted(results):
+            f.write(f"{results[path]}  {path}\n")
+    print(f"结果已保存到: {filename}")
+    print(f"成功获取 {len(results)} 个文件的SHA256值")
+
+def fetch_repository_sha256(model_id=DEFAULT_MODEL_ID, revision=DEFAULT_REVISION,
+                            endpoint=DEFAULT_ENDPOINT, pattern="*.safetensors", budget=None):
+    """
+    获取模型仓库的SHA256，接口不可用时返回空字典（由调用方回退到Playwright）
+
+    Args:
+        budget: 多个模型共享的 RequestBudget（可选）
+    """
+    lister = ModelScopeFileLister(model_id, revision, endpoint, budget=budget)
+    start = time.perf_counter()
+    try:
+        results = lister.fetch_sha256(pattern)
+    except (requests.exceptions.RequestException, ModelScopeAPIError, ValueError) as e:
+        print(f"⚠️  文件列表接口获取失败: {e}")
+        return {}
+    print(f"✅ {model_id}: 通过文件列表接口获取 {len(results)} 个文件的SHA256，"
+          f"请求 {lister.requests_made} 次，耗时 {time.perf_counter() - start:.1f} 秒")
+    return results
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="ModelScope 仓库SHA256获取工具（文件列表接口）")
+    parser.add_argument("-m", "--model-id", default=DEFAULT_MODEL_ID, help=f"模型ID（默认 {DEFAULT_MODEL_ID}）")
+    parser.add_argument("-r", "--revision", default=DEFAULT_REVISION, help="版本/分支（默认 master）")
+    parser.add_argument("-p", "--pattern", default="*.safetensors", help="文件匹配模式（默认 *.safetensors）")
+    parser.add_argument("-o", "--output", default="modelscope_sha256.txt", help="输出文件")
+    parser.add_argument("--endpoint", default=DEFAULT_ENDPOINT,
+                        help="ModelScope 地址（默认取环境变量 MODELSCOPE_ENDPOINT 或 https://modelscope.cn）")
+    return parser.parse_args()
+
+def main():
+    """主函数"""
+    args = parse_arguments()
+    print("ModelScope 文件列表SHA256获取")
+    print("=" * 50)
+    results = fetch_repository_sha256(args.model_id, args.revision, args.endpoint, args.pattern)
+    if not results:
+        print("❌ 未获取到SHA256，可改用 playwright_crawler.py")
+        return 1
+    save_results(results, args.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
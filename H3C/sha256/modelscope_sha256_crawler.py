@@ -2,9 +2,15 @@
 # -*- coding: utf-8 -*-
 """
 ModelScope SHA256 爬虫
-用于获取 DeepSeek-R1-0528 模型的所有文件SHA256值
+用于获取 ModelScope 模型仓库（默认 DeepSeek-R1-0528）的所有文件SHA256值
+
+用法:
+    python modelscope_sha256_crawler.py
+    python modelscope_sha256_crawler.py -m Qwen/Qwen3-235B-A22B -o qwen_sha256.txt
 """
 
+import argparse
+import sys
 import requests
 import time
 import re
@@ -14,9 +20,19 @@ import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 
+from modelscope_api import (DEFAULT_MODEL_ID, DEFAULT_REVISION, DEFAULT_SHARD_COUNT, default_files,
+                            fetch_repository_sha256, file_view_url)
+from safetensors_check import shard_filename
+from crawl_state import CrawlState, backoff_delay, state_file_for
+
+# 单个文件在一次运行中的最多尝试次数
+MAX_ATTEMPTS = 3
+
 class ModelScopeSHA256Crawler:
-    def __init__(self):
-        self.base_url = "https://modelscope.cn/models/deepseek-ai/DeepSeek-R1-0528/file/view/master"
+    def __init__(self, state_file=None, model_id=DEFAULT_MODEL_ID, revision=DEFAULT_REVISION):
+        self.model_id = model_id
+        self.revision = revision
+        self.base_url = file_view_url(model_id, revision)
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -27,32 +43,39 @@ class ModelScopeSHA256Crawler:
             'Upgrade-Insecure-Requests': '1',
         })
         self.lock = threading.Lock()
-        self.results = {}
+        # 启动时读回已完成的文件，中断后重新运行只获取缺失的文件；
+        # 默认状态文件按模型和版本区分，避免把其他模型的结果当作本模型的
+        self.state = CrawlState(state_file or state_file_for(model_id, revision))
+        self.results = dict(self.state.completed)
+        # 本次需要获取的全部文件，由 crawl_all_sha256 确定
+        self.expected = []
         
-    def get_file_sha256(self, file_number):
-        """获取单个文件的SHA256值"""
-        filename = f"model-{file_number:05d}-of-000163.safetensors"
+    def get_file_sha256(self, file):
+        """获取单个文件的SHA256值，file 为文件名或默认模型的分片编号"""
+        filename = file if isinstance(file, str) else shard_filename(file, DEFAULT_SHARD_COUNT)
         url = f"{self.base_url}/{filename}"
         
         try:
             print(f"正在获取文件 {filename} 的SHA256...")
             
-            # 添加重试机制
-            for attempt in range(3):
+            # 添加重试机制（指数退避加随机抖动）
+            for attempt in range(MAX_ATTEMPTS):
                 try:
                     response = self.session.get(url, timeout=30)
                     if response.status_code == 200:
                         break
                     else:
                         print(f"文件 {filename} 获取失败，状态码: {response.status_code}")
-                        if attempt < 2:
-                            time.sleep(2)
+                        self.state.record_failure(filename, f"HTTP {response.status_code}")
+                        if attempt < MAX_ATTEMPTS - 1:
+                            time.sleep(backoff_delay(attempt))
                             continue
                         return None
                 except requests.exceptions.RequestException as e:
                     print(f"文件 {filename} 请求异常: {e}")
-                    if attempt < 2:
-                        time.sleep(2)
+                    self.state.record_failure(filename, e)
+                    if attempt < MAX_ATTEMPTS - 1:
+                        time.sleep(backoff_delay(attempt))
                         continue
                     return None
             
@@ -90,40 +113,70 @@ class ModelScopeSHA256Crawler:
             if sha256_value:
                 with self.lock:
                     self.results[filename] = sha256_value
+                self.state.record_success(filename, sha256_value)
                 print(f"✅ {filename}: {sha256_value}")
                 return sha256_value
             else:
                 print(f"❌ 未找到文件 {filename} 的SHA256值")
+                self.state.record_failure(filename, "页面中未找到SHA256")
                 return None
                 
         except Exception as e:
             print(f"❌ 处理文件 {filename} 时出错: {e}")
+            self.state.record_failure(filename, e)
             return None
         
         # 添加延时避免请求过快
         time.sleep(0.5)
     
-    def crawl_all_sha256(self, max_workers=5):
-        """并发获取所有文件的SHA256值"""
-        print("开始爬取ModelScope上的SHA256值...")
-        print(f"目标文件数量: 163")
+    def crawl_all_sha256(self, max_workers=5, filenames=None):
+        """
+        并发获取所有文件的SHA256值
+
+        filenames 为 None 时以文件列表接口返回的文件为准，接口不可用时使用默认模型的分片列表。
+        """
+        print(f"开始爬取ModelScope上 {self.model_id} 的SHA256值...")
         print(f"并发线程数: {max_workers}")
         print("-" * 50)
         
+        if self.results:
+            print(f"从爬取状态中恢复 {len(self.results)} 个已完成的文件")
+        
+        # 优先通过文件列表接口一次性获取，只对接口未返回的文件解析页面
+        if filenames is None or not set(filenames) <= set(self.results):
+            api_results = fetch_repository_sha256(self.model_id, self.revision)
+            for filename, sha256 in api_results.items():
+                if not self.state.is_done(filename):
+                    self.state.record_success(filename, sha256)
+                self.results[filename] = sha256
+            if filenames is None:
+                filenames = sorted(api_results) or default_files(self.model_id)
+        self.expected = list(filenames)
+        if not self.expected:
+            print(f"❌ 文件列表接口不可用，无法确定 {self.model_id} 需要获取的文件")
+            return self.results
+        print(f"目标文件数量: {len(self.expected)}")
+        missing = [name for name in self.expected if name not in self.results]
+        if not missing:
+            self.state.flush()
+            return self.results
+        print(f"需要解析页面的文件: {len(missing)} 个")
+        
         # 使用线程池并发处理
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # 提交所有任务
             future_to_number = {
-                executor.submit(self.get_file_sha256, i): i 
-                for i in range(1, 164)
+                executor.submit(self.get_file_sha256, name): name
+                for name in missing
             }
             
             # 收集结果
             completed = 0
             for future in as_completed(future_to_number):
                 completed += 1
-                print(f"进度: {completed}/163 ({completed/163*100:.1f}%)")
+                print(f"进度: {completed}/{len(missing)} ({completed/len(missing)*100:.1f}%)")
         
+        self.state.flush()
         return self.results
     
     def save_results(self, filename="modelscope_sha256.txt"):
@@ -142,31 +195,47 @@ class ModelScopeSHA256Crawler:
         print(f"结果已保存到: {filename}")
         print(f"成功获取 {len(self.results)} 个文件的SHA256值")
 
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="ModelScope SHA256 爬虫")
+    parser.add_argument("-m", "--model-id", default=DEFAULT_MODEL_ID, help=f"模型ID（默认 {DEFAULT_MODEL_ID}）")
+    parser.add_argument("-r", "--revision", default=DEFAULT_REVISION, help="版本/分支（默认 master）")
+    parser.add_argument("-o", "--output", default="modelscope_sha256.txt", help="输出文件")
+    parser.add_argument("--state-file", help="爬取状态文件（默认按模型和版本命名，如 crawl_state_<模型>@<版本>.jsonl）")
+    return parser.parse_args()
+
 def main():
-    crawler = ModelScopeSHA256Crawler()
+    args = parse_arguments()
+    crawler = ModelScopeSHA256Crawler(args.state_file, args.model_id, args.revision)
     
     print("ModelScope SHA256 爬虫启动")
     print("=" * 50)
     
     # 开始爬取
-    results = crawler.crawl_all_sha256()
+    try:
+        results = crawler.crawl_all_sha256()
+    finally:
+        crawler.state.close()
+    
+    if not crawler.expected:
+        return 1
     
     # 保存结果
-    crawler.save_results()
+    crawler.save_results(args.output)
     
     # 统计信息
     print("\n" + "=" * 50)
     print("爬取完成统计:")
-    print(f"成功: {len(results)} 个文件")
-    print(f"失败: {163 - len(results)} 个文件")
+    failed_files = set(crawler.expected) - set(results.keys())
+    print(f"成功: {len(crawler.expected) - len(failed_files)} 个文件")
+    print(f"失败: {len(failed_files)} 个文件")
     
-    if len(results) < 163:
+    if failed_files:
         print("\n失败的文件:")
-        all_files = set(f"model-{i:05d}-of-000163.safetensors" for i in range(1, 164))
-        success_files = set(results.keys())
-        failed_files = all_files - success_files
         for failed_file in sorted(failed_files):
-            print(f"  - {failed_file}")
+            print(f"  - {failed_file} (累计尝试 {crawler.state.attempts(failed_file)} 次)")
+        return 1
+    return 0
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main()) 
\ No newline at end of file
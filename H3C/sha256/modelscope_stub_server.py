@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ModelScope 文件列表接口的本地替身服务
+按录制的响应回放 /api/v1/models/<模型ID>/repo/files 接口，用于在没有外网时检查
+modelscope_api.py 的分页、短页和限流（429）处理。
+
+录制文件放在响应目录下，按模型ID命名（"/" 替换为 "__"），如 test__paginated.json:
+    {"pages": {"1": [{"status": 429, "headers": {"Retry-After": "1"}, "body": {...}},
+                     {"status": 200, "body": {...}}],
+               "2": [...]}}
+同一页的多次请求依次返回列表中的响应，取完后重复最后一个；未录制的模型或页返回 404。
+
+用法:
+    python modelscope_stub_server.py -d testdata/modelscope_api -p 8000
+    python modelscope_api.py -m test/paginated --endpoint http://127.0.0.1:8000
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+DEFAULT_RESPONSE_DIR = Path(__file__).parent / "testdata" / "modelscope_api"
+FILES_PATH = re.compile(r"^/api/v1/models/(?P<model_id>[^/]+/[^/]+)/repo/files$")
+
+class StubHandler(BaseHTTPRequestHandler):
+    """按录制的响应回答文件列表请求"""
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        match = FILES_PATH.match(url.path)
+        query = parse_qs(url.query)
+        page_number = query.get('PageNumber', ['1'])[0]
+        response = None
+        if match:
+            response = self.server.next_response(match['model_id'], page_number)
+        if response is None:
+            response = {"status": 404, "body": {"Code": 404, "Message": "not found", "Success": False}}
+        model_id = match['model_id'] if match else None
+        self.server.requests.append((model_id, int(page_number), response['status']))
+
+        body = json.dumps(response.get('body', {}), ensure_ascii=False).encode('utf-8')
+        self.send_response(response['status'])
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in response.get('headers', {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class StubServer(ThreadingHTTPServer):
+    """
+    回放录制响应的HTTP服务
+
+    requests 记录收到的每个请求 (模型ID, 页码, 返回的状态码)。
+    """
+
+    daemon_threads = True
+
+    def __init__(self, response_dir=DEFAULT_RESPONSE_DIR, host="127.0.0.1", port=0, verbose=False):
+        super().__init__((host, port), StubHandler)
+        self.response_dir = Path(response_dir)
+        self.verbose = verbose
+        self.requests = []
+        self._served = {}
+        self._lock = threading.Lock()
+
+    @property
+    def endpoint(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def next_response(self, model_id, page_number):
+        """返回该模型该页的下一个录制响应，没有录制时返回 None"""
+        record_file = self.response_dir / f"{model_id.replace('/', '__')}.json"
+        if not record_file.is_file():
+            return None
+        with open(record_file, 'r', encoding='utf-8') as f:
+            responses = json.load(f).get('pages', {}).get(str(page_number))
+        if not responses:
+            return None
+        with self._lock:
+            index = self._served.get((model_id, page_number), 0)
+            self._served[(model_id, page_number)] = index + 1
+        return responses[min(index, len(responses) - 1)]
+
+    def start(self):
+        """在后台线程中运行，返回自身"""
+        threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="ModelScope 文件列表接口的本地替身服务")
+    parser.add_argument("-d", "--response-dir", default=str(DEFAULT_RESPONSE_DIR), help="录制响应所在目录")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址（默认 127.0.0.1）")
+    parser.add_argument("-p", "--port", type=int, default=8000, help="监听端口（默认 8000）")
+    return parser.parse_args()
+
+def main():
+    """主函数"""
+    args = parse_arguments()
+    server = StubServer(args.response_dir, args.host, args.port, verbose=True)
+    print(f"ModelScope 替身服务: {server.endpoint}（响应目录 {server.response_dir}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单次读取计算多种摘要
+每个文件只从磁盘读取一次，用同一块缓冲区同时更新 SHA256、MD5（可选 xxh64），
+同时生成供 compare_sha256.py 使用的 SHA256 清单和 md5sum 格式的 md5sums.txt，
+并可直接与目录中已有的 md5sums.txt 核对，不必再单独运行 md5sum -c。
+
+用法:
+    python multi_digest.py /HDD_Raid/SVN_MODEL_REPO/Model/DeepSeek-R1-0528/
+    python multi_digest.py <目录> -a sha256 md5 xxh64 --md5-output md5sums.txt
+    python multi_digest.py <目录> --verify-md5 <目录>/md5sums.txt
+"""
+
+import argparse
+import hashlib
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from local_sha256 import (DEFAULT_BUFFER_SIZE, IO_MODES, default_workers, find_files, format_size,
+                          format_speed, read_into_hashers, write_sha256_file)
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+ALGORITHMS = ("sha256", "md5", "xxh64")
+DEFAULT_ALGORITHMS = ("sha256", "md5")
+MD5SUM_PATTERN = re.compile(r"^\\?([0-9a-fA-F]{32}) [ *](.+)$")
+
+def new_hasher(name):
+    """创建哈希对象"""
+    if name == "xxh64":
+        if xxhash is None:
+            raise ValueError("计算 xxh64 需要安装 xxhash: pip install xxhash")
+        return xxhash.xxh64()
+    if name not in ALGORITHMS:
+        raise ValueError(f"不支持的摘要算法: {name}，可选值: {', '.join(ALGORITHMS)}")
+    return hashlib.new(name)
+
+def digest_file(path, algorithms=DEFAULT_ALGORITHMS, buffer_size=DEFAULT_BUFFER_SIZE, io_mode="buffered"):
+    """
+    读取一次文件计算多种摘要
+
+    Returns:
+        (文件路径, {算法: 摘要}, 文件大小, 耗时秒数)
+    """
+    hashers = {name: new_hasher(name) for name in algorithms}
+    start = time.perf_counter()
+    size = read_into_hashers(path, list(hashers.values()), buffer_size, io_mode)
+    digests = {name: hasher.hexdigest() for name, hasher in hashers.items()}
+    return str(path), digests, size, time.perf_counter() - start
+
+def digest_files(paths, algorithms=DEFAULT_ALGORITHMS, workers=None, buffer_size=DEFAULT_BUFFER_SIZE,
+                 io_mode="buffered", base_dir=None):
+    """
+    使用进程池并行计算多个文件的多种摘要，大文件优先
+
+    Returns:
+        {文件名: {算法: 摘要}}
+    """
+    paths = [Path(p) for p in paths]
+    if not paths:
+        return {}
+    # 提前检查算法，避免在子进程中才报错
+    for name in algorithms:
+        new_hasher(name)
+
+    sizes = {path: path.stat().st_size for path in paths}
+    total_size = sum(sizes.values())
+    workers = workers or default_workers(len(paths))
+    print(f"待计算文件: {len(paths)} 个, 总大小: {format_size(total_size)}, 并发进程: {workers}, "
+          f"摘要: {' + '.join(algorithms)}")
+    print("-" * 60)
+
+    results = {}
+    done_size = 0
+    start = time.perf_counter()
+    ordered = sorted(paths, key=sizes.__getitem__, reverse=True)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(digest_file, p, algorithms, buffer_size, io_mode): p for p in ordered}
+        for completed, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                _, digests, size, seconds = future.result()
+            except OSError as e:
+                print(f"❌ [{completed}/{len(paths)}] {path.name}: {e}")
+                continue
+            name = str(path.relative_to(base_dir)) if base_dir else path.name
+            results[name] = digests
+            done_size += size
+            elapsed = time.perf_counter() - start
+            print(f"✅ [{completed}/{len(paths)}] {name}  {format_size(size)}  {format_speed(size, seconds)}"
+                  f"  | 累计 {format_size(done_size)}/{format_size(total_size)}  {format_speed(done_size, elapsed)}")
+
+    elapsed = time.perf_counter() - start
+    print("-" * 60)
+    print(f"完成 {len(results)}/{len(paths)} 个文件, 耗时 {elapsed:.1f} 秒, 平均 {format_speed(done_size, elapsed)}")
+    return results
+
+def select_digests(results, algorithm):
+    """从多摘要结果中取出某一种，返回 {文件名: 摘要}"""
+    return {name: digests[algorithm] for name, digests in results.items() if algorithm in digests}
+
+def parse_md5sums(md5_file):
+    """
+    解析 md5sum 格式文件
+
+    文件名开头的 "./" 会被去掉，以便与相对路径的计算结果对应。
+
+    Returns:
+        {文件名: md5}
+    """
+    entries = {}
+    with open(md5_file, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            match = MD5SUM_PATTERN.match(line.rstrip('\r\n'))
+            if match:
+                md5, filename = match.groups()
+                entries[filename[2:] if filename.startswith('./') else filename] = md5.lower()
+    return entries
+
+def verify_md5sums(md5_file, results):
+    """
+    用已计算的MD5核对 md5sums.txt，相当于 md5sum -c 但不再读取文件
+
+    Returns:
+        {'ok': [...], 'failed': [(文件名, 期望, 实际)...], 'not_computed': [...]}
+    """
+    expected = parse_md5sums(md5_file)
+    actual = select_digests(results, "md5")
+    report = {'ok': [], 'failed': [], 'not_computed': []}
+    for filename, md5 in sorted(expected.items()):
+        if filename not in actual:
+            report['not_computed'].append(filename)
+        elif actual[filename] == md5:
+            report['ok'].append(filename)
+        else:
+            report['failed'].append((filename, md5, actual[filename]))
+    return report
+
+def write_digest_file(digests, output_file):
+    """写入 md5sum/sha256sum 格式文件（两者格式相同）"""
+    write_sha256_file(digests, output_file)
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="单次读取计算 SHA256/MD5/xxh64")
+    parser.add_argument("directory", help="文件所在目录")
+    parser.add_argument("-p", "--pattern", default="*.safetensors", help="文件匹配模式（默认 *.safetensors）")
+    parser.add_argument("-r", "--recursive", action="store_true", help="递归查找子目录，输出相对路径")
+    parser.add_argument("-a", "--algorithms", nargs="+", choices=ALGORITHMS, default=list(DEFAULT_ALGORITHMS),
+                        help="摘要算法（默认 sha256 md5）")
+    parser.add_argument("-j", "--workers", type=int, help="并发进程数")
+    parser.add_argument("-b", "--buffer-size", type=int, default=DEFAULT_BUFFER_SIZE // 1024 // 1024,
+                        help="读取块大小，单位MB（默认16）")
+    parser.add_argument("--io-mode", choices=IO_MODES, default="buffered", help="读取方式")
+    parser.add_argument("--sha256-output", default="local_sha256.txt", help="SHA256清单输出文件")
+    parser.add_argument("--md5-output", help="md5sum 格式输出文件（可选）")
+    parser.add_argument("--xxh64-output", help="xxh64 输出文件（可选）")
+    parser.add_argument("--verify-md5", help="用计算结果核对已有的 md5sums.txt")
+    return parser.parse_args()
+
+def main():
+    """主函数"""
+    args = parse_arguments()
+    print("多摘要单次读取计算工具")
+    print("=" * 60)
+
+    algorithms = list(dict.fromkeys(args.algorithms))
+    if args.verify_md5 and "md5" not in algorithms:
+        algorithms.append("md5")
+    directory = Path(args.directory)
+    if args.recursive:
+        files = sorted(p for p in directory.rglob(args.pattern) if p.is_file() and p.name != "md5sums.txt")
+    else:
+        files = find_files(directory, args.pattern)
+    if not files:
+        print(f"❌ 目录 {directory} 下未找到匹配 {args.pattern} 的文件")
+        return 1
+
+    try:
+        results = digest_files(files, algorithms, args.workers, args.buffer_size * 1024 * 1024,
+                               args.io_mode, directory if args.recursive else None)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    outputs = {"sha256": args.sha256_output, "md5": args.md5_output, "xxh64": args.xxh64_output}
+    for algorithm in algorithms:
+        if outputs[algorithm]:
+            write_digest_file(select_digests(results, algorithm), outputs[algorithm])
+            print(f"📋 {algorithm} 结果已保存到: {outputs[algorithm]}")
+
+    if args.verify_md5:
+        report = verify_md5sums(args.verify_md5, results)
+        print(f"\nMD5核对: 成功 {len(report['ok'])}, 失败 {len(report['failed'])}, "
+              f"未计算 {len(report['not_computed'])}")
+        for filename, expected, actual in report['failed']:
+            print(f"❌ {filename}: FAILED  期望 {expected}  实际 {actual}")
+        for filename in report['not_computed']:
+            print(f"⚠️  {filename}: 未计算（本次未找到该文件，检查文件名或是否需要 --recursive）")
+        if report['failed'] or report['not_computed']:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
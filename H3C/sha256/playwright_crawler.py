@@ -2,8 +2,16 @@
 # -*- coding: utf-8 -*-
 """
 使用Playwright自动化浏览器获取ModelScope上的SHA256值
+多个工作协程共享一个页面池，并发数按 AIMD 方式自适应调整：
+请求连续成功时逐步增加并发，出错或被限流（429）时并发减半。
+同时获取多个模型时，可让各爬虫共用一个 AdaptiveConcurrency，限制对网站的总并发。
+
+用法:
+    python playwright_crawler.py
+    python playwright_crawler.py -m Qwen/Qwen3-235B-A22B --files model-00001-of-00118.safetensors
 """
 
+import argparse
 import asyncio
 import re
 import json
@@ -11,14 +19,83 @@ import time
 from playwright.async_api import async_playwright
 import sys
 
+from crawl_state import CrawlState, backoff_delay, state_file_for
+from modelscope_api import DEFAULT_MODEL_ID, DEFAULT_REVISION, DEFAULT_SHARD_COUNT, default_files, file_view_url
+from safetensors_check import shard_filename
+
 sys.stdout.reconfigure(encoding='utf-8')
 
+# 页面加载时拦截的资源类型，SHA256只在页面文本中，不需要这些资源
+BLOCKED_RESOURCE_TYPES = {"image", "font", "stylesheet", "media"}
+# 单个文件在一次运行中的最多尝试次数，失败后按指数退避加抖动重新排队
+MAX_ATTEMPTS = 3
+
+class AdaptiveConcurrency:
+    """
+    AIMD 并发控制
+
+    每成功 limit 个请求并发数加1（加性增），出错时并发数减半（乘性减），
+    被限流时额外暂停 cooldown 秒。
+    """
+
+    def __init__(self, initial=2, minimum=1, maximum=8, cooldown=5):
+        self.limit = max(minimum, min(initial, maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.cooldown = cooldown
+        self.active = 0
+        self._successes = 0
+        self._paused_until = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        """等待可用的并发额度"""
+        while True:
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with self._condition:
+                await self._condition.wait_for(lambda: self.active < self.limit)
+                if self._paused_until <= time.monotonic():
+                    self.active += 1
+                    return
+
+    async def release(self, success, throttled=False):
+        """释放并发额度，并根据结果调整并发数（success 为 None 时不调整）"""
+        async with self._condition:
+            self.active -= 1
+            if success is None:
+                pass
+            elif success:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self._successes = 0
+            else:
+                self.limit = max(self.minimum, self.limit // 2)
+                self._successes = 0
+                if throttled:
+                    self._paused_until = time.monotonic() + self.cooldown
+            self._condition.notify_all()
+
 class PlaywrightSHA256Crawler:
-    def __init__(self):
-        self.base_url = "https://modelscope.cn/models/deepseek-ai/DeepSeek-R1-0528/file/view/master"
-        self.results = {}
+    def __init__(self, state_file=None, model_id=DEFAULT_MODEL_ID, revision=DEFAULT_REVISION,
+                 limiter=None):
+        self.model_id = model_id
+        self.base_url = file_view_url(model_id, revision)
+        # 多个爬虫共用的 AdaptiveConcurrency（可选），为 None 时每次爬取单独创建
+        self.limiter = limiter
+        # 启动时读回已完成的文件，中断后重新运行只获取缺失的文件；
+        # 默认状态文件按模型和版本区分，避免把其他模型的结果当作本模型的
+        self.state = CrawlState(state_file or state_file_for(model_id, revision))
+        self.results = dict(self.state.completed)
+        # 每个文件最近一次访问的HTTP状态码，用于调度器判断是否被限流
+        self.status_codes = {}
+        # 每获取一个文件的SHA256时调用 on_result(文件名, sha256)，用于流水线对比
+        self.on_result = None
         self.browser = None
         self.context = None
+        self.playwright = None
         
     async def init_browser(self):
         """初始化浏览器"""
@@ -34,6 +111,15 @@ class PlaywrightSHA256Crawler:
             user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             viewport={'width': 1920, 'height': 1080}
         )
+        await self.context.route("**/*", self._block_resources)
+    
+    @staticmethod
+    async def _block_resources(route):
+        """拦截图片、字体、样式表等与SHA256无关的资源"""
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
         
     async def close_browser(self):
         """关闭浏览器"""
@@ -44,31 +130,49 @@ class PlaywrightSHA256Crawler:
         if self.playwright:
             await self.playwright.stop()
     
-    async def get_file_sha256(self, file_number):
-        """获取单个文件的SHA256值"""
-        filename = f"model-{file_number:05d}-of-000163.safetensors"
+    async def new_page(self):
+        """创建页面"""
+        page = await self.context.new_page()
+        # 设置较长的超时时间
+        page.set_default_timeout(60000)  # 60秒
+        return page
+    
+    async def get_file_sha256(self, file, page=None):
+        """
+        获取单个文件的SHA256值
+
+        file 为文件名，或默认模型的分片编号。
+        page 为 None 时自行创建并关闭页面；由页面池传入时只使用、不关闭。
+        """
+        filename = file if isinstance(file, str) else shard_filename(file, DEFAULT_SHARD_COUNT)
         url = f"{self.base_url}/{filename}"
+        owns_page = page is None
         
         try:
             print(f"正在获取文件 {filename} 的SHA256...")
             
-            # 创建新页面
-            page = await self.context.new_page()
-            
-            # 设置较长的超时时间
-            page.set_default_timeout(60000)  # 60秒
+            if owns_page:
+                page = await self.new_page()
             
             # 访问页面
-            response = await page.goto(url, wait_until='networkidle')
+            response = await page.goto(url, wait_until='domcontentloaded')
+            self.status_codes[filename] = response.status if response else None
             
-            if response.status != 200:
-                print(f"文件 {filename} 访问失败，状态码: {response.status}")
-                await page.close()
+            if response is None or response.status != 200:
+                print(f"文件 {filename} 访问失败，状态码: {response.status if response else None}")
+                self.state.record_failure(filename, f"HTTP {response.status if response else None}")
+                if owns_page:
+                    await page.close()
                 return None
             
-            # 等待页面加载完成
-            await page.wait_for_load_state('networkidle')
-            await asyncio.sleep(2)  # 额外等待2秒确保内容加载
+            # 等待SHA256出现在页面文本中，而不是固定等待
+            try:
+                await page.wait_for_function(
+                    "document.body && /\\b[a-f0-9]{64}\\b/i.test(document.body.innerText)",
+                    timeout=15000
+                )
+            except Exception:
+                await page.wait_for_load_state('networkidle')
             
             # 获取页面内容
             content = await page.content()
@@ -133,8 +237,11 @@ class PlaywrightSHA256Crawler:
                     page.on('response', handle_response)
                     
                     # 刷新页面以捕获网络请求
-                    await page.reload(wait_until='networkidle')
-                    await asyncio.sleep(3)
+                    try:
+                        await page.reload(wait_until='networkidle')
+                    finally:
+                        # 页面池中的页面会被复用，需移除监听
+                        page.remove_listener('response', handle_response)
                     
                     # 检查捕获的响应
                     for response in responses:
@@ -158,64 +265,134 @@ class PlaywrightSHA256Crawler:
             if sha256_value:
                 self.results[filename] = sha256_value
                 
-                # 同时保存到文件以防程序中断
-                with open('temp_results.txt', 'a', encoding='utf-8') as f:
-                    f.write(f"{sha256_value}  {filename}\n")
+                # 同时写入爬取状态以防程序中断
+                self.state.record_success(filename, sha256_value)
+                if self.on_result:
+                    self.on_result(filename, sha256_value)
                     
-                await page.close()
+                if owns_page:
+                    await page.close()
                 return sha256_value
             else:
                 print(f"❌ 未找到文件 {filename} 的SHA256值")
+                self.state.record_failure(filename, "页面中未找到SHA256")
                 
                 # 保存页面内容用于调试
                 await page.screenshot(path=f'debug_{filename.replace(".", "_")}.png')
                 with open(f'debug_{filename.replace(".", "_")}.html', 'w', encoding='utf-8') as f:
                     f.write(await page.content())
                 
-                await page.close()
+                if owns_page:
+                    await page.close()
                 return None
                 
         except Exception as e:
             print(f"❌ 处理文件 {filename} 时出错: {e}")
-            if 'page' in locals():
+            self.state.record_failure(filename, e)
+            if owns_page and page is not None:
                 await page.close()
-            return None
+            raise
     
-    async def crawl_all_sha256(self, start_file=1, end_file=163, batch_size=5):
-        """分批并发获取所有文件的SHA256值"""
-        print("开始使用Playwright爬取ModelScope上的SHA256值...")
-        print(f"目标文件数量: {end_file - start_file + 1}")
-        print(f"批次大小: {batch_size}")
+    async def crawl_all_sha256(self, start_file=1, end_file=DEFAULT_SHARD_COUNT, batch_size=3, file_numbers=None,
+                               max_concurrency=8, time_budget=None, filenames=None):
+        """
+        使用自适应并发调度获取所有文件的SHA256值
+
+        Args:
+            start_file, end_file: 默认模型的分片编号范围
+            batch_size: 初始并发数
+            file_numbers: 指定时只获取这些编号的文件（如文件列表接口未返回的文件）
+            max_concurrency: 最大并发数（即页面池大小）
+            time_budget: 总时间预算（秒），超时后不再开始新的文件，返回已获取的结果
+            filenames: 指定时按文件名获取，忽略编号参数（用于任意模型）
+        """
+        if filenames is None:
+            numbers = file_numbers if file_numbers is not None else range(start_file, end_file + 1)
+            filenames = [shard_filename(i, DEFAULT_SHARD_COUNT) for i in numbers]
+        # 跳过爬取状态中已完成的文件
+        filenames = [name for name in filenames if not self.state.is_done(name)]
+        print(f"开始使用Playwright爬取ModelScope上 {self.model_id} 的SHA256值...")
+        print(f"目标文件数量: {len(filenames)}")
+        print(f"初始并发: {batch_size}, 最大并发: {max_concurrency}")
         print("-" * 50)
         
+        if not filenames:
+            return self.results
+        
         await self.init_browser()
         
-        try:
-            # 分批处理以避免过多并发
-            for batch_start in range(start_file, end_file + 1, batch_size):
-                batch_end = min(batch_start + batch_size - 1, end_file)
-                print(f"\n处理批次: {batch_start} - {batch_end}")
-                
-                # 创建批次任务
-                tasks = []
-                for i in range(batch_start, batch_end + 1):
-                    task = self.get_file_sha256(i)
-                    tasks.append(task)
+        limiter = self.limiter or AdaptiveConcurrency(initial=batch_size, maximum=max_concurrency)
+        pending = asyncio.Queue()
+        for filename in filenames:
+            pending.put_nowait((filename, 0))
+        pages = asyncio.Queue()
+        deadline = time.monotonic() + time_budget if time_budget else None
+        start = time.monotonic()
+        stats = {'done': 0, 'failed': 0}
+        retrying = set()
+        
+        async def take_page():
+            if pages.empty():
+                return await self.new_page()
+            return pages.get_nowait()
+        
+        async def worker():
+            while not pending.empty() or retrying:
+                if pending.empty():
+                    # 其他文件正在退避，稍后会重新排队
+                    await asyncio.sleep(0.5)
+                    continue
+                if deadline and time.monotonic() >= deadline:
+                    return
+                await limiter.acquire()
+                try:
+                    filename, attempts = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    await limiter.release(None)
+                    return
                 
-                # 并发执行批次任务
-                batch_results = await asyncio.gather(*tasks, return_exceptions=True)
+                page = await take_page()
+                sha256_value = None
+                try:
+                    timeout = max(deadline - time.monotonic(), 1) if deadline else None
+                    sha256_value = await asyncio.wait_for(self.get_file_sha256(filename, page), timeout)
+                except Exception:
+                    # 出错的页面可能处于异常状态，关闭后由池重新创建
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                    page = None
+                if page is not None:
+                    pages.put_nowait(page)
                 
-                # 统计批次结果
-                success_count = sum(1 for result in batch_results if result is not None and not isinstance(result, Exception))
-                print(f"批次 {batch_start}-{batch_end} 完成，成功: {success_count}/{len(tasks)}")
+                status = self.status_codes.get(filename)
+                throttled = status == 429 or (status is not None and status >= 500)
+                await limiter.release(sha256_value is not None, throttled)
                 
-                # 批次间休息
-                if batch_end < end_file:
-                    print("批次间休息5秒...")
-                    await asyncio.sleep(5)
-                    
+                if sha256_value is None and attempts + 1 < MAX_ATTEMPTS:
+                    # 退避期间不占用并发额度和页面
+                    delay = backoff_delay(attempts)
+                    if deadline is None or time.monotonic() + delay < deadline:
+                        retrying.add(filename)
+                        await asyncio.sleep(delay)
+                        retrying.discard(filename)
+                        pending.put_nowait((filename, attempts + 1))
+                        continue
+                stats['done' if sha256_value else 'failed'] += 1
+                finished = stats['done'] + stats['failed']
+                print(f"进度: {finished}/{len(filenames)}  成功: {stats['done']}  当前并发: {limiter.limit}"
+                      f"  已用时: {time.monotonic() - start:.0f} 秒")
+        
+        try:
+            await asyncio.gather(*(worker() for _ in range(max_concurrency)))
+            if not pending.empty():
+                print(f"⚠️  已达到时间预算 {time_budget} 秒，剩余 {pending.qsize()} 个文件未获取")
         finally:
+            while not pages.empty():
+                await pages.get_nowait().close()
             await self.close_browser()
+            self.state.flush()
         
         return self.results
     
@@ -235,32 +412,51 @@ class PlaywrightSHA256Crawler:
         print(f"结果已保存到: {filename}")
         print(f"成功获取 {len(self.results)} 个文件的SHA256值")
 
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="Playwright SHA256 爬虫")
+    parser.add_argument("-m", "--model-id", default=DEFAULT_MODEL_ID, help=f"模型ID（默认 {DEFAULT_MODEL_ID}）")
+    parser.add_argument("-r", "--revision", default=DEFAULT_REVISION, help="版本/分支（默认 master）")
+    parser.add_argument("--files", nargs="+", help="要获取的文件名（默认模型可省略）")
+    parser.add_argument("-o", "--output", default="modelscope_sha256.txt", help="输出文件")
+    parser.add_argument("--state-file", help="爬取状态文件（默认按模型和版本命名，如 crawl_state_<模型>@<版本>.jsonl）")
+    return parser.parse_args()
+
 async def main():
-    crawler = PlaywrightSHA256Crawler()
+    args = parse_arguments()
+    filenames = args.files or default_files(args.model_id)
+    if not filenames:
+        print(f"❌ 请用 --files 指定 {args.model_id} 要获取的文件")
+        return 1
+    crawler = PlaywrightSHA256Crawler(args.state_file, args.model_id, args.revision)
     
     print("Playwright SHA256 爬虫启动")
     print("=" * 50)
     
-    # 获取全部163个文件
-    print("开始获取全部163个文件...")
-    results = await crawler.crawl_all_sha256(start_file=1, end_file=163, batch_size=3)
+    print(f"开始获取全部{len(filenames)}个文件...")
+    try:
+        results = await crawler.crawl_all_sha256(batch_size=3, max_concurrency=8, filenames=filenames)
+    finally:
+        crawler.state.close()
     
     # 保存结果
-    crawler.save_results("modelscope_sha256.txt")
+    crawler.save_results(args.output)
     
     # 统计信息
+    succeeded = len(set(filenames) & set(results))
     print("\n" + "=" * 50)
     print("爬取完成统计:")
-    print(f"成功: {len(results)} 个文件")
-    print(f"失败: {163 - len(results)} 个文件")
+    print(f"成功: {succeeded} 个文件")
+    print(f"失败: {len(filenames) - succeeded} 个文件")
     
-    if len(results) >= 160:
+    if succeeded >= len(filenames) * 0.98:
         print("✅ 获取成功率超过98%，质量很好！")
-    elif len(results) >= 150:
+    elif succeeded >= len(filenames) * 0.92:
         print("⚠️ 获取成功率超过92%，还不错")
     else:
         print("❌ 获取成功率较低，可能需要重试")
+    return 0 if succeeded == len(filenames) else 1
 
 if __name__ == "__main__":
     # 运行爬虫
-    asyncio.run(main()) 
\ No newline at end of file
+    sys.exit(asyncio.run(main())) 
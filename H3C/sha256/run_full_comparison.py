@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-完整的SHA256对比流程脚本
+完整的SHA256对比流程脚本（单个模型，默认 DeepSeek-R1-0528）
 1. 完成SSH服务器上剩余文件的SHA256计算
-2. 使用Playwright获取全部163个文件的网站SHA256值
+2. 获取模型全部文件的网站SHA256值（文件列表接口优先，缺失的文件用Playwright补充）
 3. 对比并生成完整报告
+
+同时校验多个模型请使用 verify_models.py。
+
+使用 --pipeline 时步骤1和步骤2同时进行，每个文件的本地和远程SHA256都到齐后立即对比，
+总耗时约为 max(本地计算, 网站获取)，不匹配的文件在运行过程中即可发现。
 """
 
+import argparse
 import asyncio
 import sys
 import subprocess
@@ -17,40 +23,97 @@ sys.stdout.reconfigure(encoding='utf-8')
 
 # 导入我们的爬虫和对比模块
 from playwright_crawler import PlaywrightSHA256Crawler
-from compare_sha256 import compare_sha256_files
+from compare_sha256 import compare_sha256_files, parse_sha256_file
+from local_sha256 import hash_directory, find_files, format_size, format_speed
+from modelscope_api import expected_files, fetch_repository_sha256, DEFAULT_MODEL_ID, DEFAULT_REVISION
+from safetensors_check import verify_model, print_report
+
+LOCAL_MODEL_DIR = "/HDD_Raid/SVN_MODEL_REPO/Model/DeepSeek-R1-0528/"
+
+def check_safetensors_headers(model_dir=LOCAL_MODEL_DIR):
+    """SHA256对比前的快速预检：只读取各分片文件头，几秒内发现缺失、截断、重复的分片"""
+    if not Path(model_dir).is_dir():
+        return None
+    print("步骤0: safetensors 文件头快速预检")
+    print("=" * 60)
+    start = time.time()
+    report = verify_model(model_dir)
+    print_report(report)
+    print(f"预检耗时 {time.time() - start:.1f} 秒")
+    print()
+    return report
 
-async def complete_ssh_sha256():
-    """完成SSH服务器上剩余文件的SHA256计算"""
+async def complete_ssh_sha256(model_dir=LOCAL_MODEL_DIR, output_file="local_sha256.txt", on_result=None):
+    """
+    完成SSH服务器上剩余文件的SHA256计算
+
+    on_result(文件名, sha256, 读取字节数) 在事件循环线程中逐个文件调用；
+    本机不存在模型目录时，对已有的 output_file 中的每个文件调用。
+    """
     print("步骤1: 完成SSH服务器上剩余文件的SHA256计算")
     print("=" * 60)
     
-    # 这里可以添加SSH命令来完成剩余文件的计算
-    # 由于我们已经有了50个文件，需要计算剩余的113个文件
-    print("✅ SSH服务器SHA256计算已在后台进行中...")
-    print("请确保SSH服务器上的计算已完成，或手动运行以下命令:")
-    print("cd /HDD_Raid/SVN_MODEL_REPO/Model/DeepSeek-R1-0528/")
-    print("for i in {51..163}; do")
-    print("  file=$(printf \"model-%05d-of-000163.safetensors\" $i)")
-    print("  if [ -f \"$file\" ]; then")
-    print("    sha256sum \"$file\" >> local_sha256.txt")
-    print("  fi")
-    print("done")
+    if not Path(model_dir).is_dir():
+        # 不在模型服务器上运行时，提示在服务器上执行并行计算
+        print(f"⚠️ 本机不存在模型目录: {model_dir}")
+        print("请在SSH服务器上运行以下命令并行计算SHA256，然后将结果复制到当前目录:")
+        print(f"python local_sha256.py {model_dir} -o {output_file}")
+        print()
+        if on_result and Path(output_file).exists():
+            for filename, sha256 in parse_sha256_file(output_file).items():
+                on_result(filename, sha256, 0)
+        return 0
+    
+    # 哈希计算是CPU和磁盘密集型操作，放到线程中执行以免阻塞事件循环
+    loop = asyncio.get_running_loop()
+    callback = None
+    if on_result:
+        def callback(*args):
+            loop.call_soon_threadsafe(on_result, *args)
+    results = await loop.run_in_executor(
+        None, lambda: hash_directory(model_dir, output_file, on_result=callback)
+    )
     print()
+    return len(results)
 
-async def crawl_all_website_sha256():
-    """获取网站上全部163个文件的SHA256值"""
-    print("步骤2: 获取网站上全部163个文件的SHA256值")
+async def crawl_all_website_sha256(on_result=None, model_id=DEFAULT_MODEL_ID, revision=DEFAULT_REVISION,
+                                   model_dir=LOCAL_MODEL_DIR):
+    """
+    获取网站上模型全部文件的SHA256值
+
+    on_result(文件名, sha256) 在每得到一个文件的SHA256时调用（含从爬取状态恢复的文件）。
+    """
+    print(f"步骤2: 获取网站上 {model_id} 全部文件的SHA256值")
     print("=" * 60)
     
-    crawler = PlaywrightSHA256Crawler()
+    crawler = PlaywrightSHA256Crawler(model_id=model_id, revision=revision)
+    crawler.on_result = on_result
     
     try:
-        # 获取全部163个文件，分批处理以避免过载
-        print("开始爬取全部163个文件的SHA256值...")
+        if crawler.results:
+            print(f"从爬取状态中恢复 {len(crawler.results)} 个已完成的文件")
+            if on_result:
+                for filename, sha256 in list(crawler.results.items()):
+                    on_result(filename, sha256)
+        
+        # 优先通过文件列表接口一次性获取，接口缺失的文件再用Playwright逐个爬取
+        loop = asyncio.get_running_loop()
+        api_results = await loop.run_in_executor(None, fetch_repository_sha256, model_id, revision)
+        for filename, sha256 in api_results.items():
+            if not crawler.state.is_done(filename):
+                crawler.state.record_success(filename, sha256)
+                if on_result:
+                    on_result(filename, sha256)
+        crawler.results.update(api_results)
+        local_names = [p.name for p in find_files(model_dir)] if Path(model_dir).is_dir() else []
+        missing = [name for name in expected_files(model_id, local_names, api_results)
+                   if name not in crawler.results]
+        
+        if missing:
+            print(f"开始使用Playwright爬取剩余 {len(missing)} 个文件的SHA256值...")
         results = await crawler.crawl_all_sha256(
-            start_file=1, 
-            end_file=163, 
-            batch_size=3  # 减小批次大小以提高稳定性
+            batch_size=3,  # 减小批次大小以提高稳定性
+            filenames=missing
         )
         
         # 保存结果
@@ -62,6 +125,8 @@ async def crawl_all_website_sha256():
     except Exception as e:
         print(f"❌ 网站SHA256获取失败: {e}")
         return 0
+    finally:
+        crawler.state.close()
 
 def run_comparison():
     """运行SHA256对比"""
@@ -84,23 +149,109 @@ def run_comparison():
     
     return True
 
+class PipelineComparator:
+    """流水线模式下的逐文件对比：本地和远程SHA256都到齐时立即对比，并统计各阶段吞吐"""
+
+    def __init__(self, total=0):
+        self.total = total
+        self.local = {}
+        self.remote = {}
+        self.matches = 0
+        self.mismatches = []
+        self.local_bytes = 0
+        self.start = time.monotonic()
+        # 各阶段最近一次收到结果的时间，吞吐按各自的实际耗时计算
+        self.local_elapsed = 0
+        self.remote_elapsed = 0
+
+    def add_local(self, filename, sha256, size=0):
+        """收到一个本地SHA256"""
+        self.local[filename] = sha256
+        self.local_bytes += size
+        self.local_elapsed = time.monotonic() - self.start
+        self._compare(filename)
+
+    def add_remote(self, filename, sha256):
+        """收到一个远程SHA256"""
+        self.remote[filename] = sha256
+        self.remote_elapsed = time.monotonic() - self.start
+        self._compare(filename)
+
+    def _compare(self, filename):
+        if filename not in self.local or filename not in self.remote:
+            return
+        local_hash, remote_hash = self.local[filename], self.remote[filename]
+        if local_hash == remote_hash:
+            self.matches += 1
+            print(f"✓ {filename}  {self.progress()}")
+        else:
+            self.mismatches.append((filename, local_hash, remote_hash))
+            print(f"✗ {filename} SHA256不匹配  本地: {local_hash}  远程: {remote_hash}")
+            print(f"  {self.progress()}")
+
+    def progress(self):
+        """返回各阶段进度和吞吐（total 为 0 时表示总数未知）"""
+        compared = self.matches + len(self.mismatches)
+        total = self.total or "?"
+        remote_rate = len(self.remote) / self.remote_elapsed if self.remote_elapsed > 0 else 0
+        return (f"[本地 {len(self.local)}/{total} {format_size(self.local_bytes)} "
+                f"{format_speed(self.local_bytes, self.local_elapsed)} | "
+                f"远程 {len(self.remote)}/{total} {remote_rate:.1f} 个/秒 | "
+                f"已对比 {compared} 不匹配 {len(self.mismatches)}]")
+
+async def run_pipeline(model_dir=LOCAL_MODEL_DIR, model_id=DEFAULT_MODEL_ID, revision=DEFAULT_REVISION):
+    """
+    流水线模式：本地计算和网站获取同时进行，逐文件即时对比
+
+    Returns:
+        (PipelineComparator, 网站获取成功的文件数)
+    """
+    total = len(find_files(model_dir)) if Path(model_dir).is_dir() else 0
+    comparator = PipelineComparator(total)
+    _, success_count = await asyncio.gather(
+        complete_ssh_sha256(model_dir, on_result=comparator.add_local),
+        crawl_all_website_sha256(comparator.add_remote, model_id, revision, model_dir),
+    )
+    print("\n" + "=" * 60)
+    print(f"流水线阶段完成 {comparator.progress()}")
+    for filename, local_hash, remote_hash in comparator.mismatches:
+        print(f"❌ {filename}  本地: {local_hash}  远程: {remote_hash}")
+    return comparator, success_count
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="SHA256完整对比流程")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="流水线模式：本地计算与网站获取同时进行，逐文件即时对比")
+    parser.add_argument("--model-dir", default=LOCAL_MODEL_DIR, help=f"本地模型目录（默认 {LOCAL_MODEL_DIR}）")
+    parser.add_argument("-m", "--model-id", default=DEFAULT_MODEL_ID, help=f"模型ID（默认 {DEFAULT_MODEL_ID}）")
+    parser.add_argument("-r", "--revision", default=DEFAULT_REVISION, help="版本/分支（默认 master）")
+    return parser.parse_args()
+
 async def main():
     """主函数"""
-    print("DeepSeek-R1-0528 模型文件SHA256完整对比流程")
+    args = parse_arguments()
+    print(f"{args.model_id} 模型文件SHA256完整对比流程")
     print("=" * 80)
-    print("目标: 对比163个模型文件的SHA256值")
-    print("本地: /HDD_Raid/SVN_MODEL_REPO/Model/DeepSeek-R1-0528/")
-    print("远程: https://modelscope.cn/models/deepseek-ai/DeepSeek-R1-0528/")
+    print(f"本地: {args.model_dir}")
+    print(f"远程: https://modelscope.cn/models/{args.model_id}/")
     print("=" * 80)
     print()
     
     start_time = time.time()
     
-    # 步骤1: 检查SSH计算状态
-    await complete_ssh_sha256()
+    # 步骤0: 文件头预检，结构问题无需等待完整SHA256即可发现
+    check_safetensors_headers(args.model_dir)
     
-    # 步骤2: 爬取网站SHA256值
-    success_count = await crawl_all_website_sha256()
+    if args.pipeline:
+        # 步骤1和步骤2同时进行，逐文件即时对比
+        _, success_count = await run_pipeline(args.model_dir, args.model_id, args.revision)
+    else:
+        # 步骤1: 检查SSH计算状态
+        await complete_ssh_sha256(args.model_dir)
+        
+        # 步骤2: 爬取网站SHA256值
+        success_count = await crawl_all_website_sha256(None, args.model_id, args.revision, args.model_dir)
     
     if success_count == 0:
         print("❌ 网站SHA256获取失败，无法进行对比")
@@ -114,7 +265,7 @@ async def main():
         end_time = time.time()
         elapsed = end_time - start_time
         print(f"⏱️  总耗时: {elapsed/60:.1f} 分钟")
-        print(f"📊 成功获取 {success_count}/163 个文件的网站SHA256值")
+        print(f"📊 成功获取 {success_count} 个文件的网站SHA256值")
         print("📋 详细对比报告已保存到: final_sha256_comparison_report.txt")
     else:
         print("❌ 对比过程失败")
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+safetensors 文件头快速校验
+每个分片只读取开头8字节的头长度和JSON头，不读取张量数据，几秒内即可发现
+分片缺失、截断、重复等结构性问题，可作为SHA256对比前的快速预检。
+
+检查内容:
+    - 分片编号是否连续完整（model-XXXXX-of-NNNNNN.safetensors）
+    - 头部能否解析，张量数据偏移是否越界、重叠，数据区大小是否与文件大小一致
+    - 张量形状与数据类型计算出的字节数是否与偏移一致
+    - 与 model.safetensors.index.json 的 weight_map 交叉核对张量所在分片
+    - 不同分片中是否出现同名张量，是否有头部完全相同的分片（疑似复制错误）
+
+用法:
+    python safetensors_check.py /HDD_Raid/SVN_MODEL_REPO/Model/DeepSeek-R1-0528/
+    python safetensors_check.py <目录> --json
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+INDEX_FILE = "model.safetensors.index.json"
+SHARD_PATTERN = re.compile(r"^(?P<prefix>.+)-(?P<number>\d+)-of-(?P<total>\d+)\.safetensors$")
+# 头部长度上限，超过视为损坏（safetensors 规范限制为 100MB）
+MAX_HEADER_SIZE = 100 * 1024 * 1024
+DTYPE_SIZES = {
+    "BOOL": 1, "U8": 1, "I8": 1, "F8_E4M3": 1, "F8_E5M2": 1, "F8_E8M0": 1,
+    "U16": 2, "I16": 2, "F16": 2, "BF16": 2,
+    "U32": 4, "I32": 4, "F32": 4,
+    "U64": 8, "I64": 8, "F64": 8,
+}
+
+def read_header(path):
+    """
+    读取 safetensors 文件头
+
+    Returns:
+        (头长度, 头部原始字节, 头部字典)；无法解析时抛出 ValueError
+    """
+    file_size = path.stat().st_size
+    with open(path, 'rb') as f:
+        prefix = f.read(8)
+        if len(prefix) < 8:
+            raise ValueError(f"文件只有 {file_size} 字节，不足8字节头长度")
+        header_len = struct.unpack('<Q', prefix)[0]
+        if header_len > MAX_HEADER_SIZE or header_len > file_size - 8:
+            raise ValueError(f"头长度 {header_len} 超出文件大小 {file_size}")
+        raw = f.read(header_len)
+    try:
+        header = json.loads(raw)
+    except ValueError as e:
+        raise ValueError(f"JSON头解析失败: {e}")
+    if not isinstance(header, dict):
+        raise ValueError("JSON头不是对象")
+    return header_len, raw, header
+
+def is_int(value):
+    """判断是否为整数（排除 bool）"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def verify_shard(path):
+    """
+    校验单个分片的文件头
+
+    Returns:
+        {"file", "size", "tensors": [名称...], "header_digest", "errors": [...]}
+    """
+    path = Path(path)
+    result = {"file": path.name, "size": 0, "tensors": [], "header_digest": None, "errors": []}
+    errors = result["errors"]
+    try:
+        result["size"] = path.stat().st_size
+        header_len, raw, header = read_header(path)
+    except (OSError, ValueError) as e:
+        errors.append(str(e))
+        return result
+
+    result["header_digest"] = hashlib.sha256(raw).hexdigest()
+    data_size = result["size"] - 8 - header_len
+    spans = []
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        result["tensors"].append(name)
+        try:
+            begin, end = info["data_offsets"]
+            dtype = info["dtype"]
+            shape = info["shape"]
+        except (KeyError, TypeError, ValueError):
+            errors.append(f"张量 {name} 的头信息不完整")
+            continue
+        if not (is_int(begin) and is_int(end)):
+            errors.append(f"张量 {name} 的偏移不是整数: {info['data_offsets']!r}")
+            continue
+        if not isinstance(dtype, str):
+            errors.append(f"张量 {name} 的类型不是字符串: {dtype!r}")
+            continue
+        if not (isinstance(shape, list) and all(is_int(n) and n >= 0 for n in shape)):
+            errors.append(f"张量 {name} 的形状无效: {shape!r}")
+            continue
+        if not 0 <= begin <= end:
+            errors.append(f"张量 {name} 的偏移无效: {begin}-{end}")
+            continue
+        if dtype in DTYPE_SIZES and (end - begin) != math.prod(shape) * DTYPE_SIZES[dtype]:
+            errors.append(f"张量 {name} 的字节数 {end - begin} 与形状 {shape}、类型 {dtype} 不符")
+        spans.append((begin, end, name))
+
+    spans.sort()
+    position = 0
+    for begin, end, name in spans:
+        if begin < position:
+            errors.append(f"张量 {name} 的数据与前一个张量重叠")
+        elif begin > position:
+            errors.append(f"张量 {name} 之前有 {begin - position} 字节空洞")
+        position = max(position, end)
+
+    if position > data_size:
+        errors.append(f"文件被截断: 数据区需要 {position} 字节，实际只有 {data_size} 字节")
+    elif position < data_size:
+        errors.append(f"文件末尾多出 {data_size - position} 字节")
+    return result
+
+def shard_filename(number, total, prefix="model", width=5):
+    """返回分片文件名，如 model-00001-of-000163.safetensors"""
+    return f"{prefix}-{number:0{width}d}-of-{total:06d}.safetensors"
+
+def missing_shards(filenames):
+    """
+    根据已有分片的文件名推算缺失的分片
+
+    编号位数与已有文件名保持一致（如 model-00001-of-000163）。
+
+    Returns:
+        按文件名排序的缺失分片列表
+    """
+    numbered = {}
+    for filename in filenames:
+        match = SHARD_PATTERN.match(filename)
+        if match:
+            key = (match["prefix"], match["total"], len(match["number"]))
+            numbered.setdefault(key, set()).add(int(match["number"]))
+    missing = []
+    for (prefix, total, width), numbers in numbered.items():
+        for number in range(1, int(total) + 1):
+            if number not in numbers:
+                missing.append(f"{prefix}-{number:0{width}d}-of-{total}.safetensors")
+    return sorted(missing)
+
+def find_shards(directory, pattern="*.safetensors"):
+    """查找目录下的分片文件"""
+    return sorted(p for p in Path(directory).glob(pattern) if p.is_file())
+
+def verify_model(directory, index_file=INDEX_FILE, pattern="*.safetensors", workers=8):
+    """
+    校验整个模型目录
+
+    Returns:
+        报告字典: shards（逐分片结果）、missing、duplicated_tensors、duplicate_shards、
+        index_errors、problems（问题总数）
+    """
+    directory = Path(directory)
+    shards = find_shards(directory, pattern)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(verify_shard, shards))
+
+    report = {
+        "directory": str(directory),
+        "shards": results,
+        "missing": [],
+        "duplicated_tensors": {},
+        "duplicate_shards": [],
+        "index_errors": [],
+    }
+
+    # 分片编号是否完整
+    report["missing"] = missing_shards(result["file"] for result in results)
+
+    # 同名张量出现在多个分片，头部完全相同的分片
+    tensor_files = {}
+    digests = {}
+    for result in results:
+        for name in result["tensors"]:
+            tensor_files.setdefault(name, []).append(result["file"])
+        if result["header_digest"]:
+            digests.setdefault(result["header_digest"], []).append(result["file"])
+    report["duplicated_tensors"] = {name: files for name, files in tensor_files.items() if len(files) > 1}
+    report["duplicate_shards"] = [files for files in digests.values() if len(files) > 1]
+
+    # 与索引文件交叉核对
+    index_path = directory / index_file
+    if index_path.exists():
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                weight_map = json.load(f).get("weight_map", {})
+        except (OSError, ValueError) as e:
+            report["index_errors"].append(f"索引文件无法解析: {e}")
+            weight_map = {}
+        present = {result["file"] for result in results}
+        for shard in sorted(set(weight_map.values()) - present):
+            if shard not in report["missing"]:
+                report["missing"].append(shard)
+        for name, shard in weight_map.items():
+            files = tensor_files.get(name)
+            if shard not in present:
+                continue
+            if not files:
+                report["index_errors"].append(f"索引中的张量 {name} 不在任何分片中（应在 {shard}）")
+            elif shard not in files:
+                report["index_errors"].append(f"张量 {name} 应在 {shard}，实际在 {', '.join(files)}")
+        for name in sorted(set(tensor_files) - set(weight_map)):
+            report["index_errors"].append(f"张量 {name} 不在索引中（位于 {', '.join(tensor_files[name])}）")
+
+    report["missing"].sort()
+    report["problems"] = (
+        sum(1 for result in results if result["errors"])
+        + len(report["missing"])
+        + len(report["duplicated_tensors"])
+        + len(report["duplicate_shards"])
+        + len(report["index_errors"])
+    )
+    return report
+
+def print_report(report, limit=20):
+    """输出校验报告"""
+    shards = report["shards"]
+    print(f"分片数量: {len(shards)}, 张量数量: {sum(len(r['tensors']) for r in shards)}")
+    print("-" * 60)
+
+    for result in shards:
+        if result["errors"]:
+            print(f"❌ {result['file']}")
+            for error in result["errors"][:limit]:
+                print(f"    {error}")
+
+    if report["missing"]:
+        print(f"📁 缺失的分片 ({len(report['missing'])}):")
+        for shard in report["missing"][:limit]:
+            print(f"  - {shard}")
+    if report["duplicate_shards"]:
+        print("⚠️  头部完全相同的分片（疑似复制错误）:")
+        for files in report["duplicate_shards"]:
+            print(f"  - {', '.join(files)}")
+    if report["duplicated_tensors"]:
+        print(f"⚠️  出现在多个分片中的张量 ({len(report['duplicated_tensors'])}):")
+        for name, files in list(report["duplicated_tensors"].items())[:limit]:
+            print(f"  - {name}: {', '.join(files)}")
+    if report["index_errors"]:
+        print(f"⚠️  与 {INDEX_FILE} 不一致 ({len(report['index_errors'])}):")
+        for error in report["index_errors"][:limit]:
+            print(f"  - {error}")
+
+    if report["problems"]:
+        print(f"❌ 发现 {report['problems']} 处结构问题")
+    else:
+        print("✅ 所有分片文件头结构正常")
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="safetensors 文件头快速校验")
+    parser.add_argument("directory", help="模型文件所在目录")
+    parser.add_argument("-p", "--pattern", default="*.safetensors", help="文件匹配模式（默认 *.safetensors）")
+    parser.add_argument("--index", default=INDEX_FILE, help=f"索引文件名（默认 {INDEX_FILE}）")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出报告")
+    return parser.parse_args()
+
+def main():
+    """主函数"""
+    args = parse_arguments()
+    start = time.perf_counter()
+    report = verify_model(args.directory, args.index, args.pattern)
+    if args.json:
+        for result in report["shards"]:
+            result.pop("tensors")
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print("safetensors 文件头快速校验")
+        print("=" * 60)
+        print_report(report)
+        print(f"耗时 {time.perf_counter() - start:.2f} 秒")
+    return 1 if report["problems"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+modelscope_api.py 的检查
+启动 modelscope_stub_server.py 回放 testdata/modelscope_api 下录制的响应，
+通过 endpoint（--endpoint）驱动 ModelScopeFileLister 和 fetch_repository_sha256，
+覆盖分页、短页、429 限流后重试和持续限流的情况。
+
+用法:
+    cd H3C/sha256
+    python -m unittest test_modelscope_api -v
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import requests
+
+from modelscope_api import ModelScopeAPIError, ModelScopeFileLister, create_session, fetch_repository_sha256
+from modelscope_stub_server import DEFAULT_RESPONSE_DIR, StubServer
+
+def recorded_sha256(model_id):
+    """从录制的响应中读出模型的 safetensors 文件及其SHA256"""
+    with open(DEFAULT_RESPONSE_DIR / f"{model_id.replace('/', '__')}.json", 'r', encoding='utf-8') as f:
+        pages = json.load(f)['pages']
+    results = {}
+    for responses in pages.values():
+        for f in responses[-1]['body']['Data']['Files']:
+            if f['Type'] == 'blob' and f['Path'].endswith('.safetensors'):
+                results[f['Path']] = f['Sha256']
+    return results
+
+class ModelScopeAPITest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer().start()
+        self.endpoint = self.server.endpoint
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_paginated(self):
+        lister = ModelScopeFileLister("test/paginated", endpoint=self.endpoint, page_size=2)
+        files = lister.list_files()
+        self.assertEqual(len(files), 5)
+        self.assertEqual(lister.requests_made, 3)
+        self.assertEqual([page for _, page, _ in self.server.requests], [1, 2, 3])
+        self.assertEqual(lister.fetch_sha256(), recorded_sha256("test/paginated"))
+
+    def test_short_page(self):
+        lister = ModelScopeFileLister("test/short-page", endpoint=self.endpoint)
+        self.assertEqual(len(lister.list_files()), 4)
+        self.assertEqual(lister.requests_made, 1)
+
+    def test_fetch_repository_sha256(self):
+        results = fetch_repository_sha256("test/short-page", endpoint=self.endpoint)
+        self.assertEqual(results, recorded_sha256("test/short-page"))
+        self.assertEqual(len(results), 2)
+
+    def test_rate_limited_then_ok(self):
+        results = fetch_repository_sha256("test/rate-limited", endpoint=self.endpoint)
+        self.assertEqual(results, recorded_sha256("test/rate-limited"))
+        self.assertEqual([status for _, _, status in self.server.requests], [429, 200])
+
+    def test_throttled(self):
+        lister = ModelScopeFileLister("test/throttled", endpoint=self.endpoint, session=create_session(retries=0))
+        with self.assertRaises(requests.exceptions.RetryError):
+            lister.list_files()
+
+    def test_unknown_model(self):
+        lister = ModelScopeFileLister("test/unknown", endpoint=self.endpoint)
+        with self.assertRaises(ModelScopeAPIError):
+            lister.list_files()
+        self.assertEqual(fetch_repository_sha256("test/unknown", endpoint=self.endpoint), {})
+
+    def test_command_line_endpoint(self):
+        script = Path(__file__).parent / "modelscope_api.py"
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "modelscope_sha256.txt"
+            completed = subprocess.run(
+                [sys.executable, str(script), "-m", "test/short-page", "--endpoint", self.endpoint, "-o", str(output)],
+                capture_output=True, text=True, encoding='utf-8')
+            self.assertEqual(completed.returncode, 0, completed.stdout + completed.stderr)
+            expected = recorded_sha256("test/short-page")
+            lines = output.read_text(encoding='utf-8').splitlines()
+        self.assertEqual(lines, [f"{expected[path]}  {path}" for path in sorted(expected)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多模型SHA256批量校验
+同时校验多个模型：本地SHA256计算、远程SHA256获取（文件列表接口优先，接口缺失的文件用Playwright补充）
+和逐文件对比。所有模型共用一个进程池（限制总的磁盘I/O并发）和一个请求预算（限制对网站的总并发和
+每秒请求数），最后生成一份汇总报告。
+
+模型的指定方式:
+    模型ID                 本地目录为 <--local-root>/<模型名>
+    模型ID=本地目录
+    -f models.txt          每行 "模型ID [本地目录] [版本]"，# 之后为注释
+
+每个模型每个版本的中间结果保存在 <--work-dir>/<模型ID，/ 替换为 __>@<版本>/ 下:
+    local_sha256.txt、modelscope_sha256.txt、crawl_state.jsonl
+
+用法:
+    python verify_models.py deepseek-ai/DeepSeek-R1-0528 Qwen/Qwen3-235B-A22B
+    python verify_models.py -f models.txt --io-workers 8 --max-requests 4 --requests-per-second 2
+    python verify_models.py deepseek-ai/DeepSeek-R1-0528=/data/DeepSeek-R1-0528 --json report.json
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from crawl_state import model_key
+from hash_cache import HashCache, DEFAULT_CACHE_FILE
+from local_sha256 import default_workers, find_files, hash_files, write_sha256_file
+from modelscope_api import DEFAULT_REVISION, RequestBudget, expected_files, fetch_repository_sha256, save_results
+from playwright_crawler import AdaptiveConcurrency, PlaywrightSHA256Crawler
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+DEFAULT_LOCAL_ROOT = "/HDD_Raid/SVN_MODEL_REPO/Model"
+DEFAULT_WORK_DIR = "model_verification"
+DEFAULT_REPORT = "models_sha256_report.txt"
+
+class ModelJob:
+    """单个模型的校验任务和结果"""
+
+    def __init__(self, model_id, local_dir, revision=DEFAULT_REVISION, work_dir=DEFAULT_WORK_DIR):
+        self.model_id = model_id
+        self.local_dir = Path(local_dir)
+        self.revision = revision
+        # 同一模型的不同版本可能同时校验，中间结果按模型和版本分开保存
+        self.work_dir = Path(work_dir) / model_key(model_id, revision)
+        self.expected = []
+        self.local = {}
+        self.remote = {}
+        self.errors = []
+        self.elapsed = 0
+
+    def comparison(self):
+        """
+        对比本地和远程SHA256，应有但两边都没有的文件计入 missing
+
+        Returns:
+            {'matches', 'mismatches', 'local_only', 'remote_only', 'missing'}
+        """
+        common = self.local.keys() & self.remote.keys()
+        return {
+            'matches': sorted(name for name in common if self.local[name] == self.remote[name]),
+            'mismatches': sorted((name, self.local[name], self.remote[name])
+                                 for name in common if self.local[name] != self.remote[name]),
+            'local_only': sorted(self.local.keys() - self.remote.keys()),
+            'remote_only': sorted(self.remote.keys() - self.local.keys()),
+            'missing': sorted(set(self.expected) - self.local.keys() - self.remote.keys()),
+        }
+
+    @property
+    def name(self):
+        """报告中显示的名称: 模型ID@版本"""
+        return f"{self.model_id}@{self.revision}"
+
+    @property
+    def status(self):
+        """OK / MISMATCH / INCOMPLETE / ERROR"""
+        if not self.local or not self.remote:
+            return "ERROR"
+        result = self.comparison()
+        if result['mismatches']:
+            return "MISMATCH"
+        if self.errors or result['local_only'] or result['remote_only'] or result['missing']:
+            return "INCOMPLETE"
+        return "OK"
+
+def default_local_dir(model_id, local_root=DEFAULT_LOCAL_ROOT):
+    """模型的默认本地目录: <local_root>/<模型名>"""
+    return Path(local_root) / model_id.split('/')[-1]
+
+def parse_model_spec(spec, local_root=DEFAULT_LOCAL_ROOT, revision=DEFAULT_REVISION, work_dir=DEFAULT_WORK_DIR):
+    """解析 "模型ID" 或 "模型ID=本地目录" """
+    model_id, _, local_dir = spec.partition('=')
+    return ModelJob(model_id, local_dir or default_local_dir(model_id, local_root), revision, work_dir)
+
+def load_models_file(models_file, local_root=DEFAULT_LOCAL_ROOT, revision=DEFAULT_REVISION,
+                     work_dir=DEFAULT_WORK_DIR):
+    """读取模型列表文件，每行 "模型ID [本地目录] [版本]" """
+    jobs = []
+    with open(models_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            fields = line.split('#', 1)[0].split()
+            if not fields:
+                continue
+            model_id = fields[0]
+            local_dir = fields[1] if len(fields) > 1 else default_local_dir(model_id, local_root)
+            jobs.append(ModelJob(model_id, local_dir, fields[2] if len(fields) > 2 else revision, work_dir))
+    return jobs
+
+class BatchVerifier:
+    """在全局I/O和请求预算下并发校验多个模型"""
+
+    def __init__(self, io_workers=None, max_requests=4, requests_per_second=None, max_models=4,
+                 pattern="*.safetensors", cache_file=DEFAULT_CACHE_FILE, time_budget=None):
+        self.io_workers = io_workers or default_workers()
+        self.max_requests = max_requests
+        self.pattern = pattern
+        self.cache_file = cache_file
+        self.time_budget = time_budget
+        # 所有模型共用的预算
+        self.budget = RequestBudget(max_requests, requests_per_second)
+        self.limiter = None
+        self.executor = None
+        self.model_slots = None
+        self.max_models = max_models
+
+    async def run(self, jobs):
+        """校验所有模型，返回 jobs"""
+        self.limiter = AdaptiveConcurrency(initial=min(3, self.max_requests), maximum=self.max_requests)
+        self.model_slots = asyncio.Semaphore(self.max_models)
+        with ProcessPoolExecutor(max_workers=self.io_workers) as self.executor:
+            await asyncio.gather(*(self.verify(job) for job in jobs))
+        return jobs
+
+    async def verify(self, job):
+        """校验单个模型：本地计算和远程获取同时进行，完成后对比"""
+        async with self.model_slots:
+            start = time.monotonic()
+            job.work_dir.mkdir(parents=True, exist_ok=True)
+            print(f"▶ 开始校验 {job.name}  本地目录: {job.local_dir}")
+            local_files = find_files(job.local_dir, self.pattern) if job.local_dir.is_dir() else []
+            if not local_files:
+                job.errors.append(f"本地目录 {job.local_dir} 下未找到匹配 {self.pattern} 的文件")
+            await asyncio.gather(self.hash_local(job, local_files), self.fetch_remote(job, local_files))
+            job.elapsed = time.monotonic() - start
+            print(f"■ {job.name}: {job.status}  本地 {len(job.local)} 个, 远程 {len(job.remote)} 个, "
+                  f"耗时 {job.elapsed:.0f} 秒")
+
+    async def hash_local(self, job, files):
+        """在共享进程池中计算本地SHA256"""
+        if not files:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            job.local = await loop.run_in_executor(None, self._hash_files, files)
+        except OSError as e:
+            job.errors.append(f"本地SHA256计算失败: {e}")
+            return
+        write_sha256_file(job.local, job.work_dir / "local_sha256.txt")
+
+    def _hash_files(self, files):
+        # SQLite 连接不能跨线程使用，在计算线程中打开缓存
+        cache = HashCache(self.cache_file) if self.cache_file else None
+        try:
+            return hash_files(files, cache=cache, executor=self.executor)
+        finally:
+            if cache:
+                cache.close()
+
+    async def fetch_remote(self, job, local_files):
+        """获取远程SHA256：先请求文件列表接口，接口未返回的文件再用Playwright逐个获取"""
+        loop = asyncio.get_running_loop()
+        api_results = await loop.run_in_executor(None, functools.partial(
+            fetch_repository_sha256, job.model_id, job.revision, pattern=self.pattern, budget=self.budget))
+        job.expected = expected_files(job.model_id, [p.name for p in local_files], api_results)
+        job.remote = dict(api_results)
+
+        missing = [name for name in job.expected if name not in job.remote]
+        if missing:
+            crawler = PlaywrightSHA256Crawler(job.work_dir / "crawl_state.jsonl", job.model_id, job.revision,
+                                              limiter=self.limiter)
+            try:
+                results = await crawler.crawl_all_sha256(max_concurrency=self.max_requests,
+                                                         time_budget=self.time_budget, filenames=missing)
+                job.remote.update({name: results[name] for name in missing if name in results})
+            except Exception as e:
+                job.errors.append(f"Playwright获取失败: {e}")
+            finally:
+                crawler.state.close()
+        if job.remote:
+            save_results(job.remote, job.work_dir / "modelscope_sha256.txt")
+
+def build_report(jobs, elapsed):
+    """生成汇总报告文本"""
+    lines = ["多模型SHA256校验汇总报告", "=" * 80, f"生成时间: {time.strftime('%Y-%m-%d %H:%M:%S')}",
+             f"模型数量: {len(jobs)}, 总耗时: {elapsed / 60:.1f} 分钟", ""]
+    lines.append(f"{'状态':<12}{'本地':>6}{'远程':>6}{'匹配':>6}{'不匹配':>6}{'仅本地':>6}{'仅远程':>6}"
+                 f"{'缺失':>6}{'耗时':>8}  模型")
+    lines.append("-" * 80)
+    for job in jobs:
+        result = job.comparison()
+        lines.append(f"{job.status:<12}{len(job.local):>6}{len(job.remote):>6}{len(result['matches']):>6}"
+                     f"{len(result['mismatches']):>6}{len(result['local_only']):>6}{len(result['remote_only']):>6}"
+                     f"{len(result['missing']):>6}{job.elapsed:>7.0f}s  {job.name}")
+    lines.append("")
+
+    for job in jobs:
+        if job.status == "OK":
+            continue
+        result = job.comparison()
+        lines.append(f"[{job.status}] {job.name}  ({job.local_dir})")
+        for error in job.errors:
+            lines.append(f"  ⚠️  {error}")
+        for name, local_hash, remote_hash in result['mismatches']:
+            lines.append(f"  ✗ {name}")
+            lines.append(f"    本地:  {local_hash}")
+            lines.append(f"    远程:  {remote_hash}")
+        for name in result['local_only']:
+            lines.append(f"  📁 仅本地存在: {name}")
+        for name in result['remote_only']:
+            lines.append(f"  🌐 仅远程存在: {name}")
+        for name in result['missing']:
+            lines.append(f"  ❓ 两边都未获取到: {name}")
+        lines.append("")
+    return lines
+
+def report_json(jobs):
+    """汇总报告的JSON形式"""
+    report = []
+    for job in jobs:
+        result = job.comparison()
+        report.append({
+            "model_id": job.model_id,
+            "revision": job.revision,
+            "local_dir": str(job.local_dir),
+            "status": job.status,
+            "local": len(job.local),
+            "remote": len(job.remote),
+            "matches": len(result['matches']),
+            "mismatches": [{"file": name, "local": local_hash, "remote": remote_hash}
+                           for name, local_hash, remote_hash in result['mismatches']],
+            "local_only": result['local_only'],
+            "remote_only": result['remote_only'],
+            "missing": result['missing'],
+            "errors": job.errors,
+            "elapsed": round(job.elapsed, 1),
+        })
+    return report
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="多模型SHA256批量校验")
+    parser.add_argument("models", nargs="*", help="模型ID，或 模型ID=本地目录")
+    parser.add_argument("-f", "--models-file", help="模型列表文件，每行 \"模型ID [本地目录] [版本]\"")
+    parser.add_argument("--local-root", default=DEFAULT_LOCAL_ROOT, help=f"本地模型根目录（默认 {DEFAULT_LOCAL_ROOT}）")
+    parser.add_argument("-r", "--revision", default=DEFAULT_REVISION, help="默认版本/分支（默认 master）")
+    parser.add_argument("-p", "--pattern", default="*.safetensors", help="文件匹配模式（默认 *.safetensors）")
+    parser.add_argument("--work-dir", default=DEFAULT_WORK_DIR, help=f"中间结果目录（默认 {DEFAULT_WORK_DIR}）")
+    parser.add_argument("--io-workers", type=int, help="所有模型共用的SHA256计算进程数")
+    parser.add_argument("--max-requests", type=int, default=4, help="对网站的最大并发请求数（所有模型共用，默认4）")
+    parser.add_argument("--requests-per-second", type=float, help="文件列表接口每秒最多请求数（所有模型共用）")
+    parser.add_argument("--max-models", type=int, default=4, help="同时校验的模型数（默认4）")
+    parser.add_argument("--time-budget", type=float, help="每个模型Playwright获取的时间预算（秒）")
+    parser.add_argument("--cache", default=str(DEFAULT_CACHE_FILE), help=f"哈希缓存文件（默认 {DEFAULT_CACHE_FILE}）")
+    parser.add_argument("--no-cache", action="store_true", help="不使用哈希缓存")
+    parser.add_argument("-o", "--output", default=DEFAULT_REPORT, help=f"汇总报告文件（默认 {DEFAULT_REPORT}）")
+    parser.add_argument("--json", help="同时输出JSON格式的汇总报告")
+    return parser.parse_args()
+
+async def main():
+    """主函数"""
+    args = parse_arguments()
+    jobs = [parse_model_spec(spec, args.local_root, args.revision, args.work_dir) for spec in args.models]
+    if args.models_file:
+        jobs.extend(load_models_file(args.models_file, args.local_root, args.revision, args.work_dir))
+    if not jobs:
+        print("❌ 请指定模型ID或 --models-file")
+        return 1
+
+    print("多模型SHA256批量校验")
+    print("=" * 80)
+    print(f"模型数量: {len(jobs)}, 同时校验: {args.max_models}, 最大并发请求: {args.max_requests}")
+    print("=" * 80)
+
+    start = time.time()
+    verifier = BatchVerifier(args.io_workers, args.max_requests, args.requests_per_second, args.max_models,
+                             args.pattern, None if args.no_cache else args.cache, args.time_budget)
+    await verifier.run(jobs)
+
+    lines = build_report(jobs, time.time() - start)
+    print("\n" + "\n".join(lines))
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    print(f"📋 汇总报告已保存到: {args.output}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report_json(jobs), f, ensure_ascii=False, indent=2)
+        print(f"📋 JSON报告已保存到: {args.json}")
+    return 0 if all(job.status == "OK" for job in jobs) else 1
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))